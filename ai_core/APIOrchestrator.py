@@ -1,56 +1,336 @@
+import time
 import logging
-from typing import Dict, Any, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Dict, Any, Iterator, List, Optional
 from .providers import OpenAIProvider, DeepSeekProvider
+from .providers.base_provider import BaseProvider
 from .utils.response_blender import ResponseBlender
 from .config_manager import ConfigManager
+from .router import AdaptiveRouter
+from .middleware.response_cache import ResponseCache
+
+FANOUT_POLICIES = ("parallel", "hedged", "first_good")
 
 class APIOrchestrator:
+    """Routes queries to providers concurrently and blends the answers
+
+    Fan-out policies (config routing.fanout, or context["fanout"]):
+      parallel    call both providers at once, blend whatever arrives
+                  within each provider's timeout
+      hedged      call the primary; fire the secondary only if the primary
+                  is still running after its p95 latency
+      first_good  call both; return with the first valid response plus
+                  any that land within routing.grace_window seconds
+    """
+
     def __init__(self):
         self.log = logging.getLogger(__name__)
         self.config = ConfigManager()
         self._init_providers()
         self.blender = ResponseBlender()
+        routing = self.config.get("routing", {}) or {}
+        self.fanout = routing.get("fanout", "parallel")
+        if self.fanout not in FANOUT_POLICIES:
+            raise ValueError(f"Invalid fanout. Choose from: {list(FANOUT_POLICIES)}")
+        self.hedge_after = routing.get("hedge_after", 1.0)
+        self.grace_window = routing.get("grace_window", 0.05)
+        self.executor = ThreadPoolExecutor(max_workers=routing.get("max_workers", 8))
+        self._init_router(routing)
+        self._init_cache(self.config.get("cache", {}) or {})
         self.log.info("API Orchestrator initialized")
 
     def _init_providers(self):
         """Initialize providers from config"""
         provider_config = self.config.get("providers", {})
-        self.openai = OpenAIProvider(provider_config.get("openai", {}))
-        self.deepseek = DeepSeekProvider(provider_config.get("deepseek", {}))
+        self.openai = OpenAIProvider(self._provider_settings(provider_config, "openai"))
+        self.deepseek = DeepSeekProvider(self._provider_settings(provider_config, "deepseek"))
+
+    def _init_router(self, routing: Dict[str, Any]):
+        """Adaptive provider ranking; costs come from providers.<name>.cost"""
+        providers = [self.openai, self.deepseek]
+        self.router = AdaptiveRouter(
+            providers,
+            costs={p.provider_name: self.config.get(f"providers.{p.provider_name}.cost", 0.0)
+                   for p in providers},
+            hints=routing.get("hints"),
+            **(routing.get("score") or {}),
+            **(routing.get("circuit") or {})
+        )
+
+    def _init_cache(self, cache_config: Dict[str, Any]):
+        """Response cache in front of the providers; None when disabled"""
+        self.cache = None
+        if cache_config.get("enabled", True):
+            self.cache = ResponseCache(
+                db_path=cache_config.get("path", "data/response_cache.db"),
+                ttl=cache_config.get("ttl", 3600.0),
+                max_entries=cache_config.get("max_entries", 5000),
+                similarity_threshold=cache_config.get("similarity_threshold", 0.92)
+            )
+
+    @staticmethod
+    def _provider_settings(provider_config: Dict[str, Any], name: str) -> Dict[str, Any]:
+        """Provider section with the API key from the environment filled in"""
+        settings = dict(provider_config.get(name) or {})
+        if provider_config.get(f"{name}_key") and "api_key" not in settings:
+            settings["api_key"] = provider_config[f"{name}_key"]
+        return settings
 
     def route_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Route query to appropriate providers and blend responses"""
+        """Route query to appropriate providers and blend responses
+
+        context["cache"] may be "refresh" (skip the cache lookup) or
+        "bypass" (skip the cache entirely).
+        """
         try:
             context = context or {}
-            # Determine primary provider based on query type
+            mode = context.get('mode', 'balanced')
+            cached = self._cache_lookup(query, mode, context)
+            if cached is not None:
+                return {"status": "success", "query": query, **cached}
+
+            # Rank providers by score; open circuits are skipped
             primary, secondary = self._select_providers(query)
+            policy = context.get('fanout', self.fanout)
             
-            # Get responses
-            primary_resp = primary.process(query, context)
-            secondary_resp = secondary.process(query, context)
-
-            # Blend responses
-            blended = self.blender.blend(
-                responses=[primary_resp, secondary_resp],
-                mode=context.get('mode', 'balanced')
-            )
+            # Get responses concurrently
+            if policy == "hedged":
+                responses = self._fan_out_hedged(primary, secondary, query, context)
+            elif policy == "first_good":
+                responses = self._fan_out_first_good(primary, secondary, query, context)
+            elif policy == "parallel":
+                responses = self._fan_out_parallel(primary, secondary, query, context)
+            else:
+                raise ValueError(f"Invalid fanout. Choose from: {list(FANOUT_POLICIES)}")
+            if not responses:
+                raise RuntimeError("All providers failed or timed out")
+
+            # Blend responses, primary first
+            ordered = [responses[p.provider_name] for p in (primary, secondary)
+                       if p is not None and p.provider_name in responses]
+            blended = self._blend(ordered, mode)
 
-            return {
-                "status": "success",
-                "query": query,
+            result = {
                 "response": blended,
                 "providers": {
                     "primary": primary.provider_name,
-                    "secondary": secondary.provider_name
+                    "secondary": secondary.provider_name if secondary else None,
+                    "used": [r.get("source") for r in ordered],
+                    "fanout": policy
                 }
             }
+            self._cache_store(query, mode, context, result)
+            return {"status": "success", "query": query, **result}
         except Exception as e:
             self.log.error(f"Routing failed: {e}")
             return {"status": "error", "message": str(e)}
 
+    def stream_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Streaming route_query
+
+        The primary provider's chunks are passed through as they arrive
+        while the secondary runs alongside, started per the fan-out policy:
+        with the stream for parallel/first_good, once the primary outlives
+        its p95 (or fails) for hedged. The blended answer comes in the
+        final {"type": "done"} message; its "replaces_stream" is True when
+        that answer is not the primary's streamed text (the secondary was
+        blended in, or the primary failed), so clients redraw from it.
+        """
+        try:
+            context = context or {}
+            mode = context.get('mode', 'balanced')
+            cached = self._cache_lookup(query, mode, context)
+            if cached is not None:
+                for delta in BaseProvider._chunk_text(cached["response"].get("content", "")):
+                    yield {"type": "chunk", "delta": delta, "provider": "cache"}
+                yield {"type": "done", "status": "success", "query": query,
+                       "replaces_stream": False, **cached}
+                return
+
+            primary, secondary = self._select_providers(query)
+            policy = context.get('fanout', self.fanout)
+            if policy not in FANOUT_POLICIES:
+                raise ValueError(f"Invalid fanout. Choose from: {list(FANOUT_POLICIES)}")
+
+            if not self.router.allow(primary.provider_name):
+                raise RuntimeError(f"Circuit open for {primary.provider_name}")
+            hedged = policy == "hedged"
+            hedge_after = self.latency_p95(primary.provider_name) or self.hedge_after
+            pending = None
+            if secondary is not None and not hedged:
+                pending = (self._submit(secondary, query, context), self._deadline(secondary))
+            start = time.monotonic()
+            primary_resp = None
+            try:
+                for chunk in primary.stream(query, context):
+                    if chunk["type"] == "done":
+                        primary_resp = chunk["response"]
+                        continue
+                    if (hedged and pending is None and secondary is not None
+                            and time.monotonic() - start >= hedge_after):
+                        pending = (self._submit(secondary, query, context), self._deadline(secondary))
+                    yield {**chunk, "provider": primary.provider_name}
+            finally:
+                self.router.record(primary.provider_name, time.monotonic() - start,
+                                   self._is_valid(primary_resp))
+
+            primary_ok = self._is_valid(primary_resp)
+            if hedged and pending is None and secondary is not None and not primary_ok:
+                pending = (self._submit(secondary, query, context), self._deadline(secondary))
+            responses = [primary_resp] if primary_ok else []
+            if pending is not None:
+                future, deadline = pending
+                if primary_ok and policy != "parallel":
+                    # The primary already answered; only wait briefly for the secondary
+                    deadline = min(deadline, time.monotonic() + self.grace_window)
+                secondary_resp = self._result(future, deadline)
+                if secondary_resp is not None:
+                    responses.append(secondary_resp)
+            if not responses:
+                raise RuntimeError("All providers failed or timed out")
+            blended = self._blend(responses, mode)
+            result = {
+                "response": blended,
+                "providers": {
+                    "primary": primary.provider_name,
+                    "secondary": secondary.provider_name if secondary else None,
+                    "used": [r.get("source") for r in responses],
+                    "fanout": policy
+                }
+            }
+            self._cache_store(query, mode, context, result)
+            yield {"type": "done", "status": "success", "query": query,
+                   "replaces_stream": responses != [primary_resp], **result}
+        except Exception as e:
+            self.log.error(f"Streaming route failed: {e}")
+            yield {"type": "error", "status": "error", "message": str(e)}
+
+    def latency_p95(self, provider_name: str) -> Optional[float]:
+        """p95 of recent call latencies, None until enough samples exist"""
+        return self.router.stats[provider_name].p95()
+
+    def _fan_out_parallel(self, primary, secondary, query, context) -> Dict[str, Dict]:
+        futures = {p.provider_name: (self._submit(p, query, context), self._deadline(p))
+                   for p in (primary, secondary) if p is not None}
+        responses = {}
+        for name, (future, deadline) in futures.items():
+            response = self._result(future, deadline)
+            if response is not None:
+                responses[name] = response
+        return responses
+
+    def _fan_out_hedged(self, primary, secondary, query, context) -> Dict[str, Dict]:
+        primary_future = self._submit(primary, query, context)
+        hedge_after = self.latency_p95(primary.provider_name) or self.hedge_after
+        wait([primary_future], timeout=hedge_after)
+        if primary_future.done():
+            response = self._result(primary_future, time.monotonic())
+            if response is not None:
+                return {primary.provider_name: response}
+        pending = {primary.provider_name: (primary_future, self._deadline(primary))}
+        if secondary is not None:
+            pending[secondary.provider_name] = (self._submit(secondary, query, context), self._deadline(secondary))
+        return self._first_good(pending)
+
+    def _fan_out_first_good(self, primary, secondary, query, context) -> Dict[str, Dict]:
+        pending = {p.provider_name: (self._submit(p, query, context), self._deadline(p))
+                   for p in (primary, secondary) if p is not None}
+        return self._first_good(pending)
+
+    def _first_good(self, pending: Dict[str, tuple]) -> Dict[str, Dict]:
+        """Wait for the first valid response, then briefly for stragglers"""
+        responses = {}
+        while pending and not responses:
+            deadline = max(d for _, d in pending.values())
+            done, _ = wait([f for f, _ in pending.values()], return_when=FIRST_COMPLETED,
+                           timeout=max(0.0, deadline - time.monotonic()))
+            if not done:
+                break
+            for name, (future, _) in list(pending.items()):
+                if future in done:
+                    del pending[name]
+                    response = self._result(future, time.monotonic())
+                    if response is not None:
+                        responses[name] = response
+            # Drop providers whose own timeout has passed
+            now = time.monotonic()
+            pending = {n: (f, d) for n, (f, d) in pending.items() if d > now}
+        if responses and pending:
+            grace = time.monotonic() + self.grace_window
+            for name, (future, deadline) in pending.items():
+                response = self._result(future, min(grace, deadline))
+                if response is not None:
+                    responses[name] = response
+        return responses
+
+    def _submit(self, provider, query: str, context: Dict[str, Any]) -> Future:
+        if not self.router.allow(provider.provider_name):
+            # Fast-fail: the circuit is open or its probe slot is taken
+            future = Future()
+            future.set_result({"error": f"Circuit open for {provider.provider_name}"})
+            return future
+        return self.executor.submit(self._timed_process, provider, query, context)
+
+    def _timed_process(self, provider, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.monotonic()
+        response = None
+        try:
+            response = provider.process(query, context)
+            return response
+        finally:
+            self.router.record(provider.provider_name, time.monotonic() - start,
+                               self._is_valid(response))
+
+    @staticmethod
+    def _is_valid(response: Any) -> bool:
+        return (isinstance(response, dict) and "content" in response
+                and "error" not in response and not response.get("is_fallback"))
+
+    def _deadline(self, provider) -> float:
+        timeout = self.config.get(f"providers.{provider.provider_name}.timeout", 10.0)
+        return time.monotonic() + timeout
+
+    def _result(self, future, deadline: float) -> Optional[Dict[str, Any]]:
+        """Valid response by `deadline`, or None on timeout, error or fallback"""
+        try:
+            response = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            self.log.debug("Provider call timed out")
+            return None
+        except Exception as e:
+            self.log.warning(f"Provider call failed: {e}")
+            return None
+        return response if self._is_valid(response) else None
+
+    def _blend(self, responses: List[Dict], mode: str) -> Dict:
+        if len(responses) > 1:
+            return self.blender.blend(responses=responses, mode=mode)
+        only = responses[0]
+        return {
+            'content': only['content'],
+            'sources': [only.get('source')],
+            'confidence': only.get('confidence', 0.0)
+        }
+
+    def get_router_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.router.get_stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats() if self.cache else {}
+
+    def _cache_lookup(self, query: str, mode: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        return self.cache.lookup(query, mode, context, context.get("cache"))
+
+    def _cache_store(self, query: str, mode: str, context: Dict[str, Any], result: Dict[str, Any]):
+        if self.cache is not None:
+            self.cache.store(query, mode, context, result, context.get("cache"))
+
     def _select_providers(self, query: str):
-        """Select providers based on query content"""
-        tech_keywords = ['code', 'algorithm', 'debug', 'function', 'class']
-        if any(keyword in query.lower() for keyword in tech_keywords):
-            return self.deepseek, self.openai
-        return self.openai, self.deepseek
+        """Primary and secondary (or None) by router score"""
+        ranked = self.router.rank(query)
+        if not ranked:
+            raise RuntimeError("No providers available: all circuits are open")
+        return ranked[0], ranked[1] if len(ranked) > 1 else None
@@ -0,0 +1,284 @@
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from knowledge.embedding_engine import HashingEmbedder
+from shared.query_keys import normalize_query, context_fingerprint
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "what", "whats", "how", "do",
+    "does", "in", "on", "of", "for", "to", "and", "or", "me", "i", "you", "please",
+    "can", "could", "would", "tell", "about", "explain", "it", "this", "that"
+}
+# Words that flip a query's meaning; "t" is what normalization leaves of n't
+NEGATIONS = {"not", "no", "never", "none", "nor", "without", "cannot", "t"}
+# Cache directives: "refresh" skips the lookup but stores the new answer,
+# "bypass" skips the cache entirely
+DIRECTIVES = ("refresh", "bypass")
+
+def cache_directive(headers: Dict[str, str]) -> Optional[str]:
+    """Map request headers to a cache directive
+
+    X-Slick-Cache: refresh|bypass wins; otherwise Cache-Control no-store
+    means bypass and no-cache means refresh.
+    """
+    lowered = {k.lower(): v.lower() for k, v in headers.items()}
+    explicit = lowered.get("x-slick-cache", "").strip()
+    if explicit in DIRECTIVES:
+        return explicit
+    control = lowered.get("cache-control", "")
+    if "no-store" in control:
+        return "bypass"
+    if "no-cache" in control:
+        return "refresh"
+    return None
+
+class ResponseCache:
+    """Two-tier cache of provider answers, persisted to SQLite
+
+    Entries are isolated per (mode, context fingerprint). An exact tier
+    matches the normalized query; a similarity tier compares hashed
+    embeddings of the query's content words and their bigrams, so "what is
+    a python decorator" and "what's a python decorator, please" share an
+    answer while "fahrenheit to celsius" and "celsius to fahrenheit" do not.
+    Numbers, operators and negations must match exactly on that tier. Entries expire
+    after `ttl` seconds and the least recently used are evicted past
+    `max_entries`.
+    """
+
+    def __init__(self, db_path: str = "data/response_cache.db", ttl: float = 3600.0,
+                 max_entries: int = 5000, similarity_threshold: float = 0.92,
+                 embedder: Optional[HashingEmbedder] = None):
+        self.log = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashingEmbedder()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._lock = threading.RLock()
+        self.stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0,
+                      "bypassed": 0, "stores": 0, "evictions": 0, "expired": 0}
+        self._init_db()
+        self._load()
+
+    def lookup(self, query: str, mode: str, context: Optional[Dict[str, Any]] = None,
+               directive: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Cached response or None; hits carry a "cache" tier marker"""
+        if directive in DIRECTIVES:
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+        normalized = normalize_query(query)
+        bucket = (mode or "", context_fingerprint(context))
+        now = time.time()
+        with self._lock:
+            key = self._key(normalized, bucket)
+            entry = self._live(key, now)
+            tier = "exact"
+            if entry is None:
+                key, entry = self._nearest(normalized, bucket, now)
+                tier = "similar"
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats[f"{tier}_hits"] += 1
+            # Deep: callers must not be able to mutate the cached answer
+            return {**copy.deepcopy(entry["response"]), "cache": tier}
+
+    def store(self, query: str, mode: str, context: Optional[Dict[str, Any]],
+              response: Dict[str, Any], directive: Optional[str] = None):
+        if directive == "bypass":
+            return
+        normalized = normalize_query(query)
+        bucket = (mode or "", context_fingerprint(context))
+        key = self._key(normalized, bucket)
+        created = time.time()
+        with self._lock:
+            self._insert(key, bucket, normalized, response, created)
+            self.stats["stores"] += 1
+            evicted = self._evict()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, mode, fingerprint, normalized, response, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, bucket[0], bucket[1], normalized, json.dumps(response, default=str), created)
+                )
+                if evicted:
+                    conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in evicted])
+        except sqlite3.Error as e:
+            self.log.warning(f"Response cache persist failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["exact_hits"] + self.stats["similar_hits"] + self.stats["misses"]
+            hits = self.stats["exact_hits"] + self.stats["similar_hits"]
+            return {**self.stats, "entries": len(self._entries),
+                    "hit_rate": hits / lookups if lookups else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM responses")
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    mode TEXT,
+                    fingerprint TEXT,
+                    normalized TEXT,
+                    response TEXT,
+                    created REAL
+                )
+            """)
+
+    def _load(self):
+        """Warm the in-memory tiers from disk, dropping expired rows"""
+        cutoff = time.time() - self.ttl
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+            rows = conn.execute(
+                "SELECT key, mode, fingerprint, normalized, response, created FROM responses "
+                "ORDER BY created DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+        for key, mode, fingerprint, normalized, response, created in reversed(rows):
+            self._insert(key, (mode, fingerprint), normalized, json.loads(response), created)
+        if rows:
+            self.log.info(f"Loaded {len(rows)} cached responses")
+
+    def _insert(self, key, bucket, normalized, response, created):
+        self._entries[key] = {"bucket": bucket, "normalized": normalized,
+                              "response": response, "created": created}
+        self._entries.move_to_end(key)
+        words = self._content_words(normalized)
+        rows = self._buckets.get(bucket)
+        if rows is None:
+            rows = self._buckets[bucket] = _Bucket(2 * self.embedder.dim)
+        rows.add(key, self._vector(words), self._guard(words))
+
+    def _live(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and now - entry["created"] > self.ttl:
+            self._remove(key)
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def _nearest(self, normalized: str, bucket, now: float):
+        rows = self._buckets.get(bucket)
+        if rows is None:
+            return None, None
+        words = self._content_words(normalized)
+        guard = self._guard(words)
+        scores = rows.scores(self._vector(words))
+        # Collected first: expiring an entry below reorders the bucket's rows
+        candidates = [rows.keys[i] for i in np.argsort(-scores)
+                      if scores[i] >= self.similarity_threshold and rows.guards[i] == guard]
+        for key in candidates:
+            entry = self._live(key, now)
+            if entry is not None:
+                return key, entry
+        return None, None
+
+    def _evict(self):
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            evicted.append(key)
+        self.stats["evictions"] += len(evicted)
+        return evicted
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            rows = self._buckets.get(entry["bucket"])
+            if rows is not None:
+                rows.remove(key)
+                if not len(rows):
+                    self._buckets.pop(entry["bucket"], None)
+
+    @staticmethod
+    def _content_words(normalized: str) -> List[str]:
+        """Query words minus stopwords, in order; the similarity tier's input"""
+        return [w for w in normalized.split() if w not in STOPWORDS] or normalized.split()
+
+    def _vector(self, words: List[str]) -> np.ndarray:
+        """Unigram embedding joined with an exact-bigram one, so order counts"""
+        bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vec = np.concatenate([self.embedder.embed(" ".join(words)),
+                              self.embedder.embed_tokens(bigrams)])
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    @staticmethod
+    def _guard(words: List[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Numbers, operators and negations, which a similar query must share exactly"""
+        return (tuple(w for w in words if any(c.isdigit() for c in w)),
+                tuple(w for w in words if not any(c.isalnum() for c in w)),
+                tuple(w for w in words if w in NEGATIONS))
+
+    @staticmethod
+    def _key(normalized: str, bucket) -> str:
+        return hashlib.sha256("\0".join((bucket[0], bucket[1], normalized)).encode("utf-8")).hexdigest()
+
+class _Bucket:
+    """One bucket's similarity rows in a contiguous matrix
+
+    Kept up to date on insert and removal (swap with the last row), so a
+    lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 16):
+        self.matrix = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self.keys: List[str] = []
+        self.guards: List[tuple] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, vector: np.ndarray, guard: tuple):
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.matrix):
+                grown = np.zeros((2 * len(self.matrix), self.matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self.matrix
+                self.matrix = grown
+            self._rows[key] = row
+            self.keys.append(key)
+            self.guards.append(guard)
+        self.matrix[row] = vector
+        self.guards[row] = guard
+
+    def remove(self, key: str):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.keys) - 1
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.keys[row] = self.keys[last]
+            self.guards[row] = self.guards[last]
+            self._rows[self.keys[row]] = row
+        self.keys.pop()
+        self.guards.pop()
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        return self.matrix[:len(self.keys)] @ vector
@@ -1,18 +1,61 @@
+import re
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
+import httpx
+from .http_pool import provider_pools
+
+POOL_OPTIONS = ("max_connections", "max_keepalive", "keepalive_expiry", "http2", "timeout")
 
 class BaseProvider(ABC):
-    def __init__(self, provider_name: str):
+    def __init__(self, provider_name: str, config: Optional[Dict[str, Any]] = None):
         self.log = logging.getLogger(f"{provider_name.upper()}Provider")
         self.provider_name = provider_name
+        config = config or {}
+        # Remote calls are made only when an endpoint is configured
+        self.base_url = config.get("base_url")
+        self.api_key = config.get("api_key")
+        if self.base_url:
+            provider_pools.configure(
+                provider_name,
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else None,
+                **{k: config[k] for k in POOL_OPTIONS if k in config}
+            )
         self.log.info(f"Initialized {provider_name} provider")
 
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for this provider"""
+        return provider_pools.client(self.provider_name)
+
+    @property
+    def sync_http(self) -> httpx.Client:
+        """Sync client over the same pool settings, for process()"""
+        return provider_pools.sync_client(self.provider_name)
+
     @abstractmethod
     def process(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Main processing method"""
         pass
 
+    async def aprocess(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Async processing; providers without a remote call run process() on a thread"""
+        return await asyncio.to_thread(self.process, query, context or {})
+
+    def stream(self, query: str, context: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """Incremental version of process()
+
+        Yields {"type": "chunk", "delta": str} as text becomes available and
+        finishes with {"type": "done", "response": <process() result>}.
+        Providers without native streaming replay their full response.
+        """
+        response = self.process(query, context or {})
+        for delta in self._chunk_text(response.get("content", "")):
+            yield {"type": "chunk", "delta": delta}
+        yield {"type": "done", "response": response}
+
     def validate_response(self, response: Dict[str, Any]) -> bool:
         """Validate API response structure"""
         required = ['content', 'model']
@@ -23,6 +66,40 @@ class BaseProvider(ABC):
         tokens = response.get('usage', {}).get('total_tokens', 0)
         self.log.debug(f"Used {tokens} tokens")
 
+    def _chat_completion(self, model: str, messages: List[Dict[str, str]],
+                         **params: Any) -> Dict[str, Any]:
+        """Blocking _achat_completion, for process() on worker threads"""
+        response = self.sync_http.post(
+            "/chat/completions",
+            json={"model": model, "messages": messages, **params}
+        )
+        response.raise_for_status()
+        return self._parse_completion(response.json(), model)
+
+    async def _achat_completion(self, model: str, messages: List[Dict[str, str]],
+                                **params: Any) -> Dict[str, Any]:
+        """POST an OpenAI-style chat completion over the shared pool"""
+        response = await self.http.post(
+            "/chat/completions",
+            json={"model": model, "messages": messages, **params}
+        )
+        response.raise_for_status()
+        return self._parse_completion(response.json(), model)
+
+    @staticmethod
+    def _parse_completion(data: Dict[str, Any], model: str) -> Dict[str, Any]:
+        return {
+            "id": data.get("id"),
+            "content": data["choices"][0]["message"]["content"],
+            "usage": data.get("usage", {"total_tokens": 0}),
+            "model": data.get("model", model)
+        }
+
+    @staticmethod
+    def _chunk_text(text: str) -> Iterator[str]:
+        """Word-sized deltas that concatenate back to `text`"""
+        return iter(re.findall(r"\s*\S+", text))
+
     def _build_context_str(self, context: Dict[str, Any]) -> str:
         """Serialize context for prompts"""
         return str(context)[:500]  # Limit context size
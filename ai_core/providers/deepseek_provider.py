@@ -4,20 +4,47 @@ from .base_provider import BaseProvider
 
 class DeepSeekProvider(BaseProvider):
     def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("deepseek")
+        super().__init__("deepseek", config)
         self.model = config.get("model", "deepseek-v2") if config else "deepseek-v2"
         self.log.info(f"DeepSeek provider initialized (model: {self.model})")
 
     def process(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process query using DeepSeek-style response"""
         try:
+            if self.base_url:
+                # Same endpoint and pool settings as aprocess(), via the sync client
+                response = self._chat_completion(self.model, [{"role": "user", "content": query}])
+                return self._format_response(response, context or {})
             # Mock API call
-            return {
-                "content": f"DeepSeek analysis of: {query}",
-                "style": "technical",
-                "confidence": 0.92,
-                "context_used": context.get('technical_context', []) if context else []
-            }
+            return self._format_response(
+                {"model": self.model, "content": f"DeepSeek analysis of: {query}"}, context or {}
+            )
         except Exception as e:
             self.log.error(f"DeepSeek processing failed: {e}")
             return {"error": str(e)}
+
+    async def aprocess(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Non-blocking completion over the shared connection pool"""
+        context = context or {}
+        if not self.base_url:
+            return await super().aprocess(query, context)
+        try:
+            response = await self._achat_completion(
+                self.model,
+                [{"role": "user", "content": query}]
+            )
+            return self._format_response(response, context)
+        except Exception as e:
+            self.log.error(f"DeepSeek processing failed: {e}")
+            return {"error": str(e)}
+
+    def _format_response(self, response: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Standardize response format"""
+        return {
+            "source": "deepseek",
+            "model": response["model"],
+            "content": response["content"],
+            "style": "technical",
+            "confidence": 0.92,
+            "context_used": context.get('technical_context', [])
+        }
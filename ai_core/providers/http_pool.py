@@ -0,0 +1,85 @@
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class ProviderPools:
+    """Shared keep-alive HTTP clients, one connection pool per provider
+
+    Providers register their endpoint settings with configure(); the
+    async clients are opened by start() at application startup (or lazily
+    on first use) and closed by aclose() at shutdown. Sync callers such as
+    the connectors get a matching httpx.Client per provider.
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name: str, base_url: str = "", max_connections: int = 20,
+                  max_keepalive: int = 10, keepalive_expiry: float = 30.0,
+                  http2: bool = False, timeout: float = 10.0,
+                  headers: Optional[Dict[str, str]] = None):
+        """Register (or replace) a provider's pool settings"""
+        if http2 and not HTTP2_AVAILABLE:
+            self.log.warning(f"HTTP/2 requested for {name} but h2 is not installed; using HTTP/1.1")
+            http2 = False
+        self._configs[name] = {
+            "base_url": base_url,
+            "limits": httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry),
+            "http2": http2,
+            "timeout": timeout,
+            "headers": headers or {}
+        }
+
+    def client(self, name: str) -> httpx.AsyncClient:
+        """The provider's shared async client"""
+        with self._lock:
+            if name not in self._async or self._async[name].is_closed:
+                self._async[name] = httpx.AsyncClient(**self._settings(name))
+            return self._async[name]
+
+    def sync_client(self, name: str) -> httpx.Client:
+        """The provider's shared sync client"""
+        with self._lock:
+            if name not in self._sync or self._sync[name].is_closed:
+                self._sync[name] = httpx.Client(**self._settings(name))
+            return self._sync[name]
+
+    async def start(self, names: Optional[Iterable[str]] = None):
+        """Open async clients for every configured provider"""
+        for name in names or list(self._configs):
+            self.client(name)
+        self.log.info(f"Opened HTTP pools: {sorted(self._async)}")
+
+    async def aclose(self):
+        """Close every client; later calls reopen them lazily"""
+        with self._lock:
+            clients, self._async = self._async, {}
+        for client in clients.values():
+            await client.aclose()
+        self.close_sync()
+
+    def close_sync(self):
+        with self._lock:
+            clients, self._sync = self._sync, {}
+        for client in clients.values():
+            client.close()
+
+    def _settings(self, name: str) -> Dict[str, Any]:
+        if name not in self._configs:
+            self.configure(name)
+        return dict(self._configs[name])
+
+provider_pools = ProviderPools()
@@ -1,21 +1,19 @@
 import logging
-from typing import Dict, Any
-import backoff
+from typing import Dict, Any, Iterator
 from .base_provider import BaseProvider
 
 class OpenAIProvider(BaseProvider):
     def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("openai")
+        super().__init__("openai", config)
         self.model = config.get("model", "gpt-4-turbo") if config else "gpt-4-turbo"
         self.max_tokens = config.get("max_tokens", 2000) if config else 2000
         self.temperature = config.get("temperature", 0.7) if config else 0.7
         self._init_client()
 
     def _init_client(self):
-        """Initialize client with retry logic"""
+        """Initialize client; failures are handled by the router's circuit breaker"""
         self.client = self._mock_client()  # Replace with actual OpenAI client
 
-    @backoff.on_exception(backoff.expo, Exception, max_tries=3)
     def process(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Enhanced processing with:
         - Rate limit handling
@@ -25,19 +23,74 @@ class OpenAIProvider(BaseProvider):
         try:
             prompt = self._build_prompt(query, context or {})
             
-            # Mock response - replace with actual API call
+            if self.base_url:
+                # Same endpoint and pool settings as aprocess(), via the sync client
+                response = self._chat_completion(
+                    self.model,
+                    [{"role": "user", "content": prompt}],
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature
+                )
+            else:
+                # Mock response - replace with actual API call
+                response = {
+                    "id": "mock_resp_123",
+                    "content": f"OpenAI({self.model}): {query}",
+                    "usage": {"total_tokens": len(query.split())},
+                    "model": self.model
+                }
+            
+            return self._format_response(response, context or {})
+            
+        except Exception as e:
+            self.log.error(f"OpenAI processing failed: {e}")
+            return self._fallback_response(query, e)
+
+    async def aprocess(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Non-blocking completion over the shared connection pool"""
+        context = context or {}
+        if not self.base_url:
+            return await super().aprocess(query, context)
+        try:
+            prompt = self._build_prompt(query, context)
+            response = await self._achat_completion(
+                self.model,
+                [{"role": "user", "content": prompt}],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+            return self._format_response(response, context)
+        except Exception as e:
+            self.log.error(f"OpenAI processing failed: {e}")
+            return self._fallback_response(query, e)
+
+    def stream(self, query: str, context: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """Yield content deltas as the completion is generated"""
+        context = context or {}
+        if self.base_url:
+            # No native streaming over the pool yet; replay process()
+            yield from super().stream(query, context)
+            return
+        try:
+            prompt = self._build_prompt(query, context)
+            
+            # Mock stream - replace with the client's stream=True completion
+            content = ""
+            for delta in self._chunk_text(f"OpenAI({self.model}): {query}"):
+                content += delta
+                yield {"type": "chunk", "delta": delta}
+            
             response = {
                 "id": "mock_resp_123",
-                "content": f"OpenAI({self.model}): {query}",
+                "content": content,
                 "usage": {"total_tokens": len(query.split())},
                 "model": self.model
             }
-            
-            return self._format_response(response, context or {})
+            yield {"type": "done", "response": self._format_response(response, context)}
             
         except Exception as e:
-            self.log.error(f"OpenAI processing failed: {e}")
-            return self._fallback_response(query, e)
+            self.log.error(f"OpenAI streaming failed: {e}")
+            yield {"type": "done", "response": self._fallback_response(query, e)}
 
     def _build_prompt(self, query: str, context: Dict[str, Any]) -> str:
         """Build context-aware prompt"""
@@ -0,0 +1,161 @@
+import time
+import threading
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+from shared.keyword_matcher import KeywordMatcher, keyword_matcher
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+HINT_TABLE = "provider_hints"
+
+class ProviderStats:
+    """EWMA latency/error rate and circuit breaker for one provider
+
+    The breaker opens after `failure_threshold` consecutive failures, or
+    once the error-rate EWMA passes `error_threshold`. While open, calls
+    fail fast; after `cooldown` seconds one probe call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, alpha: float = 0.2, failure_threshold: int = 5,
+                 error_threshold: float = 0.5, min_calls: int = 10, cooldown: float = 30.0):
+        self.name = name
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.samples: deque = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Whether a call may go out now; claims the probe slot when half-open"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def available(self, now: Optional[float] = None) -> bool:
+        """allow() without claiming the probe slot"""
+        now = time.monotonic() if now is None else now
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return now - self.opened_at >= self.cooldown
+        return not self.probe_in_flight
+
+    def record(self, latency: float, success: bool, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.calls += 1
+            self.samples.append(latency)
+            self.latency = latency if self.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * self.latency
+            )
+            self.error_rate = self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * self.error_rate
+            if success:
+                self.consecutive_failures = 0
+                if self.state == HALF_OPEN:
+                    self.state = CLOSED
+                    self.error_rate = 0.0
+            else:
+                self.consecutive_failures += 1
+                if self.state == HALF_OPEN or self._should_trip():
+                    self.state = OPEN
+                    self.opened_at = now
+            if self.state != HALF_OPEN:
+                self.probe_in_flight = False
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "calls": self.calls,
+            "p95": self.p95()
+        }
+
+    def _should_trip(self) -> bool:
+        return (self.consecutive_failures >= self.failure_threshold
+                or (self.calls >= self.min_calls and self.error_rate >= self.error_threshold))
+
+class AdaptiveRouter:
+    """Orders providers by a cost/latency score
+
+    score = latency_weight * EWMA latency (s)
+          + cost_weight * cost per call
+          + error_weight * EWMA error rate
+          - hint_bonus if the query's keyword hint names the provider
+
+    Lower is better. Providers with an open circuit are left out, so an
+    outage costs a dictionary lookup rather than a timed-out call.
+    """
+
+    def __init__(self, providers: Iterable[Any], costs: Optional[Dict[str, float]] = None,
+                 hints: Optional[Dict[str, List[str]]] = None, latency_weight: float = 1.0,
+                 cost_weight: float = 1.0, error_weight: float = 2.0, hint_bonus: float = 0.5,
+                 default_latency: float = 1.0, **breaker_options: Any):
+        self.log = logging.getLogger(__name__)
+        self.providers = {p.provider_name: p for p in providers}
+        self.costs = costs or {}
+        # Explicit hints get their own table; otherwise config/keyword_tables.json
+        self.matcher = (KeywordMatcher.from_keywords(HINT_TABLE, hints)
+                        if hints is not None else keyword_matcher())
+        self.latency_weight = latency_weight
+        self.cost_weight = cost_weight
+        self.error_weight = error_weight
+        self.hint_bonus = hint_bonus
+        self.default_latency = default_latency
+        self.stats = {name: ProviderStats(name, **breaker_options) for name in self.providers}
+
+    def rank(self, query: str) -> List[Any]:
+        """Available providers, best score first"""
+        hinted = self.hint(query)
+        now = time.monotonic()
+        available = [name for name, stats in self.stats.items() if stats.available(now)]
+        return [self.providers[name] for name in sorted(available, key=lambda n: self.score(n, hinted))]
+
+    def score(self, name: str, hinted: Optional[str] = None) -> float:
+        stats = self.stats[name]
+        latency = self.default_latency if stats.latency is None else stats.latency
+        score = (self.latency_weight * latency
+                 + self.cost_weight * self.costs.get(name, 0.0)
+                 + self.error_weight * stats.error_rate)
+        if name == hinted:
+            score -= self.hint_bonus
+        return score
+
+    def hint(self, query: str) -> Optional[str]:
+        """Provider suggested by keywords in the query, if any"""
+        return self.matcher.classify(query, HINT_TABLE)
+
+    def allow(self, name: str) -> bool:
+        return self.stats[name].allow()
+
+    def record(self, name: str, latency: float, success: bool):
+        previous = self.stats[name].state
+        self.stats[name].record(latency, success)
+        if self.stats[name].state != previous:
+            self.log.warning(f"Circuit for {name}: {previous} -> {self.stats[name].state}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
@@ -0,0 +1,69 @@
+import logging
+from typing import Any, Callable, Dict, Optional
+from fastapi import Depends, HTTPException
+from starlette.requests import HTTPConnection
+from ai_core import APIOrchestrator
+from engine import SlickLogicEngine
+from memory import MemoryBank
+
+class EngineRegistry:
+    """Application-scoped memory and engine, built once per process"""
+
+    def __init__(self, memory_factory: Callable[[], Any] = MemoryBank,
+                 engine_factory: Callable[..., SlickLogicEngine] = SlickLogicEngine,
+                 config: Optional[Dict[str, Any]] = None,
+                 orchestrator_factory: Optional[Callable[[], Any]] = APIOrchestrator):
+        self.log = logging.getLogger(__name__)
+        self.memory_factory = memory_factory
+        self.engine_factory = engine_factory
+        self.config = config or {}
+        # None answers from the local personality engine only (offline, tests)
+        self.orchestrator_factory = orchestrator_factory
+        self.memory = None
+        self.orchestrator = None
+        self.engine: Optional[SlickLogicEngine] = None
+        self.ready = False
+
+    def startup(self):
+        """Build and warm up the engine; blocking, run off the event loop"""
+        self.memory = self.memory_factory()
+        if self.orchestrator_factory is not None:
+            self.orchestrator = self.orchestrator_factory()
+        self.engine = self.engine_factory(self.memory, self.config,
+                                          orchestrator=self.orchestrator)
+        self.engine.warmup()
+        self.ready = True
+        self.log.info("Engine registry ready")
+
+    def shutdown(self):
+        """Flush memory and release resources"""
+        self.ready = False
+        if self.engine is not None and self.engine.executor is not None:
+            self.engine.executor.shutdown(wait=True)
+        if self.orchestrator is not None:
+            self.orchestrator.executor.shutdown(wait=False)
+        if self.engine is not None:
+            try:
+                # Fits queued feedback and stops the learning worker
+                self.engine.learning_engine.close()
+            except Exception as e:
+                self.log.error(f"Learning engine close failed on shutdown: {e}")
+        if self.memory is not None and hasattr(self.memory, "close"):
+            try:
+                self.memory.close()
+            except Exception as e:
+                self.log.error(f"Memory flush failed on shutdown: {e}")
+        self.log.info("Engine registry shut down")
+
+def get_registry(connection: HTTPConnection) -> EngineRegistry:
+    return connection.app.state.registry
+
+def get_engine(registry: EngineRegistry = Depends(get_registry)) -> SlickLogicEngine:
+    if not registry.ready:
+        raise HTTPException(503, detail="Engine is starting up")
+    return registry.engine
+
+def get_memory(registry: EngineRegistry = Depends(get_registry)):
+    if not registry.ready:
+        raise HTTPException(503, detail="Engine is starting up")
+    return registry.memory
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+import json
 import logging
 from engine import SlickLogicEngine
-from memory import MemoryBank
+from ai_core.middleware.response_cache import cache_directive
+from ..dependencies import get_engine
 
 router = APIRouter()
 log = logging.getLogger(__name__)
@@ -13,17 +16,23 @@ class ChatRequest(BaseModel):
     mode: Optional[str] = "balanced"
     context: Optional[dict] = None
 
+def _user_context(request: ChatRequest, http_request: Request) -> dict:
+    """Request context plus any response-cache directive from the headers"""
+    context = dict(request.context or {})
+    directive = cache_directive(dict(http_request.headers))
+    if directive:
+        context["cache"] = directive
+    return context
+
 @router.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request,
+                        engine: SlickLogicEngine = Depends(get_engine)):
     """Main chat API endpoint"""
     try:
-        # Get engine instance (would be dependency injected in real app)
-        engine = SlickLogicEngine(MemoryBank())
-        engine.set_personality_mode(request.mode)
-        
-        response = engine.process_query(
+        response = await engine.aprocess_query(
             request.message,
-            request.context or {}
+            _user_context(request, http_request),
+            mode=request.mode
         )
         
         if response["status"] == "error":
@@ -34,6 +43,27 @@ async def chat_endpoint(request: ChatRequest):
             "context": response["context"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         log.error(f"Chat error: {e}")
         raise HTTPException(500, detail=str(e))
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request,
+                               engine: SlickLogicEngine = Depends(get_engine)):
+    """Server-sent events variant of /chat
+
+    Emits one `data:` event per frame: {"type": "chunk", "delta"} while the
+    answer is generated, then a final {"type": "done"} or {"type": "error"}.
+    """
+    async def events():
+        async for frame in engine.astream_query(
+            request.message,
+            _user_context(request, http_request),
+            mode=request.mode
+        ):
+            yield f"data: {json.dumps(frame, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
@@ -1,7 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 import logging
 from engine import SlickLogicEngine
+from ..dependencies import EngineRegistry, get_engine, get_registry
 
 router = APIRouter()
 log = logging.getLogger(__name__)
@@ -10,10 +11,9 @@ class SystemMode(BaseModel):
     mode: str
 
 @router.post("/system/mode")
-async def set_mode(request: SystemMode):
+async def set_mode(request: SystemMode, engine: SlickLogicEngine = Depends(get_engine)):
     """Change system personality mode"""
     try:
-        engine = SlickLogicEngine()  # Would be dependency injected
         engine.set_personality_mode(request.mode)
         return {"status": "success", "mode": request.mode}
     except ValueError as e:
@@ -23,9 +23,12 @@ async def set_mode(request: SystemMode):
         raise HTTPException(500, detail="Internal server error")
 
 @router.get("/system/status")
-async def get_status():
+async def get_status(registry: EngineRegistry = Depends(get_registry)):
     """Get system health status"""
-    return {
-        "status": "operational",
+    status = {
+        "status": "operational" if registry.ready else "starting",
         "components": ["engine", "memory", "api"]
     }
+    if registry.ready:
+        status["coalescing"] = registry.engine.get_coalescing_stats()
+    return status
@@ -1,27 +1,40 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
-from typing import Dict, Any
-from engine import SlickLogicEngine
-from memory import MemoryBank
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+from ai_core.providers.http_pool import provider_pools
+from .dependencies import EngineRegistry
 
 class APIServer:
-    def __init__(self):
+    def __init__(self, registry: Optional[EngineRegistry] = None):
+        self.log = logging.getLogger(__name__)
+        # Core systems are built once, at startup, and shared by all handlers
+        self.registry = registry or EngineRegistry()
         self.app = FastAPI(
             title="Slick AI API",
             version="2.1.0",
-            description="API for Slick AI System"
+            description="API for Slick AI System",
+            lifespan=self._lifespan
         )
+        self.app.state.registry = self.registry
         self._setup_middleware()
         self._setup_routes()
-        self.log = logging.getLogger(__name__)
-        
-        # Initialize core systems
-        self.memory = MemoryBank()
-        self.engine = SlickLogicEngine(self.memory)
         
         self.log.info("API Server initialized")
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Warm the engine before serving and flush memory on exit"""
+        await provider_pools.start()
+        await asyncio.to_thread(self.registry.startup)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(self.registry.shutdown)
+            await provider_pools.aclose()
+
     def _setup_middleware(self):
         """Configure API middleware"""
         self.app.add_middleware(
@@ -1,63 +1,169 @@
 import json
-from fastapi import WebSocket
-from typing import Dict, Any
+import asyncio
+from fastapi import Depends, WebSocket, WebSocketDisconnect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 import logging
 from engine import SlickLogicEngine
-from memory import MemoryBank
-from concurrent.futures import ThreadPoolExecutor
+from ..dependencies import get_engine
 
 log = logging.getLogger(__name__)
-executor = ThreadPoolExecutor(max_workers=4)
 
 class ConnectionManager:
-    def __init__(self):
+    """Tracks clients and runs their queries through a bounded work queue
+
+    Each client may have at most `max_in_flight` queries pending. All
+    queries share one queue of `queue_size` slots drained by `workers`
+    tasks; when either limit is hit the message is rejected straight away
+    with a retryable error rather than blocking the client's reader, so
+    heartbeats and new connections are still served under load.
+    """
+
+    def __init__(self, max_in_flight: int = 2, queue_size: int = 64, workers: int = 4):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.engine = SlickLogicEngine(MemoryBank())
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.workers = workers
+        self.in_flight: Dict[str, int] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
         self.active_connections[client_id] = websocket
+        self.in_flight[client_id] = 0
+        self._ensure_workers()
         log.info(f"Client {client_id} connected")
 
     def disconnect(self, client_id: str):
         if client_id in self.active_connections:
             del self.active_connections[client_id]
+            self.in_flight.pop(client_id, None)
             log.info(f"Client {client_id} disconnected")
 
-    async def process_message(self, client_id: str, data: Dict[str, Any]):
-        """Process message in background thread"""
-        def _process():
+    async def process_message(self, client_id: str, data: Dict[str, Any], engine: SlickLogicEngine):
+        """Queue a query and wait for its result without blocking the loop"""
+        return await self._submit(client_id, lambda: engine.aprocess_query(
+            data["message"],
+            data.get("context", {}),
+            mode=data.get("mode")
+        ))
+
+    async def stream_message(self, client_id: str, data: Dict[str, Any], engine: SlickLogicEngine,
+                             send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Queue a streamed query; frames are sent as they are produced
+
+        Returns None once the stream is sent, or an error dict if the query
+        was rejected or failed.
+        """
+        async def run():
+            async for frame in engine.astream_query(
+                data["message"],
+                data.get("context", {}),
+                mode=data.get("mode")
+            ):
+                await send(frame)
+
+        return await self._submit(client_id, run)
+
+    async def _submit(self, client_id: str, job: Callable[[], Awaitable[Any]]):
+        if self.in_flight.get(client_id, 0) >= self.max_in_flight:
+            return {"error": "Too many requests in flight", "retry": True}
+        self._ensure_workers()
+        if self._queue.full():
+            return {"error": "Server busy", "retry": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((future, job))
+        self.in_flight[client_id] = self.in_flight.get(client_id, 0) + 1
+        try:
+            return await future
+        finally:
+            if client_id in self.in_flight:
+                self.in_flight[client_id] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.active_connections),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "in_flight": sum(self.in_flight.values())
+        }
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queue and workers belong to one event loop; rebuild on a new one
+            self._loop = loop
+            self._queue = asyncio.Queue(self.queue_size)
+            self._worker_tasks = []
+        self._worker_tasks = [t for t in self._worker_tasks if not t.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            future, job = await self._queue.get()
             try:
-                response = self.engine.process_query(
-                    data["message"],
-                    data.get("context", {})
-                )
-                return response
+                if future.cancelled():
+                    continue
+                response = await job()
             except Exception as e:
                 log.error(f"Processing error: {e}")
-                return {"error": str(e)}
-
-        future = executor.submit(_process)
-        return future.result()
+                response = {"error": str(e)}
+            finally:
+                self._queue.task_done()
+            if not future.done():
+                future.set_result(response)
 
 manager = ConnectionManager()
 
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, engine: SlickLogicEngine = Depends(get_engine)):
     client_id = f"client_{id(websocket)}"
     await manager.connect(websocket, client_id)
+    send_lock = asyncio.Lock()
+    tasks: Set[asyncio.Task] = set()
+
+    async def send(payload: Dict[str, Any]):
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    async def handle(message: Dict[str, Any]):
+        tag = {"id": message["id"]} if "id" in message else {}
+        try:
+            if message.get("stream"):
+                # Partial frames: {"type": "chunk", "delta"}... then {"type": "done"}
+                response = await manager.stream_message(
+                    client_id, message, engine, lambda frame: send({**frame, **tag})
+                )
+                if response is None:
+                    return
+            else:
+                response = await manager.process_message(client_id, message, engine)
+            await send({**response, **tag})
+        except Exception as e:
+            log.error(f"WebSocket error: {e}")
+            await send({"error": str(e)})
     
     try:
         while True:
             data = await websocket.receive_text()
             try:
                 message = json.loads(data)
-                response = await manager.process_message(client_id, message)
-                await websocket.send_json(response)
             except json.JSONDecodeError:
-                await websocket.send_json({"error": "Invalid JSON"})
-            except Exception as e:
-                log.error(f"WebSocket error: {e}")
-                await websocket.send_json({"error": str(e)})
+                await send({"error": "Invalid JSON"})
+                continue
+            if message.get("type") == "ping":
+                await send({"type": "pong"})
+                continue
+            # Queries run as tasks so this loop keeps reading heartbeats
+            task = asyncio.create_task(handle(message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
                 
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Any exit from the reader, not only a clean disconnect, releases the client
+        for task in list(tasks):
+            task.cancel()
         manager.disconnect(client_id)
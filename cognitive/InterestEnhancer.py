@@ -1,5 +1,6 @@
 import numpy as np
 from typing import Dict, Any
+from shared.keyword_matcher import keyword_matcher
 
 class InterestEnhancer:
     def __init__(self):
@@ -21,17 +22,8 @@ class InterestEnhancer:
         }
 
     def _detect_interest(self, query: str) -> str:
-        """Simple interest detection"""
-        query = query.lower()
-        if any(t in query for t in ["code", "tech", "computer"]):
-            return "technology"
-        elif any(s in query for s in ["science", "physics", "math"]):
-            return "science"
-        elif any(a in query for a in ["art", "paint", "music"]):
-            return "art"
-        elif any(h in query for h in ["joke", "funny", "homer"]):
-            return "humor"
-        return "general"
+        """Interest from the "interest" keyword table"""
+        return keyword_matcher().classify(query, "interest")
 
     def _is_homer_mode(self) -> bool:
         """Check if in Homer mode (simplified)"""
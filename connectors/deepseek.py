@@ -1,9 +1,10 @@
-import requests
+import httpx
 import json
 import socket
 from pathlib import Path
 from datetime import datetime
 from config import settings
+from ai_core.providers.http_pool import provider_pools
 import time
 
 class DeepSeekConnector:
@@ -11,6 +12,8 @@ class DeepSeekConnector:
         self.endpoint = "https://api.deepseek.ai/v1"
         self.max_retries = 2
         self.timeout = 5
+        # Shared keep-alive pool; repeated syncs reuse the same connection
+        self.http = provider_pools.sync_client("deepseek")
         self.local_backup_dir = Path(settings.PROJECT_ROOT) / "sessions" / "pending_sync"
         self.local_backup_dir.mkdir(parents=True, exist_ok=True)
         self.valid_dns = False
@@ -34,7 +37,7 @@ class DeepSeekConnector:
                 
             backup_path = self._store_locally(session_file)['path']
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.endpoint}/session/sync",
                 json={"session_data": session_content},
                 headers={
@@ -48,7 +51,7 @@ class DeepSeekConnector:
             Path(backup_path).unlink()  # Remove backup after successful sync
             return response.json()
             
-        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
             print(f"⚠️ Sync failed: {str(e)}")
             return {
                 "status": "error",
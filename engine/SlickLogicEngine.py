@@ -1,14 +1,24 @@
+import re
+import copy
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Iterable, Iterator, Optional
 from datetime import datetime
 from .subsystems import PersonalityEngine, MemoryInterface, LearningEngine
-from .utils import ContextBuilder, PerformanceMonitor
+from .utils import ContextBuilder, PerformanceMonitor, SingleFlight, flight_key
 
 class SlickLogicEngine:
-    def __init__(self, memory, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, memory, config: Optional[Dict[str, Any]] = None, orchestrator=None):
         self.log = logging.getLogger(__name__)
         self.memory = memory
         self.config = config or {}
+        # Optional APIOrchestrator; when set, streamed answers come from the providers
+        self.orchestrator = orchestrator
+        # None runs async queries on the event loop's default executor
+        workers = self.config.get("worker_threads")
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers else None
         self._init_subsystems()
         self.log.info("Enhanced Logic Engine initialized")
 
@@ -18,50 +28,233 @@ class SlickLogicEngine:
             mode=self.config.get("personality_mode", "balanced")
         )
         self.memory_interface = MemoryInterface(self.memory)
-        self.learning_engine = LearningEngine()
+        self.learning_engine = LearningEngine(**(self.config.get("learning") or {}))
         self.context_builder = ContextBuilder()
         self.monitor = PerformanceMonitor()
+        # Identical concurrent queries share one context build + response
+        self.flights = SingleFlight()
 
     @PerformanceMonitor().track
-    def process_query(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Enhanced processing pipeline with monitoring"""
+    def process_query(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                      mode: Optional[str] = None) -> Dict[str, Any]:
+        """Enhanced processing pipeline with monitoring
+
+        `mode` applies to this query only; the engine's mode is unchanged.
+        A query identical (after normalization) to one already in flight
+        waits for that one and shares its answer; each request gets its own
+        copy of it and the interaction is still stored once per request.
+        """
         try:
+            mode = self.personality.resolve_mode(mode)
             # Track mode usage
-            self.monitor.record_mode_usage(self.personality.mode)
+            self.monitor.record_mode_usage(mode)
+            
+            # Build context and process with personality, once per burst
+            # Copied so coalesced callers cannot mutate each other's result
+            context, processed = copy.deepcopy(self.flights.do(
+                flight_key(query, mode, user_context),
+                functools.partial(self._compute, query, user_context, mode)
+            ))
+            
+            return self._finish(query, mode, context, processed)
             
-            # Build context
+        except Exception as e:
+            self.log.error(f"Processing failed: {e}")
+            return self._error(e)
+
+    async def aprocess_query(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                             mode: Optional[str] = None) -> Dict[str, Any]:
+        """process_query for async callers
+
+        NLP, retrieval and storage are CPU/IO bound, so the pipeline runs on
+        a worker thread and the event loop stays free while it does.
+        Duplicates of an in-flight query await it without taking a thread.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            mode = self.personality.resolve_mode(mode)
+            self.monitor.record_mode_usage(mode)
+            key = flight_key(query, mode, user_context)
+            future, leader = self.flights.claim(key)
+            if leader:
+                loop.run_in_executor(
+                    self.executor, self.flights.run, key, future,
+                    functools.partial(self._compute, query, user_context, mode)
+                )
+            # shield: a cancelled waiter must not cancel the shared computation
+            context, processed = copy.deepcopy(await asyncio.shield(asyncio.wrap_future(future)))
+            return await loop.run_in_executor(
+                self.executor, self._finish, query, mode, context, processed
+            )
+        except Exception as e:
+            self.log.error(f"Processing failed: {e}")
+            return self._error(e)
+
+    def _compute(self, query: str, user_context: Optional[Dict[str, Any]], mode: str):
+        """The shareable part of a query: context and personality response"""
+        context = self.context_builder.build(
+            query=query,
+            memory=self.memory_interface,
+            user_context=user_context or {}
+        )
+        return context, self._respond(query, context, mode)
+
+    def _respond(self, query: str, context: Dict[str, Any], mode: str) -> Dict[str, Any]:
+        """Answer from the orchestrator when one is set, else the personality engine"""
+        if self.orchestrator is not None:
+            result = self.orchestrator.route_query(query, self._routing_context(context, mode))
+            if result["status"] == "error":
+                raise RuntimeError(result.get("message", "Routing failed"))
+            return result["response"]
+        return self.personality.process(query, context, mode)
+
+    @staticmethod
+    def _routing_context(context: Dict[str, Any], mode: str) -> Dict[str, Any]:
+        # Cache directives travel in the user context (see api chat headers)
+        directive = (context.get("user") or {}).get("cache")
+        return {**context, "mode": mode, "cache": directive}
+
+    def _finish(self, query: str, mode: str, context: Dict[str, Any],
+                processed: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-request tail: store the interaction and shape the result"""
+        self.memory_interface.store_interaction(
+            query=query,
+            response=processed,
+            context=context,
+            mode=mode
+        )
+        return {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "query": query,
+            "response": processed,
+            "context": context
+        }
+
+    @staticmethod
+    def _error(e: Exception) -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "message": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def process_queries(self, queries: Iterable[str], user_context: Optional[Dict[str, Any]] = None,
+                        mode: Optional[str] = None, batch_size: int = 64,
+                        n_process: int = 1) -> Iterator[Dict[str, Any]]:
+        """Batch process_query for offline jobs (re-indexing, log replay)
+
+        A generator: results come out in input order while the input is
+        still being read, with NLP batched through ContextBuilder.build_many.
+        A failing query yields an error result and the batch carries on.
+        """
+        try:
+            mode = self.personality.resolve_mode(mode)
+        except Exception as e:
+            self.log.error(f"Batch processing failed: {e}")
+            yield self._error(e)
+            return
+        contexts = self.context_builder.build_many(
+            queries, self.memory_interface, user_context,
+            batch_size=batch_size, n_process=n_process
+        )
+        for context in contexts:
+            try:
+                self.monitor.record_mode_usage(mode)
+                processed = self._respond(context["query"], context, mode)
+                yield self._finish(context["query"], mode, context, processed)
+            except Exception as e:
+                self.log.error(f"Processing failed: {e}")
+                yield self._error(e)
+
+    def stream_query(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                     mode: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Streaming process_query
+
+        Yields {"type": "chunk", "delta": str} frames, then one
+        {"type": "done", ...} frame shaped like process_query's result.
+        Its "replaces_stream" is True when the final response differs from
+        the streamed text (the orchestrator blended in another provider).
+        The interaction is stored once, after the last chunk; a stream
+        abandoned midway is not stored.
+        """
+        try:
+            mode = self.personality.resolve_mode(mode)
+            self.monitor.record_mode_usage(mode)
             context = self.context_builder.build(
                 query=query,
                 memory=self.memory_interface,
                 user_context=user_context or {}
             )
-            
-            # Process with personality
-            processed = self.personality.process(query, context)
-            
-            # Store interaction
+
+            processed = None
+            replaces_stream = False
+            for chunk in self._stream_response(query, context, mode):
+                if chunk["type"] == "done":
+                    processed = chunk["response"]
+                    replaces_stream = bool(chunk.get("replaces_stream"))
+                elif chunk["type"] == "error":
+                    raise RuntimeError(chunk.get("message", "Streaming failed"))
+                else:
+                    yield {"type": "chunk", "delta": chunk["delta"]}
+
             self.memory_interface.store_interaction(
                 query=query,
                 response=processed,
-                context=context
+                context=context,
+                mode=mode
             )
-            
-            return {
+            yield {
+                "type": "done",
                 "status": "success",
                 "timestamp": datetime.now().isoformat(),
                 "query": query,
                 "response": processed,
+                "replaces_stream": replaces_stream,
                 "context": context
             }
-            
+
         except Exception as e:
-            self.log.error(f"Processing failed: {e}")
-            return {
+            self.log.error(f"Streaming failed: {e}")
+            yield {
+                "type": "error",
                 "status": "error",
                 "message": str(e),
                 "timestamp": datetime.now().isoformat()
             }
 
+    async def astream_query(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                            mode: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """stream_query for async callers; each step runs on a worker thread"""
+        loop = asyncio.get_running_loop()
+        frames = self.stream_query(query, user_context, mode)
+        try:
+            while True:
+                frame = await loop.run_in_executor(self.executor, next, frames, None)
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            await loop.run_in_executor(self.executor, frames.close)
+
+    def _stream_response(self, query: str, context: Dict[str, Any], mode: str) -> Iterator[Dict[str, Any]]:
+        if self.orchestrator is not None:
+            yield from self.orchestrator.stream_query(query, self._routing_context(context, mode))
+            return
+        processed = self.personality.process(query, context, mode)
+        for delta in re.findall(r"\s*\S+", str(processed.get("content", ""))):
+            yield {"type": "chunk", "delta": delta}
+        yield {"type": "done", "response": processed}
+
+    def warmup(self):
+        """Load the NLP pipeline once so the first real query is fast
+
+        Memory is left alone: a warmup must not count as an access or
+        write anything to the store.
+        """
+        self.context_builder.warmup()
+        self.log.info("Engine warmed up")
+
     def set_personality_mode(self, mode: str):
         """Change personality mode with validation"""
         self.personality.set_mode(mode)
@@ -71,6 +264,10 @@ class SlickLogicEngine:
         """Get system performance metrics"""
         return self.monitor.get_report()
 
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """Single-flight counters: leaders ran a query, coalesced shared one"""
+        return self.flights.get_stats()
+
     def provide_feedback(self, feedback: Dict[str, Any]):
         """Learn from user feedback"""
         self.learning_engine.process_feedback(feedback)
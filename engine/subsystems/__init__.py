@@ -1,3 +1,5 @@
 from .personality_engine import PersonalityEngine
 from .memory_interface import MemoryInterface
-__all__ = ['PersonalityEngine', 'MemoryInterface']
+from .interaction_record import InteractionRecord
+from .learning_engine import LearningEngine
+__all__ = ['PersonalityEngine', 'MemoryInterface', 'InteractionRecord', 'LearningEngine']
@@ -0,0 +1,89 @@
+import sys
+from array import array
+from typing import Dict, Any, Iterable, Optional
+
+DEFAULT_FIELD_CAPS = {"query": 2000, "content": 4000}
+
+class InteractionRecord:
+    """Fixed-shape interaction stored in memory
+
+    Recalled memories are kept as entry ids in a compact int array
+    rather than embedded copies, and the small set of mode/intent/style
+    values is interned so records share one string object each.
+    """
+    __slots__ = ("query", "mode", "intent", "style", "content", "recalled", "timestamp")
+
+    def __init__(self, query: str, mode: str, intent: str, style: str, content: str,
+                 recalled: Iterable[int], timestamp: str,
+                 field_caps: Optional[Dict[str, int]] = None):
+        caps = DEFAULT_FIELD_CAPS if field_caps is None else field_caps
+        self.query = _cap(query, caps.get("query"))
+        self.mode = sys.intern(mode or "")
+        self.intent = sys.intern(intent or "")
+        self.style = sys.intern(style or "")
+        self.content = _cap(content, caps.get("content"))
+        self.recalled = array("q", recalled)
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_interaction(cls, query: str, response: Dict[str, Any], context: Dict[str, Any],
+                         mode: str, timestamp: str,
+                         field_caps: Optional[Dict[str, int]] = None) -> "InteractionRecord":
+        """Build from the engine's response and ContextBuilder output"""
+        return cls(
+            query=query,
+            mode=mode,
+            intent=context.get("inferred", {}).get("likely_intent", ""),
+            style=response.get("style", ""),
+            content=str(response.get("content", "")),
+            recalled=_recalled_ids(context.get("memory")),
+            timestamp=timestamp,
+            field_caps=field_caps
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InteractionRecord":
+        return cls(
+            query=data["query"], mode=data["mode"], intent=data["intent"],
+            style=data.get("style", ""), content=data["content"],
+            recalled=data.get("recalled", ()), timestamp=data["timestamp"],
+            field_caps={}
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "query": self.query,
+            "mode": self.mode,
+            "intent": self.intent,
+            "style": self.style,
+            "content": self.content,
+            "recalled": self.recalled.tolist(),
+            "timestamp": self.timestamp
+        }
+
+def compact_result(result: Any, field_caps: Optional[Dict[str, int]] = None) -> Any:
+    """Shrink a legacy full-context interaction; anything else is returned as is"""
+    if not isinstance(result, dict) or "context" not in result:
+        return result
+    response = result.get("response") or {}
+    context = result.get("context") or {}
+    return InteractionRecord.from_interaction(
+        query=result.get("query", ""),
+        response=response if isinstance(response, dict) else {"content": response},
+        context=context if isinstance(context, dict) else {},
+        mode=result.get("mode", ""),
+        timestamp=result.get("timestamp", ""),
+        field_caps=field_caps
+    )
+
+def _recalled_ids(memory_context: Any) -> Iterable[int]:
+    """Entry ids from whatever shape the memory context took"""
+    if isinstance(memory_context, dict):
+        return memory_context.get("entry_ids", [])
+    if isinstance(memory_context, list):
+        return [e["id"] for e in memory_context if isinstance(e, dict) and "id" in e]
+    return []
+
+def _cap(value: str, limit: Optional[int]) -> str:
+    value = value or ""
+    return value[:limit] if limit is not None else value
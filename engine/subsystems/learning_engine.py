@@ -1,50 +1,254 @@
+import copy
+import time
+import queue
+import pickle
 import logging
+import threading
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
 import numpy as np
-from typing import Dict, Any, List
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+MODES = ("online", "batch")
+_FLUSH = object()
+_STOP = object()
+
+class LearnedModel(NamedTuple):
+    """One published model and its suggestion index
+
+    Replaced as a whole, never mutated. `counts` holds per-cluster
+    suggestion frequencies; `suggestions` is the same ranked (most
+    frequent first) and deduplicated, ready for lookups.
+    """
+    vectorizer: Any
+    clusterer: Any
+    version: int
+    counts: Dict[int, Counter]
+    suggestions: Dict[int, Tuple[str, ...]]
 
 class LearningEngine:
-    def __init__(self, n_clusters: int = 5):
+    """Clusters feedback so similar queries can share suggestions
+
+    Modes:
+      online  feedback is queued and a background worker folds it into a
+              MiniBatchKMeans over hashed features, `batch_size` items at
+              a time; process_feedback only enqueues
+      batch   legacy behaviour: refit TF-IDF + KMeans over the whole
+              history on the calling thread
+
+    Either way a fit happens on a private copy and is published by
+    swapping self.model, so readers never see a half-fit model. With
+    `model_path` set, each published model is saved there (atomically)
+    and loaded back on start.
+    """
+
+    def __init__(self, n_clusters: int = 5, mode: str = "online", batch_size: int = 10,
+                 queue_size: int = 1000, n_features: int = 2 ** 12, history_size: int = 10000,
+                 flush_interval: float = 1.0, model_path: Optional[str] = None,
+                 index_size: int = 10):
+        if mode not in MODES:
+            raise ValueError(f"Invalid learning mode. Choose from: {list(MODES)}")
         self.log = logging.getLogger(__name__)
-        self.vectorizer = TfidfVectorizer(max_features=1000)
-        self.clusterer = KMeans(n_clusters=n_clusters)
-        self.feedback_history = []
+        self.n_clusters = n_clusters
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.index_size = index_size
+        self.model_path = Path(model_path) if model_path else None
+        self.model: Optional[LearnedModel] = None
+        self.feedback_history = deque(maxlen=history_size)
+        self.stats = {"updates": 0, "dropped": 0}
+        # Stateless, so the worker and readers can share it
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._load()
         self.log.info("Learning Engine initialized")
 
     def process_feedback(self, feedback: Dict[str, Any]):
         """Store and learn from user feedback"""
         self.feedback_history.append(feedback)
-        
-        if len(self.feedback_history) > 10:  # Minimum batch size
-            self._update_models()
+        if self.mode == "batch":
+            if len(self.feedback_history) > 10:  # Minimum batch size
+                self._update_models()
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(feedback)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            self.log.warning("Learning queue full, feedback not learned")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Fit whatever the worker has buffered; True once it has
+
+        False if the queue stays full, or the fit is not done, by `timeout`.
+        """
+        if self.mode == "batch" or self._worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            self.log.warning("Learning queue full, flush timed out")
+            return False
+        return done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def close(self):
+        """Fit pending feedback and stop the worker"""
+        if self._worker is not None:
+            self._queue.put(_STOP)
+            self._worker.join()
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="learning-worker",
+                                                    daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        """Worker loop: gather up to batch_size items, then partial_fit"""
+        pending: List[Dict[str, Any]] = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._partial_fit(pending)
+                return
+            flush = isinstance(item, tuple) and item[0] is _FLUSH
+            if item is not None and not flush:
+                pending.append(item)
+            if len(pending) >= self.batch_size or ((item is None or flush) and pending):
+                if self._partial_fit(pending):
+                    pending = []
+            if flush:
+                item[1].set()
+
+    def _partial_fit(self, batch: List[Dict[str, Any]]) -> bool:
+        """Fold `batch` into a copy of the current model and publish it
+
+        Returns False while there are too few items to seed the clusters.
+        """
+        current = self.model
+        if not batch or (current is None and len(batch) < self.n_clusters):
+            return False
+        try:
+            X = self.vectorizer.transform([self._feedback_text(fb) for fb in batch])
+            clusterer = (copy.deepcopy(current.clusterer) if current is not None
+                         else MiniBatchKMeans(n_clusters=self.n_clusters, random_state=0, n_init=3))
+            clusterer.partial_fit(X)
+            # Cluster ids are stable across partial fits, so counts carry over
+            counts = self._count(batch, clusterer.predict(X), current.counts if current else {})
+            self._publish(self.vectorizer, clusterer, counts)
+            self.log.debug(f"Learning model v{self.model.version} from {len(batch)} items")
+        except Exception as e:
+            self.log.error(f"Model update failed: {e}")
+        return True
 
     def _update_models(self):
         """Update ML models with new feedback"""
-        texts = [fb['query'] + " " + fb['comment'] for fb in self.feedback_history]
-        
+        texts = [self._feedback_text(fb) for fb in self.feedback_history]
+
         try:
-            X = self.vectorizer.fit_transform(texts)
-            self.clusterer.fit(X)
+            vectorizer = TfidfVectorizer(max_features=1000)
+            clusterer = KMeans(n_clusters=self.n_clusters)
+            clusterer.fit(vectorizer.fit_transform(texts))
+            # A refit renumbers clusters, so the index starts over
+            self._publish(vectorizer, clusterer,
+                          self._count(self.feedback_history, clusterer.labels_, {}))
             self.log.info("Updated learning models")
         except Exception as e:
             self.log.error(f"Model update failed: {e}")
 
-    def suggest_improvements(self, query: str) -> List[str]:
-        """Suggest response improvements based on learned patterns"""
+    def suggest_improvements(self, query: str, limit: int = 3) -> List[str]:
+        """Most frequent suggestions from the query's cluster"""
+        model = self.model
+        if model is None:
+            return []
         try:
-            vec = self.vectorizer.transform([query])
-            cluster = self.clusterer.predict(vec)[0]
-            
-            similar_feedback = [
-                fb for i, fb in enumerate(self.feedback_history)
-                if self.clusterer.labels_[i] == cluster
-            ]
-            
-            return list(set(
-                fb['suggestion'] for fb in similar_feedback
-                if 'suggestion' in fb
-            ))[:3]
+            cluster = int(model.clusterer.predict(model.vectorizer.transform([query]))[0])
+            return list(model.suggestions.get(cluster, ())[:limit])
         except Exception as e:
             self.log.error(f"Suggestion failed: {e}")
             return []
+
+    def get_suggestion_index(self) -> Dict[int, List[Tuple[str, int]]]:
+        """Per-cluster (suggestion, count) pairs, most frequent first"""
+        model = self.model
+        if model is None:
+            return {}
+        return {cluster: counts.most_common(self.index_size) for cluster, counts in model.counts.items()}
+
+    def _publish(self, vectorizer, clusterer, counts: Dict[int, Counter]):
+        """Swap in a new model with its index and persist it"""
+        current = self.model
+        self.model = LearnedModel(
+            vectorizer, clusterer, current.version + 1 if current else 1, counts,
+            {cluster: tuple(s for s, _ in c.most_common(self.index_size)) for cluster, c in counts.items()}
+        )
+        self.stats["updates"] += 1
+        self._save(self.model)
+
+    @staticmethod
+    def _count(feedback: Iterable[Dict[str, Any]], labels, previous: Dict[int, Counter]) -> Dict[int, Counter]:
+        """`previous` plus this feedback's suggestions; touched clusters are copied"""
+        counts = dict(previous)
+        copied = set()
+        for fb, label in zip(feedback, labels):
+            if 'suggestion' not in fb:
+                continue
+            label = int(label)
+            if label not in copied:
+                counts[label] = Counter(counts.get(label, ()))
+                copied.add(label)
+            counts[label][fb['suggestion']] += 1
+        return counts
+
+    def _save(self, model: LearnedModel):
+        """Write to a temp file and rename it over the saved model"""
+        if self.model_path is None:
+            return
+        try:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.model_path.with_suffix(".tmp")
+            with open(temp_path, "wb") as f:
+                pickle.dump(model._asdict(), f)
+            temp_path.replace(self.model_path)
+        except Exception as e:
+            self.log.error(f"Model save failed: {e}")
+
+    def _load(self):
+        """Warm start from model_path if it holds a model for this mode"""
+        if self.model_path is None or not self.model_path.exists():
+            return
+        try:
+            with open(self.model_path, "rb") as f:
+                model = LearnedModel(**pickle.load(f))
+        except Exception as e:
+            self.log.error(f"Model load failed: {e}")
+            return
+        online = isinstance(model.vectorizer, HashingVectorizer)
+        if online != (self.mode == "online") or (
+                online and model.vectorizer.n_features != self.vectorizer.n_features):
+            self.log.warning("Saved learning model does not match this configuration, ignoring it")
+            return
+        self.model = model
+        self.log.info(f"Loaded learning model v{model.version}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "mode": self.mode, "queued": self._queue.qsize(),
+                "version": self.model.version if self.model else 0}
+
+    @staticmethod
+    def _feedback_text(feedback: Dict[str, Any]) -> str:
+        return f"{feedback.get('query', '')} {feedback.get('comment', '')}"
@@ -1,26 +1,48 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
+from .interaction_record import InteractionRecord, compact_result
 
 class MemoryInterface:
-    def __init__(self, memory_system):
+    def __init__(self, memory_system, field_caps: Optional[Dict[str, int]] = None):
         self.log = logging.getLogger(__name__)
         self.memory = memory_system
+        self.field_caps = field_caps
         self.log.info("Memory Interface initialized")
 
-    def store_interaction(self, query: str, response: Dict[str, Any], context: Dict[str, Any]):
-        """Store a complete interaction in memory"""
-        interaction = {
-            "query": query,
-            "response": response,
-            "context": context,
-            "timestamp": self._get_timestamp()
-        }
-        self.memory.store(interaction)
+    def store_interaction(self, query: str, response: Dict[str, Any], context: Dict[str, Any],
+                          mode: str = "") -> InteractionRecord:
+        """Store a compact record of an interaction in memory
+
+        The record object itself is stored; backends that serialize
+        (SQLite) flatten it with to_dict() at write time.
+        """
+        record = InteractionRecord.from_interaction(
+            query=query,
+            response=response,
+            context=context,
+            mode=mode,
+            timestamp=self._get_timestamp(),
+            field_caps=self.field_caps
+        )
+        self.memory.store(query, record)
         self.log.debug(f"Stored interaction: {query[:50]}...")
+        return record
 
     def get_context(self, query: str, max_results: int = 3) -> List[Dict[str, Any]]:
         """Retrieve relevant context for a query"""
-        return self.memory.retrieve(query, max_results)
+        return self.memory.get_context(query, max_results)
+
+    def get_context_many(self, queries: List[str], max_results: int = 3) -> List[List[Dict[str, Any]]]:
+        """Retrieve context for a batch of queries in one backend call"""
+        return self.memory.get_context_many(queries, max_results)
+
+    def compact_store(self) -> int:
+        """Rewrite legacy full-context interactions in the store as compact records"""
+        changed = self.memory.backend.rewrite_results(
+            lambda result: compact_result(result, self.field_caps)
+        )
+        self.log.info(f"Compacted {changed} stored interactions")
+        return changed
 
     def _get_timestamp(self) -> str:
         from datetime import datetime
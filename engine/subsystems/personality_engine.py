@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
 class PersonalityEngine:
@@ -14,15 +14,20 @@ class PersonalityEngine:
         self.mode = mode
         self.log.info(f"Personality Engine initialized in {mode} mode")
 
-    def process(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Process query according to personality mode"""
-        mode_params = self.MODES[self.mode]
+    def process(self, query: str, context: Dict[str, Any], mode: Optional[str] = None) -> Dict[str, Any]:
+        """Process query according to personality mode
+
+        `mode` overrides the engine's mode for this call only, so a shared
+        engine can serve requests in different modes.
+        """
+        mode = self.resolve_mode(mode)
+        mode_params = self.MODES[mode]
         
-        if self.mode == "technical":
+        if mode == "technical":
             return self._technical_process(query, context, mode_params)
-        elif self.mode == "creative":
+        elif mode == "creative":
             return self._creative_process(query, context, mode_params)
-        elif self.mode == "homer":
+        elif mode == "homer":
             return self._homer_process(query, context, mode_params)
         else:
             return self._balanced_process(query, context, mode_params)
@@ -77,6 +82,14 @@ class PersonalityEngine:
             ]
         }
 
+    def resolve_mode(self, mode: Optional[str] = None) -> str:
+        """Validated mode name, defaulting to the current mode"""
+        if mode is None:
+            return self.mode
+        if mode.lower() in self.MODES:
+            return mode.lower()
+        raise ValueError(f"Invalid mode. Choose from: {list(self.MODES.keys())}")
+
     def set_mode(self, new_mode: str):
         """Change processing mode"""
         if new_mode.lower() in self.MODES:
@@ -1,2 +1,6 @@
 from .context_builder import ContextBuilder
-__all__ = ['ContextBuilder']
+from .performance_monitor import PerformanceMonitor
+from .nlp_registry import NLPRegistry, nlp_registry
+from .single_flight import SingleFlight, flight_key
+__all__ = ['ContextBuilder', 'PerformanceMonitor', 'SingleFlight', 'flight_key',
+           'NLPRegistry', 'nlp_registry']
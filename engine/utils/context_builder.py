@@ -1,16 +1,18 @@
-import spacy
-from typing import Dict, Any, List
+from itertools import islice, tee
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 import logging
+from shared.keyword_matcher import keyword_matcher
+from .nlp_registry import DEFAULT_MODEL, nlp_registry
 
 class ContextBuilder:
-    def __init__(self):
+    def __init__(self, model: str = DEFAULT_MODEL):
         self.log = logging.getLogger(__name__)
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            self.log.info("Loaded NLP model for context building")
-        except:
-            self.nlp = None
-            self.log.warning("SpaCy model not available, using simple mode")
+        # The pipeline is shared process-wide and loaded on first use
+        self.model = model
+
+    @property
+    def nlp(self):
+        return nlp_registry.get(self.model)
 
     def build(self, query: str, memory, user_context: Dict) -> Dict[str, Any]:
         """Enhanced context building with NLP"""
@@ -22,18 +24,64 @@ class ContextBuilder:
         }
         return self._add_derived_context(base)
 
-    def _analyze_text(self, text: str) -> Dict[str, Any]:
-        """Perform NLP analysis if available"""
-        if not self.nlp:
-            return {"entities": [], "verbs": []}
-        
-        doc = self.nlp(text)
+    def build_many(self, queries: Iterable[str], memory, user_context: Optional[Dict] = None,
+                   batch_size: int = 64, n_process: int = 1) -> Iterator[Dict[str, Any]]:
+        """build() for a stream of queries, yielded lazily in input order
+
+        Texts go through spaCy's nlp.pipe (`batch_size` docs per batch over
+        `n_process` processes); memory is queried one batch at a time.
+        """
+        texts, pending = tee(queries)
+        analyses = nlp_registry.analyze_many(texts, self.model, batch_size, n_process)
+        while True:
+            batch = list(islice(pending, batch_size))
+            if not batch:
+                return
+            for query, recalled in zip(batch, self._get_memory_contexts(batch, memory)):
+                base = {
+                    "query": query,
+                    "user": user_context or {},
+                    "memory": recalled,
+                    "linguistic": next(analyses)
+                }
+                yield self._add_derived_context(base)
+
+    def warmup(self, sample: str = "warm up the engine"):
+        """Load the NLP pipeline and keyword tables; memory is not touched"""
+        nlp = self.nlp
+        if nlp is not None:
+            # Parsed directly so the sample stays out of the analysis cache
+            nlp(sample)
+        keyword_matcher()
+
+    def _get_memory_context(self, query: str, memory) -> Dict[str, Any]:
+        """Recalled memories as entry-id references plus their queries"""
+        try:
+            entries = memory.get_context(query)
+        except Exception as e:
+            self.log.warning(f"Memory lookup failed: {e}")
+            entries = []
         return {
-            "entities": [(ent.text, ent.label_) for ent in doc.ents],
-            "verbs": [token.lemma_ for token in doc if token.pos_ == "VERB"],
-            "sentiment": doc.sentiment
+            "entry_ids": [e["id"] for e in entries],
+            "related_queries": [e["query"] for e in entries]
         }
 
+    def _get_memory_contexts(self, queries: List[str], memory) -> List[Dict[str, Any]]:
+        """_get_memory_context for a batch with one retrieval call"""
+        try:
+            batches = memory.get_context_many(queries)
+        except Exception as e:
+            self.log.warning(f"Memory lookup failed: {e}")
+            batches = [[] for _ in queries]
+        return [{
+            "entry_ids": [e["id"] for e in entries],
+            "related_queries": [e["query"] for e in entries]
+        } for entries in batches]
+
+    def _analyze_text(self, text: str) -> Dict[str, Any]:
+        """Perform NLP analysis if available; repeats come from the cache"""
+        return nlp_registry.analyze(text, self.model)
+
     def _add_derived_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Infer higher-level context"""
         context["inferred"] = {
@@ -43,15 +91,8 @@ class ContextBuilder:
         return context
 
     def _detect_intent(self, query: str) -> str:
-        """Improved intent detection"""
-        query = query.lower()
-        if any(q in query for q in ["how to", "tutorial"]):
-            return "instruction"
-        elif any(q in query for q in ["why", "cause of"]):
-            return "explanation"
-        elif any(q in query for q in ["compare", "vs"]):
-            return "comparison"
-        return "information"
+        """Intent from the "intent" keyword table"""
+        return keyword_matcher().classify(query, "intent")
 
     def _find_gaps(self, context: Dict[str, Any]) -> List[str]:
         """Identify missing context"""
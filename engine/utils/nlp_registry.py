@@ -0,0 +1,139 @@
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional
+import spacy
+
+DEFAULT_MODEL = "en_core_web_sm"
+# Components the context builder reads (entities, lemmas, POS) and those
+# they depend on; everything else in the package is disabled
+KEEP_PIPES = ("tok2vec", "tagger", "attribute_ruler", "lemmatizer", "ner")
+EXCLUDE_PIPES = ("parser", "senter", "textcat", "textcat_multilabel", "entity_linker")
+
+def normalize_text(text: str) -> str:
+    """Cache key for an analysis: NFC, trimmed, single-spaced
+
+    Case is kept since the tagger and NER depend on it.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class NLPRegistry:
+    """Process-wide spaCy pipelines, loaded on first use
+
+    Each model is loaded at most once, trimmed to KEEP_PIPES. A failed
+    load is remembered too, so callers fall back to simple mode without
+    retrying on every query. Analyses are kept in a bounded LRU keyed by
+    normalized text, so a repeated query is not parsed again.
+    """
+
+    def __init__(self, cache_size: int = 2048):
+        self.log = logging.getLogger(__name__)
+        self.cache_size = cache_size
+        self._models: Dict[str, Optional[Any]] = {}
+        self._analyses: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._load_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "loads": 0}
+
+    def get(self, model: str = DEFAULT_MODEL):
+        """Loaded pipeline for `model`, or None if it is not installed"""
+        if model in self._models:
+            return self._models[model]
+        with self._load_lock:
+            if model not in self._models:
+                self._models[model] = self._load(model)
+            return self._models[model]
+
+    def analyze(self, text: str, model: str = DEFAULT_MODEL) -> Dict[str, Any]:
+        """Entities, verb lemmas and sentiment of `text`, cached"""
+        key = (model, normalize_text(text))
+        cached = self._cached(key)
+        if cached is not None:
+            return self._copy(cached)
+
+        nlp = self.get(model)
+        if nlp is None:
+            return {"entities": [], "verbs": []}
+        return self._copy(self._remember(key, nlp(key[1])))
+
+    def analyze_many(self, texts: Iterable[str], model: str = DEFAULT_MODEL,
+                     batch_size: int = 64, n_process: int = 1) -> Iterator[Dict[str, Any]]:
+        """analyze() over a stream of texts via nlp.pipe, in input order
+
+        Texts are read lazily, so only spaCy's in-flight batches are held
+        in memory. Cached texts go through the pipe as empty strings to
+        keep their slot in the order without being parsed.
+        """
+        nlp = self.get(model)
+        if nlp is None:
+            for _ in texts:
+                yield {"entities": [], "verbs": []}
+            return
+
+        def feed():
+            for text in texts:
+                key = (model, normalize_text(text))
+                cached = self._cached(key)
+                yield ("" if cached is not None else key[1]), (key, cached)
+
+        for doc, (key, cached) in nlp.pipe(feed(), as_tuples=True,
+                                           batch_size=batch_size, n_process=n_process):
+            yield self._copy(cached if cached is not None else self._remember(key, doc))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            return {**self.stats, "cached": len(self._analyses),
+                    "models": [m for m, nlp in self._models.items() if nlp is not None]}
+
+    def clear(self):
+        """Drop cached analyses; loaded models stay"""
+        with self._cache_lock:
+            self._analyses.clear()
+
+    def _cached(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            cached = self._analyses.get(key)
+            if cached is None:
+                self.stats["misses"] += 1
+                return None
+            self._analyses.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached
+
+    def _remember(self, key: tuple, doc) -> Dict[str, Any]:
+        analysis = {
+            "entities": [(ent.text, ent.label_) for ent in doc.ents],
+            "verbs": [token.lemma_ for token in doc if token.pos_ == "VERB"],
+            "sentiment": doc.sentiment
+        }
+        with self._cache_lock:
+            self._analyses[key] = analysis
+            self._analyses.move_to_end(key)
+            while len(self._analyses) > self.cache_size:
+                self._analyses.popitem(last=False)
+        return analysis
+
+    def _load(self, model: str):
+        try:
+            nlp = spacy.load(model, exclude=list(EXCLUDE_PIPES))
+        except OSError:
+            self.log.warning("SpaCy model not available, using simple mode")
+            return None
+        except Exception as e:
+            # Installed but broken (version mismatch, bad config): same fallback
+            self.log.warning(f"SpaCy model {model} failed to load ({e}), using simple mode")
+            return None
+        for name in nlp.pipe_names:
+            if name not in KEEP_PIPES:
+                nlp.disable_pipe(name)
+        self.stats["loads"] += 1
+        self.log.info(f"Loaded NLP model {model} with pipes {nlp.pipe_names}")
+        return nlp
+
+    @staticmethod
+    def _copy(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Fresh containers so callers cannot mutate the cached entry"""
+        return {k: list(v) if isinstance(v, list) else v for k, v in analysis.items()}
+
+nlp_registry = NLPRegistry()
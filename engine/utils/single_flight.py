@@ -0,0 +1,62 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from shared.query_keys import normalize_query, context_fingerprint
+
+def flight_key(query: str, mode: str, context: Optional[Dict[str, Any]] = None) -> Tuple[str, str, str]:
+    """Requests with equal keys may share one computation
+
+    `context` is the caller's user context, so every key counts except the
+    cache directive, which changes where an answer comes from, not what it is.
+    """
+    return normalize_query(query), mode or "", context_fingerprint(context, volatile={"cache"})
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key
+
+    The first caller for a key (the leader) runs the computation; callers
+    arriving while it is in flight get the leader's Future and share its
+    result or exception. Nothing is kept once the call finishes, so this
+    only dedupes overlapping requests, it is not a cache.
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """The in-flight Future for `key` and whether the caller must run it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.stats["leaders"] += 1
+            return future, True
+
+    def run(self, key: Hashable, future: Future, fn: Callable[[], Any]):
+        """Leader side: compute, publish to every waiter, release the key"""
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                if self._calls.get(key) is future:
+                    del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Blocking call: run `fn` or wait for the identical call in flight"""
+        future, leader = self.claim(key)
+        if leader:
+            self.run(key, future, fn)
+        return future.result()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}
@@ -1 +1,245 @@
 # embedding_engine.py
+import json
+import zlib
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import numpy as np
+
+class HashingEmbedder:
+    """Offline text embedder: signed feature hashing of words and char n-grams
+
+    No vocabulary or model file, so embeddings are stable across processes
+    and restarts and new text never requires a refit.
+    """
+
+    def __init__(self, dim: int = 256, ngram_range: tuple = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> Iterable[str]:
+        words = text.lower().split()
+        yield from words
+        low, high = self.ngram_range
+        for word in words:
+            padded = f"<{word}>"
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n]
+
+    def embed(self, text: str) -> np.ndarray:
+        return self._hash(self._features(text))
+
+    def embed_tokens(self, tokens: Iterable[str]) -> np.ndarray:
+        """Hash whole tokens only, without char n-grams
+
+        For features such as word bigrams that must match exactly rather
+        than by spelling.
+        """
+        return self._hash(tokens)
+
+    def _hash(self, features: Iterable[str]) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vec[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed(t) for t in texts])
+
+class VectorIndex:
+    """Cosine top-k over a contiguous float32 matrix
+
+    Rows are L2-normalised so cosine similarity is a matrix product. With
+    `path` set, the matrix lives in a memory-mapped .npy and keys/payloads
+    in a JSON sidecar. Calling `train_ivf` partitions rows with coarse
+    k-means so searches only scan the `n_probe` closest lists.
+    """
+
+    def __init__(self, dim: int = 256, path: Optional[str] = None,
+                 embedder: Optional[HashingEmbedder] = None,
+                 initial_capacity: int = 1024, n_probe: int = 4):
+        self.log = logging.getLogger(__name__)
+        self.embedder = embedder or HashingEmbedder(dim)
+        self.dim = self.embedder.dim
+        self.path = Path(path) if path else None
+        self.n_probe = n_probe
+        self.keys: List[Any] = []
+        self.payloads: List[Optional[Dict]] = []
+        self.size = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.lists: List[np.ndarray] = []
+        if self.path and self.path.exists():
+            self._load()
+        else:
+            self.matrix = self._allocate(initial_capacity)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, key: Any, text: Optional[str] = None,
+            vector: Optional[np.ndarray] = None, payload: Optional[Dict] = None):
+        """Insert one row; embeds `text` when no vector is given"""
+        if vector is None:
+            vector = self.embedder.embed(text or "")
+        self.add_many([key], np.asarray(vector, dtype=np.float32)[None, :], [payload])
+
+    def add_many(self, keys: List[Any], vectors: Union[np.ndarray, List[str]],
+                 payloads: Optional[List[Optional[Dict]]] = None):
+        """Batched insert of vectors (or texts to embed)"""
+        if not keys:
+            return
+        if not isinstance(vectors, np.ndarray):
+            vectors = self.embedder.embed_batch(list(vectors))
+        vectors = self._normalise(vectors.astype(np.float32, copy=False))
+        n = len(keys)
+        self._reserve(self.size + n)
+        self.matrix[self.size:self.size + n] = vectors
+        self.keys.extend(keys)
+        self.payloads.extend(payloads or [None] * n)
+
+        if self.centroids is not None:
+            new_lists = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+            self.assignments = np.concatenate([self.assignments, new_lists])
+            new_ids = np.arange(self.size, self.size + n)
+            for c in np.unique(new_lists):
+                self.lists[c] = np.concatenate([self.lists[c], new_ids[new_lists == c]])
+        self.size += n
+
+    def search(self, query: Union[str, np.ndarray], k: int = 5,
+               filter: Optional[Union[Dict, Callable[[Dict], bool]]] = None) -> List[Dict]:
+        """Top-k rows by cosine similarity to a text or vector"""
+        return self.search_batch([query], k, filter)[0]
+
+    def search_batch(self, queries: List[Union[str, np.ndarray]], k: int = 5,
+                     filter: Optional[Union[Dict, Callable[[Dict], bool]]] = None) -> List[List[Dict]]:
+        """Top-k for several queries with one matrix product"""
+        if not queries:
+            return []
+        q = np.vstack([
+            self.embedder.embed(item) if isinstance(item, str) else np.asarray(item, dtype=np.float32)
+            for item in queries
+        ])
+        q = self._normalise(q)
+        if self.size == 0:
+            return [[] for _ in queries]
+
+        if self.centroids is None:
+            rows = np.arange(self.size)
+            return [self._top_k(rows, scores, k, filter)
+                    for scores in q @ self.matrix[:self.size].T]
+
+        results = []
+        probes = np.argsort(-(q @ self.centroids.T), axis=1)[:, :self.n_probe]
+        for vec, lists in zip(q, probes):
+            rows = np.concatenate([self.lists[c] for c in lists])
+            scores = self.matrix[rows] @ vec
+            results.append(self._top_k(rows, scores, k, filter))
+        return results
+
+    def train_ivf(self, n_lists: int = 64, iterations: int = 10, seed: int = 0):
+        """Partition rows into `n_lists` inverted lists with coarse k-means"""
+        data = self.matrix[:self.size]
+        n_lists = max(1, min(n_lists, self.size))
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(self.size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = data[assignments == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = self._normalise(centroids)
+
+        self.centroids = centroids
+        self.assignments = np.argmax(data @ centroids.T, axis=1).astype(np.int32)
+        self.lists = [np.flatnonzero(self.assignments == c) for c in range(n_lists)]
+        self.log.info(f"Trained IVF with {n_lists} lists over {self.size} vectors")
+
+    def flush(self):
+        """Persist matrix and metadata"""
+        if not self.path:
+            return
+        self.matrix.flush()
+        meta = {"size": self.size, "dim": self.dim, "keys": self.keys, "payloads": self.payloads}
+        temp_path = self._meta_path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(meta, f, default=str)
+        temp_path.replace(self._meta_path)
+        if self.centroids is not None:
+            np.save(self._centroid_path, self.centroids)
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path.with_suffix(".json")
+
+    @property
+    def _centroid_path(self) -> Path:
+        return self.path.with_suffix(".ivf.npy")
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int, filter) -> List[Dict]:
+        if filter is not None:
+            keep = np.array([self._matches(self.payloads[r], filter) for r in rows], dtype=bool)
+            rows, scores = rows[keep], scores[keep]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [{
+            "key": self.keys[rows[i]],
+            "score": float(scores[i]),
+            "payload": self.payloads[rows[i]]
+        } for i in top]
+
+    @staticmethod
+    def _matches(payload: Optional[Dict], filter) -> bool:
+        if callable(filter):
+            return bool(filter(payload))
+        payload = payload or {}
+        return all(payload.get(k) == v for k, v in filter.items())
+
+    @staticmethod
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if self.path:
+            return np.lib.format.open_memmap(
+                self.path, mode="w+", dtype=np.float32, shape=(capacity, self.dim)
+            )
+        return np.zeros((capacity, self.dim), dtype=np.float32)
+
+    def _reserve(self, needed: int):
+        """Grow capacity geometrically so inserts stay amortised O(1)"""
+        if needed <= len(self.matrix):
+            return
+        capacity = max(needed, 2 * len(self.matrix))
+        current = np.array(self.matrix[:self.size])
+        if self.path:
+            del self.matrix
+            self.matrix = self._allocate(capacity)
+        else:
+            self.matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        self.matrix[:self.size] = current
+
+    def _load(self):
+        self.matrix = np.load(self.path, mmap_mode="r+")
+        if self._meta_path.exists():
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.size = meta["size"]
+            self.keys = meta["keys"]
+            self.payloads = meta["payloads"]
+        if self._centroid_path.exists() and self.size:
+            self.centroids = np.load(self._centroid_path)
+            data = self.matrix[:self.size]
+            self.assignments = np.argmax(data @ self.centroids.T, axis=1).astype(np.int32)
+            self.lists = [np.flatnonzero(self.assignments == c) for c in range(len(self.centroids))]
@@ -1,16 +1,27 @@
-import pickle
-from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
+from .backends import BACKENDS, MemoryBackend
 
 class MemoryBank:
-    def __init__(self, storage_path: str = "data/memory.db"):
-        self.storage_path = Path(storage_path)
-        self.storage_path.parent.mkdir(exist_ok=True)
-        self.entries: List[Dict] = []
-        self._load()
+    def __init__(self, storage_path: Optional[str] = None,
+                 backend: Union[str, MemoryBackend] = "local", **backend_options: Any):
+        """
+        Args:
+            storage_path: File (or ":memory:") handed to the backend; defaults
+                to the backend's own file (data/memory.db for local,
+                data/memory.sqlite3 for sqlite)
+            backend: "local" (pickle snapshot/WAL), "sqlite", or a MemoryBackend instance
+            backend_options: Extra keyword arguments for the backend
+        """
+        if isinstance(backend, MemoryBackend):
+            self.backend = backend
+        elif backend in BACKENDS:
+            paths = () if storage_path is None else (storage_path,)
+            self.backend = BACKENDS[backend](*paths, **backend_options)
+        else:
+            raise ValueError(f"Invalid backend. Choose from: {list(BACKENDS.keys())}")
 
-    def store(self, query: str, result: Dict) -> str:
+    def store(self, query: str, result: Any) -> str:
         """Store interaction with timestamp"""
         entry = {
             "timestamp": datetime.now().isoformat(),
@@ -18,48 +29,19 @@ class MemoryBank:
             "result": result,
             "access_count": 0
         }
-        self.entries.append(entry)
-        self._save()
+        self.backend.store(entry)
         return entry["timestamp"]
 
     def get_context(self, query: str, limit: int = 3) -> List[Dict]:
         """Retrieve relevant context for query"""
-        relevant = sorted(
-            [e for e in self.entries if self._is_relevant(e, query)],
-            key=lambda x: x["access_count"],
-            reverse=True
-        )[:limit]
-        
-        # Update access counts
-        for entry in relevant:
-            entry["access_count"] += 1
-            
-        return relevant
+        return self.backend.get_context(query, limit)
 
-    def _is_relevant(self, entry: Dict, query: str) -> bool:
-        """Basic relevance detection"""
-        q_words = set(query.lower().split())
-        e_words = set(entry["query"].lower().split())
-        return len(q_words & e_words) > 0
+    def get_context_many(self, queries: List[str], limit: int = 3) -> List[List[Dict]]:
+        """get_context for a batch of queries, in query order"""
+        return self.backend.get_context_many(queries, limit)
 
-    def _load(self):
-        """Load memory from disk"""
-        try:
-            if self.storage_path.exists():
-                with open(self.storage_path, "rb") as f:
-                    self.entries = pickle.load(f)
-        except Exception as e:
-            print(f"Memory load error: {e}")
+    def compact(self):
+        self.backend.compact()
 
-    def _save(self):
-        """Atomic memory save"""
-        if self.storage_path == Path(":memory:"):
-            return
-            
-        temp_path = self.storage_path.with_suffix(".tmp")
-        try:
-            with open(temp_path, "wb") as f:
-                pickle.dump(self.entries, f)
-            temp_path.replace(self.storage_path)
-        except Exception as e:
-            print(f"Memory save error: {e}")
+    def close(self):
+        self.backend.close()
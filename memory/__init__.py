@@ -1,2 +1,4 @@
 from .MemoryBank import MemoryBank
-__all__ = ['MemoryBank']
+from .backends import MemoryBackend, LocalBackend, SQLiteBackend
+from .decay import DecayEngine
+__all__ = ['MemoryBank', 'MemoryBackend', 'LocalBackend', 'SQLiteBackend', 'DecayEngine']
@@ -0,0 +1,10 @@
+from .base import MemoryBackend
+from .local import LocalBackend
+from .sqlite_backend import SQLiteBackend, migrate_pickle_to_sqlite
+
+BACKENDS = {
+    "local": LocalBackend,
+    "sqlite": SQLiteBackend
+}
+
+__all__ = ['MemoryBackend', 'LocalBackend', 'SQLiteBackend', 'migrate_pickle_to_sqlite', 'BACKENDS']
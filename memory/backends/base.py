@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List
+
+class MemoryBackend(ABC):
+    """Storage and retrieval behind MemoryBank.store/get_context"""
+
+    @abstractmethod
+    def store(self, entry: Dict) -> int:
+        """Persist a new entry and return its id"""
+        pass
+
+    @abstractmethod
+    def get_context(self, query: str, limit: int) -> List[Dict]:
+        """Return up to `limit` relevant entries and bump their access counts"""
+        pass
+
+    def get_context_many(self, queries: List[str], limit: int) -> List[List[Dict]]:
+        """get_context for a batch of queries, results in query order"""
+        return [self.get_context(query, limit) for query in queries]
+
+    def rewrite_results(self, fn: Callable[[Any], Any]) -> int:
+        """Replace every stored result with fn(result); returns how many changed"""
+        raise NotImplementedError(f"{type(self).__name__} does not support rewriting")
+
+    def compact(self):
+        """Reclaim space or fold logs; optional"""
+        pass
+
+    def close(self):
+        """Flush and release resources"""
+        pass
@@ -0,0 +1,281 @@
+import os
+import math
+import pickle
+import threading
+from pathlib import Path
+from typing import List, Dict, Any
+import numpy as np
+from .base import MemoryBackend
+from ..index import Column, InvertedIndex
+from ..wal import WriteAheadLog
+from .sqlite_backend import is_sqlite_file
+
+class LocalBackend(MemoryBackend):
+    """In-process entry list persisted as a pickle snapshot (plus optional WAL)"""
+
+    def __init__(self, storage_path: str = "data/memory.db", persistence: str = "snapshot",
+                 fsync: str = "interval", fsync_interval_ms: int = 1000,
+                 compact_threshold: int = 10000, ranking: str = "overlap",
+                 bm25_k1: float = 1.2, bm25_b: float = 0.75, recency_weight: float = 0.5,
+                 recency_half_life: int = 1000, access_weight: float = 0.1,
+                 vector_index=None):
+        """
+        Args:
+            storage_path: Snapshot file, or ":memory:" for no persistence
+            persistence: "snapshot" rewrites the whole file per store,
+                "wal" appends to a log next to it and compacts in the background
+            fsync: WAL sync policy - "always", "interval" or "os"
+            fsync_interval_ms: Max time between syncs for the "interval" policy
+            compact_threshold: Log records that trigger a background compaction
+            ranking: "overlap" (any shared word, most accessed first),
+                "bm25" (BM25 blended with recency and access count) or
+                "semantic" (cosine similarity over a VectorIndex)
+            bm25_k1, bm25_b: BM25 term-frequency saturation and length normalisation
+            recency_weight: Bonus for the newest entry, halving every
+                `recency_half_life` entries back
+            access_weight: Multiplier on log(1 + access_count)
+            vector_index: knowledge.embedding_engine.VectorIndex for "semantic";
+                defaults to one memory-mapped next to the snapshot
+        """
+        if persistence not in ("snapshot", "wal"):
+            raise ValueError("Invalid persistence mode. Choose from: ['snapshot', 'wal']")
+        if ranking not in ("overlap", "bm25", "semantic"):
+            raise ValueError("Invalid ranking mode. Choose from: ['overlap', 'bm25', 'semantic']")
+        self.storage_path = Path(storage_path)
+        if is_sqlite_file(self.storage_path):
+            # Loading would fail and the next save would overwrite the database
+            raise ValueError(f"{storage_path} is a SQLite database; open it with backend=\"sqlite\"")
+        self.storage_path.parent.mkdir(exist_ok=True)
+        self.entries: List[Dict] = []
+        self.index = InvertedIndex(k1=bm25_k1, b=bm25_b)
+        # Mirror of entries[i]["access_count"] for vectorised BM25 blending
+        self._access = Column(np.float64)
+        self.ranking = ranking
+        self.recency_weight = recency_weight
+        self.recency_half_life = recency_half_life
+        self.access_weight = access_weight
+        self.persistence = persistence
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+        self._snapshot_lsn = 0
+        self.vectors = vector_index
+        if ranking == "semantic" and self.vectors is None:
+            from knowledge.embedding_engine import VectorIndex
+            self.vectors = VectorIndex(
+                path=None if self._in_memory else str(self.storage_path.with_suffix(".vec.npy"))
+            )
+        self.wal = None
+        if persistence == "wal" and not self._in_memory:
+            self.wal = WriteAheadLog(
+                self.storage_path.with_suffix(".wal"), fsync, fsync_interval_ms
+            )
+        self._load()
+
+    @property
+    def _in_memory(self) -> bool:
+        return self.storage_path == Path(":memory:")
+
+    def store(self, entry: Dict) -> int:
+        """Append entry, index it and persist"""
+        with self._lock:
+            entry["id"] = len(self.entries)
+            self.entries.append(entry)
+            self.index.add(entry["id"], entry["query"])
+            self._access.append(entry["access_count"])
+            if self.vectors is not None:
+                self.vectors.add(entry["id"], entry["query"])
+            if self.wal:
+                self._append("store", entry)
+            else:
+                self._save()
+        return entry["id"]
+
+    def get_context(self, query: str, limit: int = 3) -> List[Dict]:
+        """Retrieve relevant context for query"""
+        return self.get_context_many([query], limit)[0]
+
+    def get_context_many(self, queries: List[str], limit: int = 3) -> List[List[Dict]]:
+        """Batch retrieval under one lock with one logged access record
+
+        Semantic ranking embeds and scores the whole batch with one matrix
+        product. All queries are ranked before access counts are bumped.
+        """
+        with self._lock:
+            if self.ranking == "semantic":
+                hits = self.vectors.search_batch(queries, limit) if limit > 0 else [[] for _ in queries]
+                id_lists = [[hit["key"] for hit in found if hit["key"] < len(self.entries)]
+                            for found in hits]
+            elif self.ranking == "bm25":
+                id_lists = [self._rank_bm25(query, limit) for query in queries]
+            else:
+                # Most accessed first, ties broken by insertion order
+                id_lists = [self.index.top_k(
+                    query, limit,
+                    key=lambda i: (-self.entries[i]["access_count"], i)
+                ) for query in queries]
+
+            # Update access counts
+            accessed = [i for ids in id_lists for i in ids]
+            self._bump_access(accessed)
+            if self.wal and accessed:
+                self._append("access", accessed)
+
+            return [[self.entries[i] for i in ids] for ids in id_lists]
+
+    def _rank_bm25(self, query: str, limit: int) -> List[int]:
+        """Top ids by BM25 plus recency and access-count bonuses
+
+        Scored as arrays over every match, then cut to `limit` with a
+        partial sort; ties go to the newer entry.
+        """
+        if limit <= 0:
+            return []
+        ids, scores = self.index.bm25_arrays(query, limit)
+        if not len(ids):
+            return []
+        newest = len(self.entries) - 1
+        decay = math.log(2) / max(1, self.recency_half_life)
+        blended = (
+            scores
+            + self.recency_weight * np.exp(-decay * (newest - ids))
+            + self.access_weight * np.log1p(self._access.view()[ids])
+        )
+        if len(ids) > limit:
+            top = np.argpartition(-blended, limit - 1)[:limit]
+            ids, blended = ids[top], blended[top]
+        order = np.lexsort((-ids, -blended))
+        return ids[order].tolist()
+
+    def rewrite_results(self, fn) -> int:
+        """Migrate stored results in place and write a fresh snapshot"""
+        changed = 0
+        with self._lock:
+            for entry in self.entries:
+                new = fn(entry["result"])
+                if new is not entry["result"]:
+                    entry["result"] = new
+                    changed += 1
+            if changed and not self.wal:
+                self._save()
+        if changed and self.wal:
+            self.compact()
+        return changed
+
+    def compact(self):
+        """Fold the write-ahead log into a fresh snapshot"""
+        if not self.wal:
+            return
+        with self._compact_lock:
+            with self._lock:
+                entries = [dict(e) for e in self.entries]
+                lsn = self.wal.lsn
+                offset = self.wal.tell()
+
+            # Records appended while the snapshot is written stay in the log
+            self._write_snapshot({"lsn": lsn, "entries": entries})
+
+            with self._lock:
+                self._snapshot_lsn = lsn
+                self.wal.truncate_before(offset)
+
+    def close(self):
+        """Flush pending writes; the backend should not be used afterwards"""
+        if self._compactor:
+            self._compactor.join()
+        if self.vectors is not None:
+            self.vectors.flush()
+        if self.wal:
+            with self._lock:
+                self.wal.close()
+
+    def _append(self, op: str, data: Any):
+        """Log a mutation and kick off compaction when the log grows"""
+        self.wal.append(op, data)
+        busy = self._compactor and self._compactor.is_alive()
+        if self.wal.records >= self.compact_threshold and not busy:
+            self._compactor = threading.Thread(target=self._compact_safely, daemon=True)
+            self._compactor.start()
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Memory compaction error: {e}")
+
+    def _load(self):
+        """Load memory from disk"""
+        try:
+            if self.storage_path.exists():
+                with open(self.storage_path, "rb") as f:
+                    snapshot = pickle.load(f)
+                # Legacy snapshots are a bare entry list
+                if isinstance(snapshot, dict):
+                    self._snapshot_lsn = snapshot["lsn"]
+                    self.entries = snapshot["entries"]
+                else:
+                    self.entries = snapshot
+        except Exception as e:
+            print(f"Memory load error: {e}")
+        self._reindex()
+
+        if self.wal:
+            self._replay()
+            self.wal.open()
+        self._catch_up_vectors()
+
+    def _catch_up_vectors(self):
+        """Embed entries the vector index has not seen (new index or crash)"""
+        if self.vectors is None or len(self.vectors) >= len(self.entries):
+            return
+        missing = self.entries[len(self.vectors):]
+        self.vectors.add_many([e["id"] for e in missing], [e["query"] for e in missing])
+
+    def _replay(self):
+        """Apply logged mutations newer than the snapshot"""
+        self.wal.lsn = self._snapshot_lsn
+        for lsn, op, data in self.wal.replay():
+            if lsn <= self._snapshot_lsn:
+                continue
+            if op == "store":
+                data["id"] = len(self.entries)
+                self.entries.append(data)
+                self.index.add(data["id"], data["query"])
+                self._access.append(data["access_count"])
+            elif op == "access":
+                self._bump_access(data)
+
+    def _reindex(self):
+        """Assign positional ids and rebuild the posting index"""
+        for i, entry in enumerate(self.entries):
+            entry["id"] = i
+        self.index.rebuild(self.entries)
+        self._access = Column(np.float64)
+        for entry in self.entries:
+            self._access.append(entry["access_count"])
+
+    def _bump_access(self, ids: List[int]):
+        for i in ids:
+            self.entries[i]["access_count"] += 1
+        if ids:
+            np.add.at(self._access.data, ids, 1)
+
+    def _save(self):
+        """Atomic memory save"""
+        if self._in_memory:
+            return
+        try:
+            self._write_snapshot(self.entries)
+        except Exception as e:
+            print(f"Memory save error: {e}")
+
+    def _write_snapshot(self, data: Any):
+        """Write to a temp file and rename it over the snapshot"""
+        temp_path = self.storage_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump(data, f)
+            if self.wal:
+                f.flush()
+                os.fsync(f.fileno())
+        temp_path.replace(self.storage_path)
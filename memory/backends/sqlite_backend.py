@@ -0,0 +1,220 @@
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict
+from .base import MemoryBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    query TEXT NOT NULL,
+    result TEXT NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(access_count DESC, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    query, result, content='entries', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, query, result) VALUES (new.id, new.query, new.result);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, query, result)
+    VALUES ('delete', old.id, old.query, old.result);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE OF query, result ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, query, result)
+    VALUES ('delete', old.id, old.query, old.result);
+    INSERT INTO entries_fts(rowid, query, result) VALUES (new.id, new.query, new.result);
+END;
+"""
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+def is_sqlite_file(path) -> bool:
+    """True if `path` exists and starts with the SQLite file header"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+def _dump_result(result) -> str:
+    """JSON for a stored result; records with to_dict() are flattened here"""
+    return json.dumps(result, default=lambda o: o.to_dict() if hasattr(o, "to_dict") else str(o))
+
+class SQLiteBackend(MemoryBackend):
+    """SQLite store in WAL mode with FTS5/BM25 retrieval
+
+    Safe to share between processes (API server, CLI, websocket manager);
+    each thread gets its own connection.
+    """
+
+    def __init__(self, db_path: str = "data/memory.sqlite3", query_weight: float = 2.0,
+                 result_weight: float = 1.0, busy_timeout_ms: int = 5000):
+        self.log = logging.getLogger(__name__)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True)
+        if self.db_path.is_file() and self.db_path.stat().st_size and not is_sqlite_file(self.db_path):
+            raise ValueError(f"{db_path} is not a SQLite database (a local backend snapshot?); "
+                             f"use another path or migrate_pickle_to_sqlite")
+        self._uri = False
+        if str(db_path) == ":memory:":
+            # Share one private in-memory database across thread connections
+            self.db_path = f"file:memory_{id(self)}?mode=memory&cache=shared"
+            self._uri = True
+        self.weights = (query_weight, result_weight)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections = []
+        self._conn_lock = threading.Lock()
+        self._keeper = self._conn()
+        with self._keeper as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0,
+                                   check_same_thread=False, uri=self._uri)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+            with self._conn_lock:
+                self._connections.append(conn)
+        return conn
+
+    def store(self, entry: Dict) -> int:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT INTO entries (id, timestamp, query, result, access_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (entry.get("id"), entry["timestamp"], entry["query"],
+                 _dump_result(entry["result"]), entry.get("access_count", 0))
+            )
+        entry["id"] = cur.lastrowid
+        return entry["id"]
+
+    def store_many(self, entries: List[Dict]):
+        """Bulk insert (used by the pickle migrator)"""
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO entries (id, timestamp, query, result, access_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(e.get("id"), e["timestamp"], e["query"],
+                  _dump_result(e["result"]), e.get("access_count", 0))
+                 for e in entries]
+            )
+
+    def get_context(self, query: str, limit: int = 3) -> List[Dict]:
+        """BM25-ranked match over queries and results"""
+        return self.get_context_many([query], limit)[0]
+
+    def get_context_many(self, queries: List[str], limit: int = 3) -> List[List[Dict]]:
+        """Batch retrieval in one transaction with one access-count update"""
+        if limit <= 0:
+            return [[] for _ in queries]
+
+        with self._conn() as conn:
+            batches = []
+            for query in queries:
+                match = self._match_expression(query)
+                batches.append(conn.execute(
+                    "SELECT e.id, e.timestamp, e.query, e.result, e.access_count "
+                    "FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+                    "WHERE entries_fts MATCH ? "
+                    "ORDER BY bm25(entries_fts, ?, ?) LIMIT ?",
+                    (match, *self.weights, limit)
+                ).fetchall() if match else [])
+            accessed = [(row[0],) for rows in batches for row in rows]
+            if accessed:
+                conn.executemany(
+                    "UPDATE entries SET access_count = access_count + 1 WHERE id = ?",
+                    accessed
+                )
+
+        # access_count as returned reflects this batch's own bumps
+        counts: Dict[int, int] = {}
+        for (entry_id,) in accessed:
+            counts[entry_id] = counts.get(entry_id, 0) + 1
+        return [[{
+            "id": row[0],
+            "timestamp": row[1],
+            "query": row[2],
+            "result": json.loads(row[3]),
+            "access_count": row[4] + counts[row[0]]
+        } for row in rows] for rows in batches]
+
+    def rewrite_results(self, fn) -> int:
+        """Migrate stored results in place, in batches"""
+        changed = 0
+        last_id = -1
+        conn = self._conn()
+        while True:
+            rows = conn.execute(
+                "SELECT id, result FROM entries WHERE id > ? ORDER BY id LIMIT 500", (last_id,)
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for entry_id, raw in rows:
+                result = json.loads(raw)
+                new = fn(result)
+                if new is not result:
+                    updates.append((_dump_result(new), entry_id))
+            with conn:
+                conn.executemany("UPDATE entries SET result = ? WHERE id = ?", updates)
+            changed += len(updates)
+            last_id = rows[-1][0]
+        if changed:
+            self.compact()
+            conn.execute("VACUUM")
+        return changed
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def compact(self):
+        """Merge FTS segments and checkpoint the WAL file"""
+        with self._conn() as conn:
+            conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('optimize')")
+        self._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._conn_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """OR together the query words as quoted FTS5 phrases"""
+        words = [w for w in set(query.lower().split()) if any(c.isalnum() for c in w)]
+        return " OR ".join('"' + w.replace('"', '""') + '"' for w in sorted(words))
+
+def migrate_pickle_to_sqlite(pickle_path: str = "data/memory.db",
+                             db_path: str = "data/memory.sqlite3") -> int:
+    """One-shot copy of a pickle MemoryBank (snapshot plus any WAL) into SQLite
+
+    Returns the number of migrated entries. Refuses to write into a
+    database that already holds entries.
+    """
+    from .local import LocalBackend
+
+    wal_path = Path(pickle_path).with_suffix(".wal")
+    source = LocalBackend(pickle_path, persistence="wal" if wal_path.exists() else "snapshot")
+    target = SQLiteBackend(db_path)
+    try:
+        if target.count():
+            raise ValueError(f"{db_path} already contains entries")
+        target.store_many(source.entries)
+        return len(source.entries)
+    finally:
+        source.close()
+        target.close()
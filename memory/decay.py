@@ -0,0 +1,189 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+class DecayEngine:
+    """Vectorised retention weights for large memory stores
+
+    Importance, access frequency, emotional valence and last-access time
+    live in parallel NumPy arrays. Each memory's weight is
+
+        importance + alpha * freq + beta * valence - gamma * elapsed
+
+    with `elapsed` measured in `time_unit` seconds. It is computed for every
+    memory in one pass, and memories below `threshold` are evicted by
+    compacting the arrays in place. All methods are thread-safe, so a
+    maintenance thread can evict while callers add and touch memories.
+    """
+
+    def __init__(self, alpha: float = 0.15, beta: float = 0.12, gamma: float = 0.03,
+                 threshold: float = 0.05, time_unit: float = 3600.0, capacity: int = 1024):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.threshold = threshold
+        self.time_unit = time_unit
+        self.size = 0
+        self.keys = np.empty(capacity, dtype=object)
+        self.importance = np.zeros(capacity, dtype=np.float64)
+        self.frequency = np.zeros(capacity, dtype=np.float64)
+        self.valence = np.zeros(capacity, dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.weights = np.zeros(capacity, dtype=np.float64)
+        self._rows: Optional[Dict[Any, int]] = {}
+        self.listeners: List[Callable[[Any, float], None]] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return key in self._row_map()
+
+    def add(self, key: Any, importance: float = 0.7, valence: float = 0.0,
+            timestamp: Optional[float] = None):
+        """Track a new memory"""
+        with self._lock:
+            self._reserve(self.size + 1)
+            row = self.size
+            self.keys[row] = key
+            self.importance[row] = importance
+            self.frequency[row] = 0.0
+            self.valence[row] = valence
+            self.timestamps[row] = time.time() if timestamp is None else timestamp
+            self.weights[row] = importance
+            self._row_map()[key] = row
+            self.size += 1
+            expiry = float(self._expiry_rows(slice(row, row + 1))[0]) if self.listeners else None
+        # Listeners run outside the lock so they may call back in
+        for listener in list(self.listeners):
+            listener(key, expiry)
+
+    def clear(self):
+        """Forget every memory; capacity is kept"""
+        with self._lock:
+            self.keys[:self.size] = None
+            self.size = 0
+            self._rows = {}
+
+    def touch(self, key: Any, timestamp: Optional[float] = None):
+        """Record an access: bumps frequency and resets elapsed time
+
+        Unknown keys (e.g. evicted a moment ago) are ignored.
+        """
+        with self._lock:
+            row = self._row_map().get(key)
+            if row is None:
+                return
+            self.frequency[row] += 1
+            self.timestamps[row] = time.time() if timestamp is None else timestamp
+
+    def weight(self, key: Any) -> float:
+        with self._lock:
+            return float(self.weights[self._row_map()[key]])
+
+    def apply(self, now: Optional[float] = None, threshold: Optional[float] = None) -> np.ndarray:
+        """Recompute all weights; returns the eviction mask over live rows"""
+        with self._lock:
+            n = self.size
+            now = time.time() if now is None else now
+            elapsed = (now - self.timestamps[:n]) / self.time_unit
+            np.multiply(self.frequency[:n], self.alpha, out=self.weights[:n])
+            self.weights[:n] += self.importance[:n]
+            self.weights[:n] += self.beta * self.valence[:n]
+            self.weights[:n] -= self.gamma * elapsed
+            return self.weights[:n] < (self.threshold if threshold is None else threshold)
+
+    def compact(self, evict: np.ndarray) -> List[Any]:
+        """Drop rows flagged in `evict` in place; returns their keys
+
+        `evict` must cover the rows live when it was computed, so callers
+        pairing it with apply() should hold the lock (as decay() does).
+        """
+        with self._lock:
+            n = self.size
+            if not evict.any():
+                return []
+            evicted = self.keys[:n][evict].tolist()
+            keep = ~evict
+            kept = int(keep.sum())
+            for column in (self.keys, self.importance, self.frequency,
+                           self.valence, self.timestamps, self.weights):
+                column[:kept] = column[:n][keep]
+            self.keys[kept:n] = None
+            self.size = kept
+            self._rows = None  # Rebuilt lazily on the next keyed access
+            return evicted
+
+    def evict(self, keys: Iterable[Any]) -> List[Any]:
+        """Drop specific memories; unknown keys are ignored"""
+        with self._lock:
+            rows = self._row_map()
+            evict = np.zeros(self.size, dtype=bool)
+            evict[[rows[k] for k in keys if k in rows]] = True
+            return self.compact(evict)
+
+    def evict_due(self, keys: List[Any], now: float) -> Tuple[List[Any], List[Tuple[Any, float]]]:
+        """Evict the keys whose expiry has passed, atomically
+
+        Returns the evicted keys and (key, expiry) for those that are still
+        live because they were accessed since being scheduled.
+        """
+        with self._lock:
+            expiries = self.expiry_of(keys)
+            due = [key for key, expiry in zip(keys, expiries) if expiry <= now]
+            pending = [(key, float(expiry)) for key, expiry in zip(keys, expiries)
+                       if now < expiry < float("inf")]
+            return self.evict(due), pending
+
+    def expiry_of(self, keys: List[Any]) -> np.ndarray:
+        """Projected expiry for the given keys (inf when unknown)"""
+        with self._lock:
+            rows = self._row_map()
+            known = [rows.get(k, -1) for k in keys]
+            idx = np.array([r for r in known if r >= 0], dtype=np.int64)
+            out = np.full(len(keys), np.inf)
+            if len(idx):
+                mask = np.array(known) >= 0
+                out[mask] = self._expiry_rows(idx)
+            return out
+
+    def decay(self, now: Optional[float] = None, threshold: Optional[float] = None) -> List[Any]:
+        """apply() then compact(); returns evicted keys"""
+        with self._lock:
+            return self.compact(self.apply(now, threshold))
+
+    def projected_expiry(self) -> np.ndarray:
+        """Time at which each memory's weight falls to the threshold"""
+        with self._lock:
+            return self._expiry_rows(slice(0, self.size))
+
+    def snapshot(self):
+        """(keys, projected expiries) of the live rows, read together"""
+        with self._lock:
+            return self.keys[:self.size].tolist(), self._expiry_rows(slice(0, self.size))
+
+    def _expiry_rows(self, rows) -> np.ndarray:
+        if self.gamma <= 0:
+            return np.full(len(self.timestamps[rows]), np.inf)
+        headroom = (self.importance[rows] + self.alpha * self.frequency[rows]
+                    + self.beta * self.valence[rows] - self.threshold)
+        return self.timestamps[rows] + headroom / self.gamma * self.time_unit
+
+    def _row_map(self) -> Dict[Any, int]:
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self.keys[:self.size])}
+        return self._rows
+
+    def _reserve(self, needed: int):
+        capacity = len(self.keys)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity)
+        for name in ("keys", "importance", "frequency", "valence", "timestamps", "weights"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype) if old.dtype == object else np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
@@ -0,0 +1,199 @@
+import math
+import heapq
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+class Column:
+    """Growable numpy array; appends and sets are amortised O(1)"""
+
+    def __init__(self, dtype, capacity: int = 8):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, value):
+        self.set(self.size, value)
+
+    def set(self, i: int, value):
+        if i >= len(self.data):
+            grown = np.zeros(max(2 * len(self.data), i + 1), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[i] = value
+        self.size = max(self.size, i + 1)
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+class InvertedIndex:
+    """Token -> entry-id posting lists for memory recall
+
+    Postings keep per-entry term frequencies, and document lengths are
+    tracked as entries are added, so BM25 statistics never need a rescan.
+    Tokens with at least `dense_min_df` postings also keep them as numpy
+    columns, appended to in place, so BM25 scores a common word with a
+    few vector operations instead of a Python loop over its postings.
+    Entry ids must be non-negative ints.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, dense_min_df: int = 32,
+                 max_df_ratio: float = 0.5):
+        self.k1 = k1
+        self.b = b
+        self.dense_min_df = dense_min_df
+        self.max_df_ratio = max_df_ratio
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+        self._dense: Dict[str, Tuple[Column, Column]] = {}
+        self._by_id: Dict[str, Column] = {}
+        self._lengths = Column(np.float32)
+
+    @staticmethod
+    def tokenize(text: str) -> Set[str]:
+        """Same word split MemoryBank has always used for relevance"""
+        return set(text.lower().split())
+
+    def add(self, entry_id: int, text: str):
+        """Index a single entry"""
+        words = text.lower().split()
+        for token, tf in Counter(words).items():
+            posting = self.postings.setdefault(token, {})
+            fresh = entry_id not in posting
+            posting[entry_id] = tf
+            by_id = self._by_id.get(token)
+            if by_id is not None:
+                by_id.set(entry_id, tf)
+            dense = self._dense.get(token)
+            if dense is not None:
+                if fresh and entry_id > dense[0].data[dense[0].size - 1]:
+                    dense[0].append(entry_id)
+                    dense[1].append(tf)
+                else:
+                    # Re-added or out of order: rebuilt sorted on next use
+                    del self._dense[token]
+        self.doc_lengths[entry_id] = len(words)
+        self.total_length += len(words)
+        self._lengths.set(entry_id, len(words))
+
+    def rebuild(self, entries: Iterable[Dict]):
+        """Rebuild postings from scratch (used after loading from disk)"""
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+        self._dense = {}
+        self._by_id = {}
+        self._lengths = Column(np.float32)
+        for entry in entries:
+            self.add(entry["id"], entry["query"])
+
+    def candidates(self, query: str) -> Set[int]:
+        """Ids of entries sharing at least one word with the query"""
+        matched: Set[int] = set()
+        for token in self.tokenize(query):
+            posting = self.postings.get(token)
+            if posting:
+                matched.update(posting)
+        return matched
+
+    def top_k(self, query: str, limit: int, key: Callable[[int], tuple]) -> List[int]:
+        """Smallest `limit` candidate ids by `key`, using a bounded heap"""
+        if limit <= 0:
+            return []
+        return heapq.nsmallest(limit, self.candidates(query), key=key)
+
+    def bm25(self, query: str) -> Dict[int, float]:
+        """BM25 score of every entry matching the query"""
+        ids, scores = self.bm25_arrays(query)
+        return dict(zip(ids.tolist(), scores.tolist()))
+
+    def bm25_arrays(self, query: str, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Matching ids (ascending) and their BM25 scores, as arrays
+
+        With `limit`, terms found in more than `max_df_ratio` of entries
+        (what, is, a...) do not add candidates of their own once the rarer
+        terms already match at least `limit` entries; they are still
+        scored for those entries. This keeps a query over a large bank
+        from touching nearly every posting.
+        """
+        n_docs = len(self.doc_lengths)
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        if not n_docs:
+            return empty
+        terms = []
+        for token in self.tokenize(query):
+            posting = self.postings.get(token)
+            if posting:
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                terms.append((token, df, idf, self._posting_arrays(token, posting)))
+        if not terms:
+            return empty
+
+        if limit is not None:
+            cutoff = self.max_df_ratio * n_docs
+            rare = [t for t in terms if t[1] <= cutoff]
+            if rare and len(rare) < len(terms):
+                ids, scores = self._accumulate(rare)
+                if len(ids) >= limit:
+                    for token, _, idf, _ in (t for t in terms if t[1] > cutoff):
+                        tfs = self._tf_by_id(token, ids)
+                        hit = tfs > 0
+                        scores[hit] += self._term_scores(idf, ids[hit], tfs[hit])
+                    return ids, scores
+        return self._accumulate(terms)
+
+    def _accumulate(self, terms) -> Tuple[np.ndarray, np.ndarray]:
+        if len(terms) == 1:
+            _, _, idf, (ids, tfs) = terms[0]
+            return ids, self._term_scores(idf, ids, tfs)
+        acc = np.zeros(len(self._lengths))
+        matched = np.zeros(len(self._lengths), dtype=bool)
+        for _, _, idf, (ids, tfs) in terms:
+            # Ids are unique within a posting, so fancy-index += is safe
+            acc[ids] += self._term_scores(idf, ids, tfs)
+            matched[ids] = True
+        ids = np.flatnonzero(matched)
+        return ids, acc[ids]
+
+    def _term_scores(self, idf: float, ids: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        k1, b = self.k1, self.b
+        avg_length = self.total_length / len(self.doc_lengths) or 1.0
+        norm = k1 * (1 - b) + (k1 * b / avg_length) * self._lengths.view()[ids]
+        return idf * tfs * (k1 + 1) / (tfs + norm)
+
+    def _tf_by_id(self, token: str, ids: np.ndarray) -> np.ndarray:
+        """Term frequency of `token` in each of `ids` (0 where absent)
+
+        Backed by a column indexed by entry id, kept only for common
+        tokens, so looking up many candidates is a single gather.
+        """
+        column = self._by_id.get(token)
+        if column is None:
+            column = self._by_id[token] = Column(np.float64, len(self._lengths))
+            for entry_id, tf in self.postings[token].items():
+                column.set(entry_id, tf)
+        full = column.view()
+        tfs = np.zeros(len(ids))
+        inside = ids < len(full)
+        tfs[inside] = full[ids[inside]]
+        return tfs
+
+    def _posting_arrays(self, token: str, posting: Dict[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids (ascending) and term frequencies of a posting"""
+        dense = self._dense.get(token)
+        if dense is None:
+            ids = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            tfs = np.fromiter(posting.values(), dtype=np.float64, count=len(posting))
+            order = np.argsort(ids, kind="stable")
+            ids, tfs = ids[order], tfs[order]
+            if len(posting) < self.dense_min_df:
+                return ids, tfs
+            dense = (Column(np.int64), Column(np.float64))
+            for column, values in zip(dense, (ids, tfs)):
+                column.data, column.size = values, len(values)
+            self._dense[token] = dense
+        return dense[0].view(), dense[1].view()
@@ -0,0 +1,151 @@
+import os
+import time
+import zlib
+import pickle
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+FSYNC_POLICIES = ("always", "interval", "os")
+
+class WriteAheadLog:
+    """Append-only framed log of memory mutations
+
+    Each frame is a 4-byte length, a 4-byte CRC32 and a pickled
+    (lsn, op, data) tuple. A torn or corrupt frame marks the end of the log.
+
+    With the "interval" policy a background flusher syncs unsynced
+    records every `fsync_interval_ms`, so the bound holds after traffic
+    stops too; close() stops it.
+    """
+    HEADER = struct.Struct(">II")
+
+    def __init__(self, path: Path, fsync: str = "interval", fsync_interval_ms: int = 1000):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Invalid fsync policy. Choose from: {list(FSYNC_POLICIES)}")
+        self.log = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self.lsn = 0
+        self.records = 0
+        self._file = None
+        self._last_sync = time.monotonic()
+        self._dirty = False
+        # Appends, syncs and file swaps vs. the flusher thread
+        self._io_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def replay(self) -> Iterator[Tuple[int, str, Any]]:
+        """Yield every intact record and drop any torn tail"""
+        if not self.path.exists():
+            return
+        good_offset = 0
+        with open(self.path, "rb") as f:
+            while True:
+                header = f.read(self.HEADER.size)
+                if len(header) < self.HEADER.size:
+                    break
+                length, crc = self.HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    self.log.warning(f"Discarding torn log tail at offset {good_offset}")
+                    break
+                lsn, op, data = pickle.loads(payload)
+                good_offset = f.tell()
+                self.lsn = max(self.lsn, lsn)
+                self.records += 1
+                yield lsn, op, data
+        if good_offset < self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(good_offset)
+
+    def open(self):
+        """Open the log for appending"""
+        with self._io_lock:
+            self._file = open(self.path, "ab")
+        if self.fsync == "interval" and self._flusher is None:
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    def append(self, op: str, data: Any) -> int:
+        """Append one record and apply the fsync policy"""
+        with self._io_lock:
+            self.lsn += 1
+            payload = pickle.dumps((self.lsn, op, data), protocol=pickle.HIGHEST_PROTOCOL)
+            self._file.write(self.HEADER.pack(len(payload), zlib.crc32(payload)))
+            self._file.write(payload)
+            self._file.flush()
+            self.records += 1
+            self._dirty = True
+
+            if self.fsync == "always":
+                self.sync()
+            elif self.fsync == "interval" and time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+            return self.lsn
+
+    def tell(self) -> int:
+        return self._file.tell() if self._file else 0
+
+    def sync(self):
+        """Force appended records to stable storage"""
+        with self._io_lock:
+            if self._file:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._last_sync = time.monotonic()
+                self._dirty = False
+
+    def _flush_loop(self):
+        """Interval policy: sync whatever an idle log still holds unsynced"""
+        while not self._stop.wait(self.fsync_interval):
+            with self._io_lock:
+                if self._dirty and time.monotonic() - self._last_sync >= self.fsync_interval:
+                    try:
+                        self.sync()
+                    except (OSError, ValueError) as e:
+                        self.log.error(f"WAL background sync failed: {e}")
+
+    def truncate_before(self, offset: int):
+        """Drop everything before `offset`, keeping records appended since"""
+        with self._io_lock:
+            self._file.flush()
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                tail = f.read()
+
+            temp_path = self.path.with_suffix(".wal.tmp")
+            with open(temp_path, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            temp_path.replace(self.path)
+            self.open()
+            # The rewritten file was synced above
+            self._dirty = False
+            self.records = self._count(tail)
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._io_lock:
+            if self._file:
+                self.sync()
+                self._file.close()
+                self._file = None
+
+    def _count(self, data: bytes) -> int:
+        count, offset = 0, 0
+        while offset + self.HEADER.size <= len(data):
+            length, _ = self.HEADER.unpack_from(data, offset)
+            offset += self.HEADER.size + length
+            count += 1
+        return count
@@ -0,0 +1,28 @@
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from memory import MemoryBank
+from engine.subsystems.memory_interface import MemoryInterface
+
+def main():
+    parser = argparse.ArgumentParser(description="Shrink stored interactions to compact records")
+    parser.add_argument("--path", default=None,
+                        help="Memory store path (default: the backend's own file)")
+    parser.add_argument("--backend", default="local", choices=["local", "sqlite"])
+    parser.add_argument("--persistence", default="snapshot", choices=["snapshot", "wal"],
+                        help="Local backend persistence mode")
+    args = parser.parse_args()
+
+    options = {"persistence": args.persistence} if args.backend == "local" else {}
+    memory = MemoryBank(args.path, backend=args.backend, **options)
+    try:
+        changed = MemoryInterface(memory).compact_store()
+    finally:
+        memory.close()
+    print(f"Compacted {changed} interactions in {args.path or f'the default {args.backend} store'}")
+
+if __name__ == "__main__":
+    main()
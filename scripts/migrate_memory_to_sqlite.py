@@ -0,0 +1,19 @@
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from memory.backends import migrate_pickle_to_sqlite
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy a pickle MemoryBank into the SQLite backend")
+    parser.add_argument("--source", default="data/memory.db", help="Pickle snapshot path")
+    parser.add_argument("--target", default="data/memory.sqlite3", help="SQLite database path")
+    args = parser.parse_args()
+
+    count = migrate_pickle_to_sqlite(args.source, args.target)
+    print(f"Migrated {count} entries from {args.source} to {args.target}")
+
+if __name__ == "__main__":
+    main()
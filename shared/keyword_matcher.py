@@ -0,0 +1,123 @@
+# keyword_matcher.py
+import json
+import functools
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+KEYWORD_TABLES = Path(__file__).parent.parent / "config" / "keyword_tables.json"
+
+class KeywordHit(NamedTuple):
+    table: str
+    category: str
+    keyword: str
+    start: int
+    end: int
+    weight: float
+
+class KeywordMatcher:
+    """Every keyword table compiled into one Aho-Corasick automaton
+
+    Tables look like {"table": {"default": ..., "categories": {category:
+    {"keywords": [...], "weight": w}}}}; category order is priority order.
+    scan() walks the lowercased text once and reports every keyword
+    occurrence, as a substring, for all tables, so adding keywords does
+    not add passes over the query.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, Any]], cache_size: int = 1024):
+        self.tables = tables
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str, str, float]]] = [[]]
+        for table, spec in tables.items():
+            for category, entry in spec.get("categories", {}).items():
+                weight = float(entry.get("weight", 1.0))
+                for keyword in entry.get("keywords", []):
+                    self._add(keyword.lower(), (table, category, keyword.lower(), weight))
+        self._link()
+        self._scan = functools.lru_cache(maxsize=cache_size)(self._scan_uncached)
+
+    @classmethod
+    def from_file(cls, path=KEYWORD_TABLES) -> "KeywordMatcher":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_keywords(cls, table: str, keywords: Dict[str, List[str]],
+                      default: Optional[str] = None) -> "KeywordMatcher":
+        """Matcher for a single {category: [keywords]} table"""
+        return cls({table: {"default": default, "categories": {
+            category: {"keywords": words} for category, words in keywords.items()
+        }}})
+
+    def scan(self, text: str, table: Optional[str] = None) -> List[KeywordHit]:
+        """All keyword occurrences in `text`, ordered by end position
+
+        Positions index the lowercased text.
+
+        Results for recent texts are cached, so the consumers of one
+        request share a single pass.
+        """
+        hits = self._scan(text.lower())
+        return [hit for hit in hits if table is None or hit.table == table]
+
+    def classify(self, text: str, table: str) -> Optional[str]:
+        """Highest-priority category of `table` with a hit, else its default"""
+        hit = {h.category for h in self.scan(text, table)}
+        for category in self.tables[table].get("categories", {}):
+            if category in hit:
+                return category
+        return self.tables[table].get("default")
+
+    def scores(self, text: str, table: str) -> Dict[str, float]:
+        """Summed hit weights per category of `table`"""
+        totals: Dict[str, float] = {}
+        for hit in self.scan(text, table):
+            totals[hit.category] = totals.get(hit.category, 0.0) + hit.weight
+        return totals
+
+    def _add(self, keyword: str, output: Tuple[str, str, str, float]):
+        if not keyword:
+            return
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(output)
+
+    def _link(self):
+        """Breadth-first failure links; outputs inherit their fallback's"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _scan_uncached(self, text: str) -> Tuple[KeywordHit, ...]:
+        hits = []
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for table, category, keyword, weight in out[node]:
+                hits.append(KeywordHit(table, category, keyword, i - len(keyword) + 1, i + 1, weight))
+        return tuple(hits)
+
+@functools.lru_cache(maxsize=None)
+def keyword_matcher() -> KeywordMatcher:
+    """Process-wide matcher over config/keyword_tables.json"""
+    return KeywordMatcher.from_file()
@@ -0,0 +1,37 @@
+# query_keys.py
+import re
+import json
+import hashlib
+from typing import AbstractSet, Any, Dict, Optional
+
+# Context keys that vary per request without changing the answer
+VOLATILE_CONTEXT = {"mode", "fanout", "cache", "query", "memory", "linguistic", "inferred"}
+
+# Decimals, words in any script, and operator symbols, which change what
+# a query asks ("2+2" vs "2*2"); everything else is sentence punctuation
+QUERY_TOKEN = re.compile(r"\d+(?:\.\d+)+|\w+|[+\-*/=<>%^&|~#$@]")
+
+def normalize_query(query: str) -> str:
+    """Casefold, expand 's/'re, drop sentence punctuation and extra whitespace
+
+    Letters and digits of any script are kept, as are operator symbols,
+    which become tokens of their own so "2+2" and "2 + 2" agree.
+    """
+    query = query.casefold().replace("’", "'")
+    query = re.sub(r"'s\b", " is", query)
+    query = re.sub(r"'re\b", " are", query)
+    return " ".join(QUERY_TOKEN.findall(query))
+
+def context_fingerprint(context: Optional[Dict[str, Any]],
+                        volatile: AbstractSet[str] = VOLATILE_CONTEXT) -> str:
+    """Digest of the parts of the context that can change the answer
+
+    `volatile` names the top-level keys to leave out; the default fits the
+    engine-built context, where caller-supplied keys sit under "user".
+    """
+    context = context or {}
+    relevant = {k: v for k, v in context.items() if k not in volatile}
+    if isinstance(relevant.get("user"), dict):
+        relevant["user"] = {k: v for k, v in relevant["user"].items() if k != "cache"}
+    blob = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
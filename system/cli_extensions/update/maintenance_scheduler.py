@@ -1,22 +1,220 @@
 # Maintenance Scheduler
 import time
+import heapq
+import random
+import logging
 import threading
-from slick.memory.memory_core import MemoryBank
+from typing import Any, Callable, Dict, List, Optional
+
+class MaintenanceJob:
+    """A registered periodic job and its run statistics"""
+
+    def __init__(self, name: str, func: Callable, interval: float,
+                 jitter: float = 0.1, time_budget: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.time_budget = time_budget
+        self.runs = 0
+        self.errors = 0
+        self.over_budget = 0
+        self.items = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_run: Optional[float] = None
+
+    def next_due(self, now: float) -> float:
+        spread = self.interval * self.jitter
+        return now + self.interval + random.uniform(-spread, spread)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "over_budget": self.over_budget,
+            "items": self.items,
+            "avg_time": self.total_time / self.runs if self.runs else 0.0,
+            "max_time": self.max_time,
+            "last_run": self.last_run
+        }
 
 class MaintenanceScheduler:
-    def __init__(self, memory_bank):
+    """Deadline-driven maintenance
+
+    Jobs sit in a min-heap keyed by their next due time, and memory expiry
+    times sit in a second min-heap fed by the memory bank's DecayEngine.
+    The worker sleeps until the earliest deadline, then runs only what is
+    due, in bounded batches and within each job's time budget.
+    """
+
+    def __init__(self, memory_bank=None, batch_size: int = 1000,
+                 decay_budget: float = 0.05, progress_manager=None):
+        self.log = logging.getLogger(__name__)
         self.memory_bank = memory_bank
-        self.running = True
-        
+        self.batch_size = batch_size
+        self.running = False
+        self.jobs: Dict[str, MaintenanceJob] = {}
+        self._job_heap: List[tuple] = []
+        self._expiry_heap: List[tuple] = []
+        self._seq = 0
+        self._decay_resume = 0.0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.decay = getattr(memory_bank, "decay", None)
+        if self.decay is not None:
+            self.decay_job = MaintenanceJob("decay", self._run_decay, 0, 0, decay_budget)
+            self.jobs["decay"] = self.decay_job
+            self._seed_expiries()
+            self.decay.listeners.append(self.track)
+        elif hasattr(memory_bank, "apply_decay"):
+            # Banks without a DecayEngine keep the old periodic sweep
+            self.register_job("decay", memory_bank.apply_decay, interval=3600)
+        if hasattr(memory_bank, "compact"):
+            self.register_job("compaction", memory_bank.compact, interval=3600)
+        if progress_manager is not None:
+            self.register_job("save_cleanup", progress_manager.cleanup_old_saves, interval=86400)
+
+    def register_job(self, name: str, func: Callable, interval: float,
+                     jitter: float = 0.1, time_budget: Optional[float] = None,
+                     run_now: bool = False):
+        """Add a periodic job
+
+        Jobs with a time_budget are called as func(deadline) and may return
+        True to ask for an immediate follow-up run; others as func().
+        """
+        job = MaintenanceJob(name, func, interval, jitter, time_budget)
+        with self._cond:
+            self.jobs[name] = job
+            self._push_job(job, time.time() if run_now else job.next_due(time.time()))
+            self._cond.notify()
+        return job
+
+    def track(self, key: Any, expiry: float):
+        """Schedule a memory for an expiry check at `expiry`"""
+        with self._cond:
+            earliest = self._expiry_heap[0][0] if self._expiry_heap else float("inf")
+            heapq.heappush(self._expiry_heap, (expiry, self._next_seq(), key))
+            if expiry < earliest:
+                self._cond.notify()
+
     def start(self):
-        def run():
-            while self.running:
-                # Apply memory decay every hour
-                self.memory_bank.apply_decay()
-                time.sleep(3600)
-                
-        thread = threading.Thread(target=run, daemon=True)
-        thread.start()
-        
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
     def stop(self):
-        self.running = False
\ No newline at end of file
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Run everything due at `now`; returns the number of job runs"""
+        now = time.time() if now is None else now
+        ran = 0
+        if self._expiry_heap and self._expiry_heap[0][0] <= now and self._decay_resume <= now:
+            ran += 1
+            if self._run_job(self.decay_job, now):
+                # Backlog left: rest as long as we worked so the cost stays flat
+                self._decay_resume = now + self.decay_job.time_budget
+        while self._job_heap and self._job_heap[0][0] <= now:
+            with self._cond:
+                _, _, name = heapq.heappop(self._job_heap)
+            job = self.jobs[name]
+            more = self._run_job(job, now)
+            with self._cond:
+                self._push_job(job, now if more else job.next_due(now))
+            ran += 1
+        return ran
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {name: job.stats() for name, job in self.jobs.items()}
+        stats["_queue"] = {"jobs": len(self._job_heap), "tracked_memories": len(self._expiry_heap)}
+        return stats
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if not self.running:
+                    return
+                delay = self._next_deadline() - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=min(delay, 3600))
+                    continue
+            self.run_pending()
+
+    def _next_deadline(self) -> float:
+        deadlines = []
+        if self._job_heap:
+            deadlines.append(self._job_heap[0][0])
+        if self._expiry_heap:
+            deadlines.append(max(self._expiry_heap[0][0], self._decay_resume))
+        return min(deadlines) if deadlines else float("inf")
+
+    def _run_job(self, job: MaintenanceJob, now: float) -> bool:
+        start = time.monotonic()
+        more = False
+        try:
+            if job.time_budget is not None:
+                more = bool(job.func(start + job.time_budget))
+            else:
+                job.func()
+        except Exception as e:
+            job.errors += 1
+            self.log.error(f"Maintenance job {job.name} failed: {e}")
+        duration = time.monotonic() - start
+        job.runs += 1
+        job.total_time += duration
+        job.max_time = max(job.max_time, duration)
+        job.last_run = now
+        if job.time_budget is not None and duration > job.time_budget:
+            job.over_budget += 1
+        return more
+
+    def _run_decay(self, deadline: float) -> bool:
+        """Evict due memories batch by batch until the budget runs out
+
+        Heap entries go stale when a memory is accessed after being
+        tracked; those are re-queued at their new expiry instead of evicted.
+        """
+        now = time.time()
+        while time.monotonic() < deadline:
+            with self._cond:
+                batch = []
+                while self._expiry_heap and self._expiry_heap[0][0] <= now and len(batch) < self.batch_size:
+                    batch.append(heapq.heappop(self._expiry_heap)[2])
+            if not batch:
+                return False
+
+            # Checked and evicted under the engine's lock, so a memory
+            # touched concurrently is re-queued rather than lost
+            evicted, pending = self.decay.evict_due(batch, now)
+            for key, expiry in pending:
+                self.track(key, expiry)
+            self._forget(evicted)
+            self.decay_job.items += len(evicted)
+        return bool(self._expiry_heap) and self._expiry_heap[0][0] <= now
+
+    def _forget(self, keys: List[Any]):
+        """Remove evicted memories from the owning store"""
+        store = getattr(self.memory_bank, "long_term", None)
+        if store is None:
+            return
+        for key in keys:
+            store.pop(key, None)
+
+    def _seed_expiries(self):
+        keys, expiries = self.decay.snapshot()
+        self._expiry_heap = [(float(e), i, k) for i, (e, k) in enumerate(zip(expiries, keys))]
+        heapq.heapify(self._expiry_heap)
+        self._seq = len(self._expiry_heap)
+
+    def _push_job(self, job: MaintenanceJob, due: float):
+        heapq.heappush(self._job_heap, (due, self._next_seq(), job.name))
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
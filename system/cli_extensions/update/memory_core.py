@@ -1,24 +1,60 @@
-import datetime
-from dateutil.parser import parse
+from datetime import datetime
+from memory.decay import DecayEngine
 
 class MemoryBank:
     def __init__(self):
-        self.long_term = {}
         self.decay_alpha = 0.15
         self.decay_beta = 0.12
+        self.decay_gamma = 0.03
+        self.decay = DecayEngine(alpha=self.decay_alpha, beta=self.decay_beta,
+                                 gamma=self.decay_gamma)
+        self.long_term = {}
+
+    @property
+    def long_term(self):
+        return self._long_term
+
+    @long_term.setter
+    def long_term(self, memories):
+        """Replacing the store (reset, restore) rebuilds the decay state"""
+        self._long_term = memories
+        self.decay.clear()
+        for mem_id, memory in memories.items():
+            self.decay.add(mem_id, memory.get('importance', 0.7), memory.get('valence', 0.0),
+                           timestamp=_epoch(memory.get('timestamp')))
         
-    def add_memory(self, event, importance=0.7):
+    def add_memory(self, event, importance=0.7, valence=0.0):
         mem_id = f"mem_{len(self.long_term)+1}"
+        while mem_id in self.long_term:
+            mem_id = f"mem_{int(mem_id[4:]) + 1}"
         self.long_term[mem_id] = {
             'content': event,
             'timestamp': datetime.now().isoformat(),
             'importance': importance,
             'decayed': importance
         }
+        self.decay.add(mem_id, importance, valence)
         return mem_id
+
+    def recall(self, mem_id):
+        """Fetch a memory and count the access towards its retention"""
+        self.decay.touch(mem_id)
+        return self.long_term[mem_id]
         
     def apply_decay(self, aggressive=False):
-        for mem_id, mem in list(self.long_term.items()):
-            # Decay calculation logic here
-            if mem['decayed'] < 0.05:
-                del self.long_term[mem_id]
\ No newline at end of file
+        """Decay every memory in one vectorised pass and drop the expired ones"""
+        threshold = self.decay.threshold * (4 if aggressive else 1)
+        for mem_id in self.decay.decay(threshold=threshold):
+            self.long_term.pop(mem_id, None)
+        return len(self.long_term)
+
+    def current_weight(self, mem_id):
+        """Live decayed weight (the stored 'decayed' field is the initial value)"""
+        return self.decay.weight(mem_id)
+
+def _epoch(timestamp):
+    """ISO timestamp to epoch seconds; None (now) if missing or unparseable"""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
@@ -81,23 +81,43 @@ class PlaceholderSkillRepo:
 class PlaceholderCognitiveRanker:
     def __call__(self, query, memories, weights): return memories[0] # Simplified
 
+def _default_vector_db():
+    """Local embedding index when NumPy is available, placeholder otherwise"""
+    try:
+        from knowledge.embedding_engine import VectorIndex
+        return VectorIndex()
+    except ImportError:
+        return PlaceholderDB()
+
 class MemorySystem:
-    def __init__(self, user_profile: 'UserProfile', ai_preferences: 'AIResponsePreferences'):
+    def __init__(self, user_profile: 'UserProfile', ai_preferences: 'AIResponsePreferences',
+                 vector_db=None):
         self.user_profile = user_profile
         self.ai_preferences = ai_preferences
         self.nodes = [] # To store MemoryNode instances
         # These would be initialized properly, e.g., connecting to actual databases
-        self.vector_db = PlaceholderDB() # Example: ChromaDB()
+        self.vector_db = vector_db if vector_db is not None else _default_vector_db()
         self.knowledge_graph = PlaceholderDB() # Example: nx.DiGraph() or Neo4j connection
         self.procedural = PlaceholderSkillRepo() # Manages skills/procedures
         self.cognitive_ranker = PlaceholderCognitiveRanker()
 
     def add_memory_node(self, node: MemoryNode):
         self.nodes.append(node)
+        if hasattr(self.vector_db, 'add'):
+            # Use the node's own embedding when it fits the index, else embed its context
+            embeddings = node.embeddings
+            fits = isinstance(embeddings, (list, tuple)) and len(embeddings) == self.vector_db.dim
+            self.vector_db.add(
+                node.event_id,
+                text=None if fits else json.dumps(node.sensory_context, default=str),
+                vector=embeddings if fits else None,
+                payload=dict(node.sensory_context or {}, timestamp=node.timestamp)
+            )
 
     def contextual_recall(self, query: str, user_context: dict, depth=3):
         # Query memory subsystems
-        episodic = self.vector_db.search(query, filter=user_context.get('location'))
+        location = user_context.get('location')
+        episodic = self.vector_db.search(query, filter={'location': location} if location else None)
         semantic = self.knowledge_graph.query(f"MATCH (n) WHERE n CONTAINS '{query}' RETURN n") # Placeholder query
         procedural = self.procedural.match_capability(query)
         
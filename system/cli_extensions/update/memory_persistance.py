@@ -1,18 +1,151 @@
 import json
 import zlib
 import pickle
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
+
+# Chunked state files: a file header, then length-prefixed chunks. Each
+# chunk body is seq + final flag + compressed data, wrapped in a Fernet
+# token when a key is set (or followed by a CRC32 otherwise), so chunks
+# can't be dropped, reordered or truncated without the load failing.
+STATE_MAGIC = b"SMEM"
+STATE_HEADER = struct.Struct(">4sBBI")
+CHUNK_LENGTH = struct.Struct(">I")
+CHUNK_PREFIX = struct.Struct(">QB")
+FLAG_ENCRYPTED = 1
+
+class _ChunkWriter:
+    """File-like sink that compresses/encrypts fixed-size chunks on a pool"""
+
+    def __init__(self, f, executor, cipher, chunk_size, level, max_pending):
+        self.f = f
+        self.executor = executor
+        self.cipher = cipher
+        self.chunk_size = chunk_size
+        self.level = level
+        self.max_pending = max_pending
+        self.buffer = bytearray()
+        self.pending = deque()
+        self.seq = 0
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= self.chunk_size:
+            self._submit(bytes(self.buffer[:self.chunk_size]), final=False)
+            del self.buffer[:self.chunk_size]
+        return len(data)
+
+    def close(self):
+        self._submit(bytes(self.buffer), final=True)
+        self.buffer.clear()
+        while self.pending:
+            self._write_oldest()
+
+    def _submit(self, data: bytes, final: bool):
+        self.pending.append(self.executor.submit(self._seal, self.seq, final, data))
+        self.seq += 1
+        # Bound memory: chunks in flight never exceed max_pending
+        while len(self.pending) > self.max_pending:
+            self._write_oldest()
+
+    def _write_oldest(self):
+        sealed = self.pending.popleft().result()
+        self.f.write(CHUNK_LENGTH.pack(len(sealed)))
+        self.f.write(sealed)
+
+    def _seal(self, seq: int, final: bool, data: bytes) -> bytes:
+        body = CHUNK_PREFIX.pack(seq, final) + zlib.compress(data, self.level)
+        if self.cipher:
+            return self.cipher.encrypt(body)
+        return body + struct.pack(">I", zlib.crc32(body))
+
+class _ChunkReader:
+    """File-like source that opens chunks ahead on a pool, in order"""
+
+    def __init__(self, f, executor, cipher, read_ahead):
+        self.f = f
+        self.executor = executor
+        self.cipher = cipher
+        self.read_ahead = read_ahead
+        self.pending = deque()
+        self.buffer = bytearray()
+        self.expected_seq = 0
+        self.done = False
+        self.exhausted = False
+
+    def read(self, n: int = -1) -> bytes:
+        while (n < 0 or len(self.buffer) < n) and self._fill():
+            pass
+        n = len(self.buffer) if n < 0 else min(n, len(self.buffer))
+        data = bytes(self.buffer[:n])
+        del self.buffer[:n]
+        return data
+
+    def readinto(self, target) -> int:
+        data = self.read(len(target))
+        target[:len(data)] = data
+        return len(data)
+
+    def readline(self) -> bytes:
+        while b"\n" not in self.buffer and self._fill():
+            pass
+        end = self.buffer.find(b"\n")
+        return self.read(len(self.buffer) if end < 0 else end + 1)
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the stream ended"""
+        while not self.exhausted and len(self.pending) < self.read_ahead:
+            raw = self.f.read(CHUNK_LENGTH.size)
+            if not raw:
+                self.exhausted = True
+                break
+            sealed = self.f.read(CHUNK_LENGTH.unpack(raw)[0])
+            self.pending.append(self.executor.submit(self._open, sealed))
+        if not self.pending:
+            if not self.done:
+                raise ValueError("Memory state is truncated - final chunk missing")
+            return False
+        seq, final, data = self.pending.popleft().result()
+        if self.done or seq != self.expected_seq:
+            raise ValueError(f"Memory state chunk out of order (expected {self.expected_seq}, got {seq})")
+        self.expected_seq += 1
+        self.done = bool(final)
+        self.buffer += data
+        return True
+
+    def _open(self, sealed: bytes):
+        if self.cipher:
+            try:
+                body = self.cipher.decrypt(sealed)
+            except InvalidToken:
+                raise ValueError("Memory state chunk failed authentication")
+        else:
+            body, crc = sealed[:-4], struct.unpack(">I", sealed[-4:])[0]
+            if zlib.crc32(body) != crc:
+                raise ValueError("Memory state chunk checksum mismatch")
+        seq, final = CHUNK_PREFIX.unpack_from(body)
+        return seq, final, zlib.decompress(body[CHUNK_PREFIX.size:])
 
 class MemoryPersistence:
-    def __init__(self, encryption_key=None):
+    def __init__(self, encryption_key=None, chunk_size=1024 * 1024, workers=4,
+                 compression_level=6):
         self.save_dir = Path("memory_states")
         self.save_dir.mkdir(exist_ok=True)
         self.cipher = Fernet(encryption_key) if encryption_key else None
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.compression_level = compression_level
         
     def save_state(self, memory_data, reset_type="soft"):
-        """Save memory state with reset type metadata"""
+        """Save memory state with reset type metadata
+
+        The state is pickled straight into a chunk pipeline, so no full
+        serialized, compressed or encrypted copy is ever held in memory.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         save_path = self.save_dir / f"reset_{reset_type}_{timestamp}.mem"
         
@@ -25,24 +158,43 @@ class MemoryPersistence:
             "data": memory_data
         }
         
-        # Serialize and compress
-        serialized = pickle.dumps(state)
-        compressed = zlib.compress(serialized)
-        
-        # Encrypt if key provided
-        if self.cipher:
-            compressed = self.cipher.encrypt(compressed)
-        
-        with open(save_path, "wb") as f:
-            f.write(compressed)
+        temp_path = save_path.with_suffix(".tmp")
+        flags = FLAG_ENCRYPTED if self.cipher else 0
+        try:
+            with open(temp_path, "wb") as f, ThreadPoolExecutor(self.workers) as executor:
+                f.write(STATE_HEADER.pack(STATE_MAGIC, 1, flags, self.chunk_size))
+                writer = _ChunkWriter(f, executor, self.cipher, self.chunk_size,
+                                      self.compression_level, 2 * self.workers)
+                pickle.dump(state, writer, protocol=pickle.HIGHEST_PROTOCOL)
+                writer.close()
+            temp_path.replace(save_path)
+        except BaseException:
+            # Never leave a half-written state behind
+            temp_path.unlink(missing_ok=True)
+            raise
             
         return save_path
 
     def load_state(self, save_path, reset_type="soft"):
         """Load specific memory state"""
         with open(save_path, "rb") as f:
-            compressed = f.read()
-        
+            header = f.read(STATE_HEADER.size)
+            if not header.startswith(STATE_MAGIC):
+                # Single-blob saves from before chunking
+                f.seek(0)
+                return self._load_legacy(f.read())
+            _, _, flags, _ = STATE_HEADER.unpack(header)
+            if flags & FLAG_ENCRYPTED and not self.cipher:
+                raise ValueError("Memory state is encrypted but no key was given")
+            cipher = self.cipher if flags & FLAG_ENCRYPTED else None
+            with ThreadPoolExecutor(self.workers) as executor:
+                reader = _ChunkReader(f, executor, cipher, 2 * self.workers)
+                state = pickle.load(reader)
+                if reader.read():
+                    raise ValueError("Unexpected data after memory state")
+                return state
+
+    def _load_legacy(self, compressed):
         if self.cipher:
             compressed = self.cipher.decrypt(compressed)
         
@@ -1,54 +1,291 @@
 # slick/memory/progress_manager.py
+import os
 import json
+import lzma
 import pickle
+import struct
 import zlib
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable, List, Set, Tuple
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
 
+class CorruptedMemoryError(ValueError):
+    """Checksum mismatch; `keys` lists the entries that failed verification"""
+
+    def __init__(self, message: str, keys: Optional[List[Any]] = None):
+        super().__init__(message)
+        self.keys = keys or []
+
+class MerkleTree:
+    """Two-level hash tree over memory entries
+
+    Each key has a leaf digest of its canonical encoding. Keys are spread
+    over fixed buckets by key hash; a bucket digest covers its sorted
+    leaves and the root covers all bucket digests. Changing a key only
+    re-hashes that key's bucket, and a root mismatch can be narrowed
+    down to individual keys by comparing leaves.
+    """
+
+    def __init__(self, buckets: int = 256):
+        self.buckets = buckets
+        self.leaves: Dict[Any, bytes] = {}
+        self._members: List[Set[Any]] = [set() for _ in range(buckets)]
+        self._bucket_digests: List[bytes] = [b""] * buckets
+        self._dirty: Set[int] = set(range(buckets))
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    @staticmethod
+    def leaf(key: Any, value: Any) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(key).encode('utf-8'))
+        h.update(b"\0")
+        h.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+        return h.digest()
+
+    def set(self, key: Any, digest: bytes) -> bool:
+        """Record a leaf; returns False when it was already current"""
+        if self.leaves.get(key) == digest:
+            return False
+        bucket = self._bucket(key)
+        self.leaves[key] = digest
+        self._members[bucket].add(key)
+        self._dirty.add(bucket)
+        return True
+
+    def discard(self, key: Any):
+        if self.leaves.pop(key, None) is not None:
+            bucket = self._bucket(key)
+            self._members[bucket].discard(key)
+            self._dirty.add(bucket)
+
+    def root(self) -> str:
+        for bucket in self._dirty:
+            h = hashlib.blake2b(digest_size=16)
+            for digest in sorted(self.leaves[k] for k in self._members[bucket]):
+                h.update(digest)
+            self._bucket_digests[bucket] = h.digest()
+        self._dirty.clear()
+        return hashlib.sha256(b"".join(self._bucket_digests)).hexdigest()
+
+    @classmethod
+    def from_leaves(cls, leaves: Dict[Any, bytes], buckets: int = 256) -> "MerkleTree":
+        tree = cls(buckets)
+        for key, digest in leaves.items():
+            tree.set(key, digest)
+        return tree
+
+    def _bucket(self, key: Any) -> int:
+        digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=4).digest()
+        return int.from_bytes(digest, 'big') % self.buckets
+
+# Save container layout:
+#   header  magic, format, codec, kind, timestamp, seq, key count, raw size,
+#           body length, index offset/length, checksum root, meta length
+#   meta    small JSON (save version, iso timestamp, base name)
+#   body    compressed blocks of pickled values
+#   index   compressed pickle {key: (block, offset, length, leaf)}, block
+#           (offset, length) pairs and deleted keys
+# Legacy saves are a bare zlib-compressed pickle and start with 0x78.
+SAVE_MAGIC = b"MSV2"
+SAVE_FORMAT = 1
+HEADER = struct.Struct(">4sHBBdIQQQQQ32sI")
+KIND_BASE, KIND_DELTA = 0, 1
+CODECS = {
+    "none": (0, lambda data: data, lambda data: data),
+    "zlib": (1, zlib.compress, zlib.decompress),
+    "lzma": (2, lzma.compress, lzma.decompress),
+}
+CODEC_IDS = {codec_id: name for name, (codec_id, _, _) in CODECS.items()}
+
+def write_save_container(path: Path, kind: int, records: List[Tuple[Any, bytes]],
+                         leaves: Dict[Any, bytes], root: str, meta: Dict[str, Any],
+                         timestamp: float, seq: int = 0, deleted: Iterable[Any] = (),
+                         codec: str = "zlib", block_size: int = 256 * 1024) -> int:
+    """Stream pre-pickled (key, value) records into a container; returns bytes written"""
+    if codec not in CODECS:
+        raise ValueError(f"Invalid codec. Choose from: {list(CODECS)}")
+    codec_id, compress, _ = CODECS[codec]
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    entries, blocks = {}, []
+    raw_size = 0
+    with open(path, 'wb') as f:
+        f.write(b"\0" * (HEADER.size + len(meta_bytes)))
+        block = bytearray()
+
+        def flush():
+            data = compress(bytes(block))
+            blocks.append((f.tell(), len(data)))
+            f.write(data)
+            block.clear()
+
+        for key, value in records:
+            entries[key] = (len(blocks), len(block), len(value), leaves.get(key, b""))
+            block += value
+            raw_size += len(value)
+            if len(block) >= block_size:
+                flush()
+        if block:
+            flush()
+
+        index_offset = f.tell()
+        body_length = index_offset - HEADER.size - len(meta_bytes)
+        index = compress(pickle.dumps({'entries': entries, 'blocks': blocks, 'deleted': list(deleted)}))
+        f.write(index)
+        end = f.tell()
+        f.seek(0)
+        f.write(HEADER.pack(SAVE_MAGIC, SAVE_FORMAT, codec_id, kind, timestamp, seq,
+                            len(entries), raw_size, body_length, index_offset,
+                            len(index), bytes.fromhex(root), len(meta_bytes)))
+        f.write(meta_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    return end
+
+def read_save_header(path: Path) -> Optional[Dict[str, Any]]:
+    """Header and meta of a container, or None for a legacy save"""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER.size)
+        if len(raw) < HEADER.size or not raw.startswith(SAVE_MAGIC):
+            return None
+        (_, fmt, codec_id, kind, timestamp, seq, keys, raw_size, body_length,
+         index_offset, index_length, root, meta_length) = HEADER.unpack(raw)
+        meta = json.loads(f.read(meta_length).decode('utf-8'))
+    header = {
+        'format': fmt,
+        'codec': CODEC_IDS[codec_id],
+        'kind': kind,
+        'created': timestamp,
+        'seq': seq,
+        'keys': keys,
+        'raw_size': raw_size,
+        'body_length': body_length,
+        'index_offset': index_offset,
+        'index_length': index_length,
+        'checksum': root.hex()
+    }
+    header.update(meta)
+    return header
+
+def read_save_container(path: Path, keys: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+    """Load a container, inflating only the blocks that hold `keys` when given"""
+    header = read_save_header(path)
+    decompress = CODECS[header['codec']][2]
+    with open(path, 'rb') as f:
+        f.seek(header['index_offset'])
+        index = pickle.loads(decompress(f.read(header['index_length'])))
+        entries = index['entries']
+        wanted = entries.keys() if keys is None else [k for k in keys if k in entries]
+
+        by_block: Dict[int, List[Any]] = {}
+        for key in wanted:
+            by_block.setdefault(entries[key][0], []).append(key)
+        values = {}
+        for block_no in sorted(by_block):
+            offset, length = index['blocks'][block_no]
+            f.seek(offset)
+            block = decompress(f.read(length))
+            for key in by_block[block_no]:
+                _, start, size, _ = entries[key]
+                values[key] = pickle.loads(block[start:start + size])
+
+    leaves = {key: entry[3] for key, entry in entries.items()}
+    data = dict(header)
+    data['leaves'] = leaves
+    data['deleted'] = index['deleted']
+    data['memory' if header['kind'] == KIND_BASE else 'changed'] = values
+    return data
+
 class MemoryProgressManager:
-    """Enhanced memory progress saver with compression and versioning"""
+    """Enhanced memory progress saver with compression and versioning
+
+    Saves form a checkpoint chain: a full base snapshot
+    (memory_save_*.msav) followed by delta files (memory_delta_*.mdelta)
+    holding only the keys changed or deleted since the previous
+    checkpoint. A new base is written every `full_every` deltas, or when a
+    delta would carry more than `max_delta_ratio` of all keys.
+    """
     
-    def __init__(self, save_dir: str = "memory_saves"):
+    def __init__(self, save_dir: str = "memory_saves", full_every: int = 50,
+                 max_delta_ratio: float = 0.5, codec: str = "zlib"):
         self.save_dir = Path(save_dir)
         self.save_dir.mkdir(parents=True, exist_ok=True)
-        self.current_save_version = "1.2"
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        if codec not in CODECS:
+            raise ValueError(f"Invalid codec. Choose from: {list(CODECS)}")
+        self.current_save_version = "2.0"
+        self.codec = codec
+        self.full_every = full_every
+        self.max_delta_ratio = max_delta_ratio
+        # Single worker so chain files land on disk in order
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.tree = MerkleTree()
+        self._base_name: Optional[str] = None
+        self._delta_seq = 0
         
     def save_memory_state(self, 
                         memory_bank: Dict[str, Any], 
-                        immediate: bool = False) -> str:
+                        immediate: bool = False,
+                        changed_keys: Optional[Iterable[str]] = None) -> str:
         """
         Save memory state with progress tracking
         Args:
             memory_bank: The memory dictionary to save
             immediate: If True, saves synchronously
+            changed_keys: Optional hint of keys touched (including deleted)
+                since the last save; skips hashing the untouched ones
         Returns:
             Path to the save file
         """
-        save_data = {
-            'version': self.current_save_version,
-            'timestamp': datetime.now().isoformat(),
-            'memory': memory_bank,
-            'checksum': self._calculate_memory_checksum(memory_bank)
-        }
-        
-        save_path = self._generate_save_path()
-        
+        changed, deleted = self._diff(memory_bank, changed_keys)
+        full = (
+            self._base_name is None
+            or self._delta_seq >= self.full_every
+            or len(changed) > self.max_delta_ratio * max(1, len(memory_bank))
+        )
+
+        now = datetime.now()
+        meta = {'version': self.current_save_version, 'timestamp': now.isoformat()}
+        if full:
+            self._sync_tree(memory_bank)
+            save_path = self._generate_save_path()
+            kind, entries, leaves = KIND_BASE, memory_bank, dict(self.tree.leaves)
+            self._base_name = save_path.name
+            self._delta_seq = 0
+        else:
+            self._delta_seq += 1
+            save_path = self._generate_delta_path()
+            kind, entries = KIND_DELTA, changed
+            leaves = {key: self.tree.leaves[key] for key in changed}
+            meta['base'] = self._base_name
+
+        # Serialise now so later mutations can't leak into the snapshot
+        records = [(key, pickle.dumps(value)) for key, value in entries.items()]
+        container = dict(kind=kind, records=records, leaves=leaves, root=self.tree.root(),
+                         meta=meta, timestamp=now.timestamp(), seq=self._delta_seq,
+                         deleted=deleted)
+
         if immediate:
-            return self._save_to_disk(save_path, save_data)
+            return self._save_to_disk(save_path, container)
         else:
-            self.executor.submit(self._save_to_disk, save_path, save_data)
+            self.executor.submit(self._save_to_disk, save_path, container)
             return str(save_path)
     
     def load_memory_state(self, 
-                         save_path: Optional[str] = None) -> Dict[str, Any]:
+                         save_path: Optional[str] = None,
+                         drop_corrupted: bool = False,
+                         keys: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
         """
         Load memory state from save file
         Args:
-            save_path: Optional specific path to load from
+            save_path: Optional specific base to load from; defaults to the
+                newest base with its deltas replayed on top
+            drop_corrupted: If True, entries failing verification are left
+                out instead of raising CorruptedMemoryError
+            keys: Optional subset of keys to load; other entries are not
+                decompressed
         Returns:
             The loaded memory bank
         """
@@ -58,28 +295,60 @@ class MemoryProgressManager:
         if not Path(save_path).exists():
             raise FileNotFoundError(f"No save file found at {save_path}")
             
-        with open(save_path, 'rb') as f:
-            compressed = f.read()
-            try:
-                save_data = pickle.loads(zlib.decompress(compressed))
-            except Exception as e:
-                raise ValueError(f"Failed to load save file: {str(e)}")
-                
-        # Verify checksum
-        current_checksum = self._calculate_memory_checksum(save_data['memory'])
-        if current_checksum != save_data['checksum']:
-            raise ValueError("Memory checksum verification failed - data may be corrupted")
+        keys = None if keys is None else list(keys)
+        save_data = self._read(Path(save_path), keys)
+        memory = save_data['memory']
+        if 'leaves' not in save_data:
+            # Legacy saves (a bare zlib-compressed pickle with no leaf table)
+            # carry one SHA-256 over the whole bank's JSON
+            if self._calculate_memory_checksum(memory) != save_data['checksum']:
+                raise CorruptedMemoryError("Memory checksum verification failed - data may be corrupted")
+            return memory if keys is None else {k: memory[k] for k in keys if k in memory}
+
+        tree = MerkleTree.from_leaves(save_data['leaves'])
+        self._verify(memory, save_data['leaves'], tree, save_data['checksum'], drop_corrupted, keys)
+
+        # Replay the delta chain recorded against this base
+        for delta_path in self._chain(Path(save_path).name):
+            delta = self._read(delta_path, keys)
+            for key, digest in delta['leaves'].items():
+                tree.set(key, digest)
+            for key in delta['deleted']:
+                tree.discard(key)
+            self._verify(delta['changed'], delta['leaves'], tree, delta['checksum'], drop_corrupted, keys)
+            memory.update(delta['changed'])
+            for key in delta['deleted']:
+                memory.pop(key, None)
             
-        return save_data['memory']
+        return memory
+
+    def verify_save(self, save_path: Optional[str] = None) -> List[Any]:
+        """Keys whose stored value no longer matches its checksum"""
+        try:
+            self.load_memory_state(save_path)
+        except CorruptedMemoryError as e:
+            return e.keys
+        return []
+
+    def compact_chain(self) -> str:
+        """Merge the latest base and its deltas into a fresh base"""
+        base_path = Path(self._find_latest_save())
+        old_chain = self._chain(base_path.name)
+        if not old_chain:
+            return str(base_path)
+        memory = self.load_memory_state(str(base_path))
+        self._base_name = None
+        new_path = self.save_memory_state(memory, immediate=True)
+        for delta_path in old_chain:
+            delta_path.unlink()
+        base_path.unlink()
+        return new_path
     
-    def _save_to_disk(self, save_path: Path, save_data: Dict) -> str:
+    def _save_to_disk(self, save_path: Path, container: Dict[str, Any]) -> str:
         """Internal method to handle actual file saving"""
         try:
-            compressed = zlib.compress(pickle.dumps(save_data))
             temp_path = save_path.with_suffix('.tmp')
-            
-            with open(temp_path, 'wb') as f:
-                f.write(compressed)
+            write_save_container(temp_path, codec=self.codec, **container)
             
             # Atomic write operation
             temp_path.replace(save_path)
@@ -87,11 +356,85 @@ class MemoryProgressManager:
         except Exception as e:
             print(f"Error saving memory: {str(e)}")
             raise
+
+    def _diff(self, memory_bank: Dict[str, Any], changed_keys: Optional[Iterable[str]]):
+        """Keys whose value changed since the last checkpoint, and deleted keys"""
+        if changed_keys is None:
+            candidates = list(memory_bank.keys())
+            deleted = [key for key in self.tree.leaves if key not in memory_bank]
+        else:
+            candidates = [key for key in changed_keys if key in memory_bank]
+            deleted = [key for key in changed_keys
+                       if key not in memory_bank and key in self.tree.leaves]
+        changed = {}
+        for key in candidates:
+            if self.tree.set(key, MerkleTree.leaf(key, memory_bank[key])):
+                changed[key] = memory_bank[key]
+        for key in deleted:
+            self.tree.discard(key)
+        return changed, deleted
+
+    def _sync_tree(self, memory_bank: Dict[str, Any]):
+        """Give a base a leaf for every key it stores and none for others
+
+        A changed_keys hint only hashes the hinted keys, so keys never seen
+        before are hashed here rather than left out of the base's index.
+        """
+        for key, value in memory_bank.items():
+            if key not in self.tree.leaves:
+                self.tree.set(key, MerkleTree.leaf(key, value))
+        for key in [key for key in self.tree.leaves if key not in memory_bank]:
+            self.tree.discard(key)
+
+    def _read(self, path: Path, keys: Optional[List[Any]] = None) -> Dict[str, Any]:
+        if read_save_header(path) is not None:
+            return read_save_container(path, keys)
+        with open(path, 'rb') as f:
+            try:
+                return pickle.loads(zlib.decompress(f.read()))
+            except Exception as e:
+                raise ValueError(f"Failed to load save file: {str(e)}")
+
+    def _verify(self, memory: Dict[str, Any], leaves: Dict[Any, bytes],
+                tree: MerkleTree, root: str, drop_corrupted: bool,
+                keys: Optional[List[Any]] = None):
+        """Check entries one by one against their leaves, then the root"""
+        if tree.root() != root:
+            # The leaf table itself is damaged, so no entry can be trusted
+            raise CorruptedMemoryError("Checksum tree root mismatch - save index is corrupted")
+        corrupted = [key for key, value in memory.items()
+                     if leaves.get(key) != MerkleTree.leaf(key, value)]
+        expected = leaves if keys is None else [key for key in keys if key in leaves]
+        corrupted += [key for key in expected if key not in memory]
+        if not corrupted:
+            return
+        if not drop_corrupted:
+            raise CorruptedMemoryError(
+                f"Memory checksum verification failed for {len(corrupted)} entries", corrupted)
+        print(f"Dropping {len(corrupted)} corrupted memory entries")
+        for key in corrupted:
+            memory.pop(key, None)
+
+    def _chain(self, base_name: str) -> List[Path]:
+        """Delta files recorded against `base_name`, in replay order"""
+        deltas = []
+        for delta_path in self.save_dir.glob("memory_delta_*.mdelta"):
+            try:
+                delta = read_save_header(delta_path) or self._read(delta_path)
+            except (ValueError, OSError):
+                continue
+            if delta.get('base') == base_name:
+                deltas.append((delta['seq'], delta_path))
+        return [path for _, path in sorted(deltas)]
     
     def _generate_save_path(self) -> Path:
         """Generate timestamped save path"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         return self.save_dir / f"memory_save_{timestamp}.msav"
+
+    def _generate_delta_path(self) -> Path:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return self.save_dir / f"memory_delta_{timestamp}.mdelta"
     
     def _find_latest_save(self) -> str:
         """Find most recent save file"""
@@ -101,7 +444,7 @@ class MemoryProgressManager:
         return str(max(saves, key=lambda f: f.stat().st_mtime))
     
     def _calculate_memory_checksum(self, memory_bank: Dict) -> str:
-        """Calculate SHA256 checksum of memory contents"""
+        """Whole-bank SHA256 stored in legacy zlib-pickle saves"""
         sha256 = hashlib.sha256()
         # Convert memory to bytes in consistent order
         memory_bytes = json.dumps(memory_bank, sort_keys=True).encode('utf-8')
@@ -112,6 +455,18 @@ class MemoryProgressManager:
         """Get metadata for all available saves"""
         saves = {}
         for save_file in self.save_dir.glob("memory_save_*.msav"):
+            header = read_save_header(save_file)
+            if header is not None:
+                saves[str(save_file)] = {
+                    'version': header['version'],
+                    'timestamp': header['timestamp'],
+                    'size': save_file.stat().st_size,
+                    'keys': header['keys'],
+                    'raw_size': header['raw_size'],
+                    'codec': header['codec']
+                }
+                continue
+            # Legacy saves have no header and must be inflated
             with open(save_file, 'rb') as f:
                 try:
                     metadata = pickle.loads(zlib.decompress(f.read()))
@@ -125,11 +480,13 @@ class MemoryProgressManager:
         return saves
     
     def cleanup_old_saves(self, max_saves: int = 10) -> None:
-        """Keep only the most recent saves"""
+        """Keep only the most recent base snapshots and their delta chains"""
         saves = sorted(self.save_dir.glob("memory_save_*.msav"), 
                       key=lambda f: f.stat().st_mtime, 
                       reverse=True)
         for old_save in saves[max_saves:]:
+            for delta_path in self._chain(old_save.name):
+                delta_path.unlink()
             old_save.unlink()
 
 # Integration with existing memory system
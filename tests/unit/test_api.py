@@ -0,0 +1,126 @@
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from api.main import APIServer
+from api.dependencies import EngineRegistry
+from memory import MemoryBank
+
+class TestAPI(unittest.TestCase):
+    def setUp(self):
+        self.registry = EngineRegistry(memory_factory=lambda: MemoryBank(":memory:"),
+                                       orchestrator_factory=None)
+        self.app = APIServer(self.registry).app
+
+    def test_handlers_share_one_engine(self):
+        with TestClient(self.app) as client:
+            engine = self.registry.engine
+            for mode in ("technical", "creative"):
+                response = client.post("/api/v1/chat", json={"message": "python decorators", "mode": mode})
+                self.assertEqual(response.status_code, 200)
+            self.assertIs(self.registry.engine, engine)
+            self.assertEqual(engine.personality.mode, "balanced")
+            self.assertEqual(len(self.registry.memory.backend.entries), 2)
+        self.assertFalse(self.registry.ready)
+
+    def test_websocket_answers_pings_and_queries(self):
+        with TestClient(self.app) as client:
+            with client.websocket_connect("/ws/ai") as ws:
+                ws.send_json({"id": 1, "message": "python decorators", "mode": "technical"})
+                ws.send_json({"type": "ping"})
+                replies = [ws.receive_json(), ws.receive_json()]
+            self.assertIn({"type": "pong"}, replies)
+            answer = next(r for r in replies if r.get("id") == 1)
+            self.assertEqual(answer["status"], "success")
+
+    def test_websocket_streams_chunks_then_done(self):
+        with TestClient(self.app) as client:
+            with client.websocket_connect("/ws/ai") as ws:
+                ws.send_json({"id": 7, "message": "python decorators", "stream": True})
+                frames = [ws.receive_json()]
+                while frames[-1]["type"] == "chunk":
+                    frames.append(ws.receive_json())
+        self.assertEqual(frames[-1]["type"], "done")
+        self.assertTrue(all(f["id"] == 7 for f in frames))
+        text = "".join(f["delta"] for f in frames[:-1])
+        self.assertEqual(text, frames[-1]["response"]["content"])
+        self.assertEqual(len(self.registry.memory.backend.entries), 1)
+
+    def test_chat_stream_sends_server_sent_events(self):
+        with TestClient(self.app) as client:
+            response = client.post("/api/v1/chat/stream", json={"message": "python decorators"})
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line]
+        self.assertEqual(events[0]["type"], "chunk")
+        self.assertEqual(events[-1]["type"], "done")
+
+    def test_warmup_does_not_touch_memory(self):
+        memory = MemoryBank(":memory:")
+        lookups = []
+        memory.get_context = lambda *args, **kwargs: lookups.append(args) or []
+        registry = EngineRegistry(memory_factory=lambda: memory, orchestrator_factory=None)
+        registry.startup()
+        self.assertTrue(registry.ready)
+        self.assertEqual(lookups, [])
+        self.assertEqual(len(memory.backend.entries), 0)
+        registry.shutdown()
+
+    def test_shutdown_stops_engine_workers(self):
+        registry = EngineRegistry(memory_factory=lambda: MemoryBank(":memory:"),
+                                  config={"worker_threads": 2}, orchestrator_factory=None)
+        with TestClient(APIServer(registry).app) as client:
+            client.post("/api/v1/chat", json={"message": "python decorators"})
+        with self.assertRaises(RuntimeError):
+            registry.engine.executor.submit(print)
+
+    def test_shutdown_stops_the_learning_worker(self):
+        with TestClient(self.app):
+            learning = self.registry.engine.learning_engine
+            learning.process_feedback({"query": "python decorators"})
+            self.assertIsNotNone(learning._worker)
+        self.assertIsNone(learning._worker)
+
+    def test_streams_through_the_orchestrator(self):
+        class StubOrchestrator:
+            def __init__(self):
+                self.executor = ThreadPoolExecutor(1)
+
+            def stream_query(self, query, context=None):
+                yield {"type": "chunk", "delta": "primary"}
+                yield {"type": "done", "replaces_stream": True,
+                       "response": {"content": "blended", "sources": ["a", "b"]}}
+
+        registry = EngineRegistry(memory_factory=lambda: MemoryBank(":memory:"),
+                                  orchestrator_factory=StubOrchestrator)
+        with TestClient(APIServer(registry).app) as client:
+            self.assertIs(registry.engine.orchestrator, registry.orchestrator)
+            response = client.post("/api/v1/chat/stream", json={"message": "python decorators"})
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line]
+        self.assertEqual(events[0]["delta"], "primary")
+        self.assertEqual(events[-1]["response"]["content"], "blended")
+        self.assertTrue(events[-1]["replaces_stream"])
+
+    def test_chat_cache_headers_reach_the_orchestrator(self):
+        contexts = []
+        class StubOrchestrator:
+            def __init__(self):
+                self.executor = ThreadPoolExecutor(1)
+
+            def route_query(self, query, context=None):
+                contexts.append(context)
+                return {"status": "success", "response": {"content": "routed", "sources": ["a"]}}
+
+        registry = EngineRegistry(memory_factory=lambda: MemoryBank(":memory:"),
+                                  orchestrator_factory=StubOrchestrator)
+        with TestClient(APIServer(registry).app) as client:
+            response = client.post("/api/v1/chat", json={"message": "python decorators"},
+                                   headers={"Cache-Control": "no-store"})
+        self.assertEqual(response.json()["response"]["content"], "routed")
+        self.assertEqual(contexts[0]["cache"], "bypass")
+
+    def test_status_reports_ready(self):
+        with TestClient(self.app) as client:
+            self.assertEqual(client.get("/api/v1/system/status").json()["status"], "operational")
+
+if __name__ == '__main__':
+    unittest.main()
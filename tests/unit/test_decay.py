@@ -0,0 +1,28 @@
+import unittest
+from memory.decay import DecayEngine
+
+class TestDecayEngine(unittest.TestCase):
+    def test_matches_scalar_formula_and_compacts(self):
+        engine = DecayEngine(alpha=0.1, beta=0.2, gamma=0.05, threshold=0.3, time_unit=1.0)
+        engine.add("fresh", importance=0.5, valence=0.5, timestamp=100.0)
+        engine.add("stale", importance=0.5, valence=0.0, timestamp=90.0)
+        engine.add("popular", importance=0.2, valence=0.0, timestamp=100.0)
+        for _ in range(3):
+            engine.touch("popular", timestamp=100.0)
+
+        evicted = engine.decay(now=100.0)
+        self.assertEqual(evicted, ["stale"])
+        self.assertEqual(len(engine), 2)
+        self.assertAlmostEqual(engine.weight("fresh"), 0.5 + 0.2 * 0.5)
+        self.assertAlmostEqual(engine.weight("popular"), 0.2 + 0.1 * 3)
+        self.assertNotIn("stale", engine)
+
+    def test_projected_expiry(self):
+        engine = DecayEngine(alpha=0.0, beta=0.0, gamma=0.1, threshold=0.1, time_unit=1.0)
+        engine.add("m", importance=0.6, timestamp=0.0)
+        self.assertAlmostEqual(engine.projected_expiry()[0], 5.0)
+        self.assertEqual(engine.decay(now=4.9), [])
+        self.assertEqual(engine.decay(now=5.1), ["m"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import tempfile
+import unittest
+from pathlib import Path
+from knowledge.embedding_engine import VectorIndex
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = VectorIndex()
+        self.index.add("decorator", "what is a python decorator", payload={"location": "home"})
+        self.index.add("quantum", "quantum entanglement explained", payload={"location": "lab"})
+        self.index.add("pasta", "cooking pasta at home")
+
+    def test_near_duplicate_ranks_first(self):
+        hits = self.index.search("what's a decorator in python", k=2)
+        self.assertEqual(hits[0]["key"], "decorator")
+
+    def test_payload_filter(self):
+        hits = self.index.search("python decorator", k=3, filter={"location": "lab"})
+        self.assertEqual([h["key"] for h in hits], ["quantum"])
+
+    def test_ivf_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "vectors.npy")
+            index = VectorIndex(path=path, initial_capacity=4)
+            index.add_many(list(range(200)), [f"topic {i % 10} note {i}" for i in range(200)])
+            index.train_ivf(n_lists=8)
+            index.add("fresh", "brand new memory")
+            index.flush()
+
+            reopened = VectorIndex(path=path)
+            self.assertEqual(len(reopened), 201)
+            self.assertEqual(reopened.search("brand new memory", k=1)[0]["key"], "fresh")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,5 +18,12 @@ class TestEngine(unittest.TestCase):
         self.assertEqual(result["status"], "success")
         self.assertIn("test query", result["response"])
 
+    def test_process_queries_keeps_input_order(self):
+        queries = (f"query number {i}" for i in range(10))
+        results = list(self.engine.process_queries(queries, mode="technical", batch_size=3))
+        self.assertEqual([r["query"] for r in results], [f"query number {i}" for i in range(10)])
+        self.assertTrue(all(r["status"] == "success" for r in results))
+        self.assertEqual(len(self.memory.backend.entries), 10)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import json
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ai_core.providers import OpenAIProvider, DeepSeekProvider
+from ai_core.providers.http_pool import provider_pools
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.connections.add(self.client_address)
+        self.server.auth.append(self.headers.get("Authorization"))
+        body = json.dumps({
+            "id": "stub",
+            "model": request["model"],
+            "choices": [{"message": {"content": f"stub: {request['messages'][-1]['content']}"}}],
+            "usage": {"total_tokens": 3}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestProviderPools(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.connections = set()
+        self.server.auth = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        provider_pools.close_sync()
+        for name in ("openai", "deepseek"):
+            provider_pools._configs.pop(name, None)
+
+    def test_calls_reuse_one_keep_alive_connection(self):
+        provider = OpenAIProvider({"base_url": self.base_url, "api_key": "k", "max_connections": 4})
+
+        async def run():
+            await provider_pools.start()
+            try:
+                return [await provider.aprocess(f"q{i}") for i in range(5)]
+            finally:
+                await provider_pools.aclose()
+
+        responses = asyncio.run(run())
+        self.assertEqual(responses[-1]["content"], "stub: System: You are an AI assistant. Context: \nUser: q4\nAI:")
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertEqual(set(self.server.auth), {"Bearer k"})
+
+    def test_process_and_aprocess_agree(self):
+        for provider in (OpenAIProvider({"base_url": self.base_url}),
+                         DeepSeekProvider({"base_url": self.base_url})):
+            async def run():
+                try:
+                    return await provider.aprocess("q")
+                finally:
+                    await provider_pools.aclose()
+
+            response = provider.process("q")
+            self.assertEqual(response, asyncio.run(run()))
+            self.assertTrue(response["content"].startswith("stub: "))
+            frames = list(provider.stream("q"))
+            self.assertEqual(frames[-1]["response"], response)
+
+    def test_unconfigured_provider_stays_local(self):
+        provider = DeepSeekProvider({})
+        response = asyncio.run(provider.aprocess("q"))
+        self.assertEqual(response["content"], "DeepSeek analysis of: q")
+        self.assertEqual(self.server.connections, set())
+
+if __name__ == '__main__':
+    unittest.main()
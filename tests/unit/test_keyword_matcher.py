@@ -0,0 +1,43 @@
+import unittest
+from cognitive.InterestEnhancer import InterestEnhancer
+from engine.utils.context_builder import ContextBuilder
+from shared.keyword_matcher import KeywordMatcher, keyword_matcher
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            "intent": {"default": "information", "categories": {
+                "instruction": {"keywords": ["how to"]},
+                "comparison": {"keywords": ["vs", "compare"], "weight": 0.5}
+            }},
+            "topic": {"categories": {"snakes": {"keywords": ["python", "pythons", "on"]}}}
+        })
+
+    def test_one_scan_reports_every_table_with_positions(self):
+        hits = self.matcher.scan("How to compare Pythons")
+        self.assertEqual(
+            [(h.table, h.category, h.keyword, h.start, h.end) for h in hits],
+            [("intent", "instruction", "how to", 0, 6),
+             ("intent", "comparison", "compare", 7, 14),
+             ("topic", "snakes", "python", 15, 21),
+             ("topic", "snakes", "on", 19, 21),
+             ("topic", "snakes", "pythons", 15, 22)]
+        )
+
+    def test_classify_follows_category_order(self):
+        self.assertEqual(self.matcher.classify("compare, how to", "intent"), "instruction")
+        self.assertEqual(self.matcher.classify("nothing here", "intent"), "information")
+        self.assertIsNone(self.matcher.classify("nothing here", "topic"))
+        self.assertEqual(self.matcher.scores("python vs java vs go", "intent"), {"comparison": 1.0})
+
+    def test_consumers_keep_their_previous_answers(self):
+        builder, enhancer = ContextBuilder(), InterestEnhancer()
+        self.assertEqual(builder._detect_intent("Why is the sky blue"), "explanation")
+        self.assertEqual(builder._detect_intent("python vs rust"), "comparison")
+        self.assertEqual(enhancer._detect_interest("debug my code"), "technology")
+        self.assertEqual(enhancer._detect_interest("tell me a joke"), "humor")
+        self.assertEqual(enhancer._detect_interest("hello"), "general")
+        self.assertEqual(keyword_matcher().classify("write a sorting algorithm", "provider_hints"), "deepseek")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from engine.subsystems.learning_engine import LearningEngine
+
+TOPICS = [
+    ("python decorator", "too short", "add a code example"),
+    ("quantum physics", "too dense", "use an analogy"),
+]
+
+def feedback(i):
+    query, comment, suggestion = TOPICS[i % len(TOPICS)]
+    return {"query": f"{query} {i}", "comment": comment, "suggestion": suggestion}
+
+class TestLearningEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = LearningEngine(n_clusters=2, batch_size=4)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_online_updates_run_in_the_background(self):
+        for i in range(12):
+            self.engine.process_feedback(feedback(i))
+        self.assertTrue(self.engine.flush(timeout=5))
+        self.assertGreaterEqual(self.engine.model.version, 1)
+        self.assertIn("add a code example", self.engine.suggest_improvements("python decorator"))
+
+    def test_published_models_are_never_mutated(self):
+        for i in range(4):
+            self.engine.process_feedback(feedback(i))
+        self.engine.flush(timeout=5)
+        first = self.engine.model
+        centers = first.clusterer.cluster_centers_.copy()
+        for i in range(4, 12):
+            self.engine.process_feedback(feedback(i))
+        self.engine.flush(timeout=5)
+        self.assertIsNot(self.engine.model, first)
+        self.assertGreater(self.engine.model.version, first.version)
+        np.testing.assert_array_equal(first.clusterer.cluster_centers_, centers)
+
+    def test_suggestion_index_is_ranked_and_deduplicated(self):
+        for i in range(12):
+            self.engine.process_feedback(feedback(i))
+        self.engine.process_feedback({"query": "python decorator 99", "comment": "too short",
+                                      "suggestion": "link the docs"})
+        self.engine.flush(timeout=5)
+        index = self.engine.get_suggestion_index()
+        python_cluster = next(c for c, pairs in index.items() if ("add a code example", 6) in pairs)
+        self.assertEqual(index[python_cluster][0], ("add a code example", 6))
+        self.assertEqual(self.engine.suggest_improvements("python decorator", limit=5),
+                         [s for s, _ in index[python_cluster]])
+
+    def test_model_and_index_survive_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "learning.pkl")
+            engine = LearningEngine(n_clusters=2, batch_size=4, model_path=path)
+            for i in range(8):
+                engine.process_feedback(feedback(i))
+            engine.close()
+            restarted = LearningEngine(n_clusters=2, batch_size=4, model_path=path)
+            self.assertEqual(restarted.model.version, engine.model.version)
+            self.assertEqual(restarted.suggest_improvements("quantum physics"), ["use an analogy"])
+            # A model saved by the other mode is not reused
+            self.assertIsNone(LearningEngine(mode="batch", model_path=path).model)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        engine = LearningEngine(n_clusters=2, queue_size=1)
+        engine._ensure_worker = lambda: None
+        engine.process_feedback(feedback(0))
+        engine.process_feedback(feedback(1))
+        self.assertEqual(engine.get_stats()["dropped"], 1)
+
+    def test_flush_times_out_on_a_full_queue(self):
+        engine = LearningEngine(n_clusters=2, queue_size=1)
+        engine._ensure_worker = lambda: None
+        engine._worker = object()  # a worker that never drains the queue
+        engine.process_feedback(feedback(0))
+        self.assertFalse(engine.flush(timeout=0.05))
+        engine._worker = None
+
+    def test_batch_mode_refits_in_place(self):
+        engine = LearningEngine(n_clusters=2, mode="batch")
+        for i in range(11):
+            engine.process_feedback(feedback(i))
+        self.assertEqual(engine.model.version, 1)
+        with self.assertRaises(ValueError):
+            LearningEngine(mode="streaming")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import sys
+import time
+import threading
+import unittest
+from pathlib import Path
+from memory.decay import DecayEngine
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "system" / "cli_extensions" / "update"))
+from maintenance_scheduler import MaintenanceScheduler
+
+class Bank:
+    """Minimal owner of a DecayEngine: weight = importance - elapsed seconds"""
+
+    def __init__(self):
+        self.decay = DecayEngine(alpha=0.0, beta=0.0, gamma=1.0, threshold=0.0, time_unit=1.0)
+        self.long_term = {}
+
+    def add(self, key, importance, timestamp=None):
+        self.long_term[key] = {}
+        self.decay.add(key, importance, timestamp=timestamp)
+
+class TestMaintenanceScheduler(unittest.TestCase):
+    def test_jobs_run_in_deadline_order(self):
+        scheduler = MaintenanceScheduler()
+        ran = []
+        start = time.time()
+        scheduler.register_job("slow", lambda: ran.append("slow"), interval=10, jitter=0)
+        scheduler.register_job("fast", lambda: ran.append("fast"), interval=5, jitter=0)
+        self.assertEqual(scheduler.run_pending(start + 1), 0)
+        scheduler.run_pending(start + 6)
+        self.assertEqual(ran, ["fast"])
+        scheduler.run_pending(start + 12)
+        self.assertEqual(ran, ["fast", "slow", "fast"])
+
+    def test_expired_memories_are_evicted_from_both_stores(self):
+        bank = Bank()
+        now = time.time()
+        bank.add("old", 1.0, timestamp=now - 5)
+        bank.add("fresh", 100.0, timestamp=now)
+        scheduler = MaintenanceScheduler(bank)
+        scheduler.run_pending()
+        self.assertEqual(list(bank.long_term), ["fresh"])
+        self.assertNotIn("old", bank.decay)
+        self.assertEqual(scheduler.get_stats()["decay"]["items"], 1)
+
+    def test_touched_memory_is_requeued_not_evicted(self):
+        bank = Bank()
+        now = time.time()
+        bank.add("m", 1.0, timestamp=now - 5)
+        scheduler = MaintenanceScheduler(bank)
+        bank.decay.touch("m", timestamp=now + 60)
+        scheduler.run_pending()
+        self.assertIn("m", bank.long_term)
+        self.assertEqual(len(scheduler._expiry_heap), 1)
+        self.assertGreater(scheduler._expiry_heap[0][0], now + 60)
+
+    def test_decay_stops_at_its_budget_and_reports_backlog(self):
+        bank = Bank()
+        now = time.time()
+        for i in range(50):
+            bank.add(i, 1.0, timestamp=now - 5)
+        scheduler = MaintenanceScheduler(bank, batch_size=10)
+        self.assertTrue(scheduler._run_decay(time.monotonic() - 1))
+        self.assertEqual(len(bank.long_term), 50)
+        self.assertFalse(scheduler._run_decay(time.monotonic() + 10))
+        self.assertEqual(len(bank.long_term), 0)
+
+    def test_concurrent_adds_and_touches_during_eviction(self):
+        bank = Bank()
+        scheduler = MaintenanceScheduler(bank, batch_size=16)
+        scheduler.start()
+        errors = []
+
+        def churn(worker):
+            try:
+                for i in range(3000):
+                    bank.add((worker, i), 0.005)
+                    bank.decay.touch((worker, i // 2))
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=churn, args=(w,)) for w in range(2)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        time.sleep(0.1)
+        scheduler.stop()
+        scheduler.run_pending()
+        self.assertEqual(errors, [])
+        self.assertEqual(scheduler.get_stats()["decay"]["errors"], 0)
+        self.assertLessEqual(set(bank.decay.keys[:len(bank.decay)]), set(bank.long_term))
+
+if __name__ == "__main__":
+    unittest.main()
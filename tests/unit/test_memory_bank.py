@@ -0,0 +1,222 @@
+import os
+import time
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from memory.MemoryBank import MemoryBank
+from memory.backends import migrate_pickle_to_sqlite
+from memory.wal import WriteAheadLog
+
+class TestMemoryBank(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryBank(":memory:")
+
+    def _brute_force(self, query, limit):
+        q_words = set(query.lower().split())
+        return sorted(
+            [e for e in self.memory.backend.entries
+             if q_words & set(e["query"].lower().split())],
+            key=lambda x: x["access_count"],
+            reverse=True
+        )[:limit]
+
+    def test_index_matches_word_overlap(self):
+        words = ["python", "decorator", "quantum", "Code", "debug", "art", "music"]
+        rng = random.Random(7)
+        for _ in range(200):
+            self.memory.store(" ".join(rng.sample(words, 3)), {})
+
+        for _ in range(50):
+            query = " ".join(rng.sample(words, 2))
+            expected = [e["id"] for e in self._brute_force(query, 3)]
+            got = [e["id"] for e in self.memory.get_context(query)]
+            self.assertEqual(got, expected)
+
+    def test_no_overlap_returns_nothing(self):
+        self.memory.store("explain quantum computing", {})
+        self.assertEqual(self.memory.get_context("banana"), [])
+
+    def test_bm25_prefers_specific_match_over_popular_noise(self):
+        memory = MemoryBank(":memory:", ranking="bm25", recency_weight=0.0)
+        memory.store("python", {})
+        for _ in range(5):
+            memory.get_context("python")
+        for i in range(20):
+            memory.store(f"python tip {i}", {})
+        memory.store("python decorator wrapping", {})
+
+        results = memory.get_context("python decorator", limit=1)
+        self.assertEqual(results[0]["query"], "python decorator wrapping")
+
+    def test_bm25_scales_to_common_words(self):
+        memory = MemoryBank(":memory:", ranking="bm25")
+        rng = random.Random(3)
+        vocab = [f"w{i}" for i in range(2000)]
+        for i in range(50000):
+            extra = " python decorator" if i % 100 == 0 else ""
+            memory.store("what is a " + " ".join(rng.sample(vocab, 4)) + extra, {})
+        backend = memory.backend
+        query = "what is a python decorator"
+
+        # Pruning skips common-word-only matches but not their scores
+        full = backend.index.bm25(query)
+        pruned = dict(zip(*(a.tolist() for a in backend.index.bm25_arrays(query, limit=3))))
+        self.assertEqual(len(pruned), 500)
+        for entry_id, score in pruned.items():
+            self.assertAlmostEqual(score, full[entry_id])
+
+        memory.get_context(query)
+        start = time.perf_counter()
+        for _ in range(20):
+            results = memory.get_context(query)
+        elapsed = (time.perf_counter() - start) / 20
+        self.assertTrue(all("python decorator" in r["query"] for r in results))
+        # Was ~170 ms per query with a Python loop over every posting
+        self.assertLess(elapsed, 0.02)
+
+    def test_batch_retrieval_matches_single_queries(self):
+        queries = ["python decorator", "quantum", "banana", "music art"]
+        banks = [MemoryBank(":memory:", ranking="semantic") for _ in range(2)]
+        for bank in banks:
+            for text in ["python decorator basics", "quantum computing", "art and music", "debug code"]:
+                bank.store(text, {})
+        batched = banks[0].get_context_many(queries, limit=2)
+        single = [banks[1].get_context(q, limit=2) for q in queries]
+        self.assertEqual([[e["id"] for e in r] for r in batched],
+                         [[e["id"] for e in r] for r in single])
+
+class TestMemoryBankWAL(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "memory.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _open(self, **kwargs):
+        return MemoryBank(self.path, persistence="wal", fsync="always", **kwargs)
+
+    def test_replay_after_reopen(self):
+        memory = self._open()
+        memory.store("python decorators", {"n": 1})
+        memory.store("python generators", {"n": 2})
+        memory.get_context("generators")
+        memory.close()
+
+        reopened = self._open()
+        self.assertEqual([e["query"] for e in reopened.backend.entries],
+                         ["python decorators", "python generators"])
+        self.assertEqual(reopened.backend.entries[1]["access_count"], 1)
+        reopened.close()
+
+    def test_compaction_keeps_state(self):
+        memory = self._open(compact_threshold=1000)
+        for i in range(20):
+            memory.store(f"query {i}", {})
+        memory.compact()
+        memory.store("after compaction", {})
+        memory.close()
+
+        self.assertLess(Path(self.path).with_suffix(".wal").stat().st_size, 1000)
+        reopened = self._open()
+        self.assertEqual(len(reopened.backend.entries), 21)
+        self.assertEqual(reopened.backend.entries[-1]["query"], "after compaction")
+        reopened.close()
+
+    def test_torn_tail_is_discarded(self):
+        memory = self._open()
+        memory.store("complete record", {})
+        memory.close()
+        with open(Path(self.path).with_suffix(".wal"), "ab") as f:
+            f.write(b"\x00\x00\x01\x00partial")
+
+        reopened = self._open()
+        self.assertEqual(len(reopened.backend.entries), 1)
+        reopened.store("next record", {})
+        reopened.close()
+        self.assertEqual(len(self._open().backend.entries), 2)
+
+    def test_interval_policy_syncs_an_idle_log(self):
+        wal = WriteAheadLog(Path(self.path).with_suffix(".wal"), "interval", fsync_interval_ms=50)
+        wal.open()
+        wal.append("store", {"query": "last record before traffic stops"})
+        self.assertTrue(wal._dirty)
+        deadline = time.monotonic() + 2
+        while wal._dirty and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(wal._dirty)
+        wal.close()
+        self.assertIsNone(wal._flusher)
+
+class TestSQLiteBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "memory.sqlite3")
+        self.memory = MemoryBank(self.path, backend="sqlite")
+
+    def tearDown(self):
+        self.memory.close()
+        self.tmp.cleanup()
+
+    def test_bm25_retrieval_and_access_counts(self):
+        self.memory.store("python decorator basics", {"content": "wrapping functions"})
+        self.memory.store("quantum computing", {"content": "qubits"})
+        self.memory.store("python packaging", {"content": "wheels"})
+
+        results = self.memory.get_context("what is a python decorator", limit=2)
+        self.assertEqual(results[0]["query"], "python decorator basics")
+        self.assertEqual(results[0]["result"], {"content": "wrapping functions"})
+        self.assertEqual(results[0]["access_count"], 1)
+        self.assertEqual(self.memory.get_context("banana"), [])
+
+    def test_results_are_searchable(self):
+        self.memory.store("tell me about physics", {"content": "entanglement"})
+        self.assertEqual(len(self.memory.get_context("entanglement")), 1)
+
+    def test_batch_retrieval_keeps_query_order(self):
+        self.memory.store("python decorator basics", {})
+        self.memory.store("quantum computing", {})
+        results = self.memory.get_context_many(["quantum", "banana", "python", "quantum"])
+        self.assertEqual([[e["query"] for e in r] for r in results],
+                         [["quantum computing"], [], ["python decorator basics"], ["quantum computing"]])
+        self.assertEqual(results[-1][0]["access_count"], 2)
+
+    def test_backends_share_a_data_directory(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            local = MemoryBank()
+            local.store("python decorators", {})
+            local.close()
+            # Each backend has its own default file in data/
+            sqlite = MemoryBank(backend="sqlite")
+            self.assertEqual(sqlite.get_context("decorators"), [])
+            sqlite.store("quantum computing", {})
+            sqlite.close()
+            self.assertEqual(len(MemoryBank().backend.entries), 1)
+
+            with self.assertRaises(ValueError):
+                MemoryBank("data/memory.db", backend="sqlite")
+            with self.assertRaises(ValueError):
+                MemoryBank("data/memory.sqlite3")
+        finally:
+            os.chdir(cwd)
+
+    def test_migrate_from_pickle(self):
+        pickle_path = str(Path(self.tmp.name) / "memory.db")
+        legacy = MemoryBank(pickle_path)
+        legacy.store("python decorators", {})
+        legacy.store("python generators", {})
+        legacy.close()
+
+        target = str(Path(self.tmp.name) / "migrated.sqlite3")
+        self.assertEqual(migrate_pickle_to_sqlite(pickle_path, target), 2)
+        migrated = MemoryBank(target, backend="sqlite")
+        self.assertEqual(len(migrated.get_context("generators")), 1)
+        migrated.close()
+        with self.assertRaises(ValueError):
+            migrate_pickle_to_sqlite(pickle_path, target)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# CLI update scripts import each other by module name; appended so the
+# repo's own packages (memory, config, ...) still win
+sys.path.append(str(Path(__file__).resolve().parents[2] / "system" / "cli_extensions" / "update"))
+from memory_core import MemoryBank
+from memory_persistance import MemoryResetManager
+
+class TestMemoryCoreDecaySync(unittest.TestCase):
+    def setUp(self):
+        # Save directories are relative to the working directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.bank = MemoryBank()
+        self.manager = MemoryResetManager(self.bank)
+        for event in ("a", "b"):
+            self.bank.add_memory(event)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_decay_after_hard_reset(self):
+        self.manager.prepare_reset("hard")
+        self.assertEqual(len(self.bank.decay), 0)
+        self.assertEqual(self.bank.apply_decay(), 0)
+
+    def test_restore_rebuilds_decay_state(self):
+        save_path = self.manager.prepare_reset("hard")
+        self.manager.restore_state(save_path)
+        self.assertEqual(len(self.bank.decay), 2)
+        self.assertIn("mem_1", self.bank.decay)
+        self.assertEqual(self.bank.apply_decay(), 2)
+        self.assertEqual(self.bank.apply_decay(aggressive=True), 2)
+
+if __name__ == "__main__":
+    unittest.main()
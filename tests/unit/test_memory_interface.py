@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+from memory.MemoryBank import MemoryBank
+from engine.subsystems.interaction_record import InteractionRecord
+from engine.subsystems.memory_interface import MemoryInterface
+
+class TestMemoryInterface(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryBank(":memory:")
+        self.interface = MemoryInterface(self.memory, field_caps={"content": 10})
+
+    def test_store_keeps_references_not_copies(self):
+        self.memory.store("python decorators", {"content": "earlier answer"})
+        context = {
+            "memory": {"entry_ids": [0], "related_queries": ["python decorators"]},
+            "inferred": {"likely_intent": "explanation"}
+        }
+        self.interface.store_interaction(
+            "why python decorators", {"content": "a" * 100, "style": "neutral"}, context, mode="technical"
+        )
+
+        stored = self.memory.backend.entries[-1]["result"]
+        self.assertIsInstance(stored, InteractionRecord)
+        self.assertEqual(stored.recalled.tolist(), [0])
+        self.assertEqual(stored.intent, "explanation")
+        self.assertEqual(stored.mode, "technical")
+        self.assertEqual(len(stored.content), 10)
+
+    def test_compact_store_migrates_legacy_records(self):
+        self.memory.store("legacy", {
+            "query": "legacy",
+            "response": {"content": "answer"},
+            "context": {"memory": [{"id": 3, "result": {"nested": "copy"}}]},
+            "timestamp": "2025-06-18T21:00:00"
+        })
+        self.assertEqual(self.interface.compact_store(), 1)
+        self.assertEqual(self.memory.backend.entries[0]["result"].recalled.tolist(), [3])
+        self.assertEqual(self.interface.compact_store(), 0)
+
+    def test_sqlite_stores_records_as_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = MemoryBank(str(Path(tmp) / "memory.sqlite3"), backend="sqlite")
+            MemoryInterface(memory).store_interaction(
+                "python decorators", {"content": "wrap functions"},
+                {"memory": {"entry_ids": [4, 5]}}, mode="technical"
+            )
+            stored = memory.get_context("python decorators")[0]["result"]
+            memory.close()
+        self.assertEqual(stored["recalled"], [4, 5])
+        self.assertEqual(InteractionRecord.from_dict(stored).content, "wrap functions")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import zlib
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from cryptography.fernet import Fernet
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "system" / "cli_extensions" / "update"))
+from memory_persistance import CHUNK_LENGTH, STATE_HEADER, MemoryPersistence
+
+def split_chunks(raw):
+    """Return the file header and the sealed chunks of a state file"""
+    header, pos, chunks = raw[:STATE_HEADER.size], STATE_HEADER.size, []
+    while pos < len(raw):
+        length = CHUNK_LENGTH.unpack_from(raw, pos)[0]
+        pos += CHUNK_LENGTH.size
+        chunks.append(raw[pos:pos + length])
+        pos += length
+    return header, chunks
+
+def join_chunks(header, chunks):
+    return header + b"".join(CHUNK_LENGTH.pack(len(chunk)) + chunk for chunk in chunks)
+
+class TestMemoryPersistence(unittest.TestCase):
+    def setUp(self):
+        # MemoryPersistence always writes to ./memory_states
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.memory = {f"entry-{i}": os.urandom(64).hex() for i in range(200)}
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def _persistence(self, key=None):
+        return MemoryPersistence(encryption_key=key, chunk_size=1024, workers=2)
+
+    def _saved_chunks(self, persistence):
+        path = persistence.save_state(self.memory)
+        header, chunks = split_chunks(path.read_bytes())
+        self.assertGreater(len(chunks), 3)
+        return path, header, chunks
+
+    def test_round_trip_without_key(self):
+        persistence = self._persistence()
+        state = persistence.load_state(persistence.save_state(self.memory, "hard"))
+        self.assertEqual(state["data"], self.memory)
+        self.assertEqual(state["metadata"]["reset_type"], "hard")
+
+    def test_round_trip_with_key(self):
+        key = Fernet.generate_key()
+        path = self._persistence(key).save_state(self.memory)
+        self.assertNotIn(b"entry-0", path.read_bytes())
+        self.assertEqual(self._persistence(key).load_state(path)["data"], self.memory)
+        with self.assertRaises(ValueError):
+            self._persistence().load_state(path)
+        with self.assertRaises(ValueError):
+            self._persistence(Fernet.generate_key()).load_state(path)
+
+    def test_tampered_chunk_is_rejected(self):
+        for key in (None, Fernet.generate_key()):
+            persistence = self._persistence(key)
+            path, header, chunks = self._saved_chunks(persistence)
+            damaged = bytearray(chunks[1])
+            damaged[len(damaged) // 2] ^= 0xFF
+            chunks[1] = bytes(damaged)
+            path.write_bytes(join_chunks(header, chunks))
+            with self.assertRaises(ValueError):
+                persistence.load_state(path)
+
+    def test_truncated_state_is_rejected(self):
+        for key in (None, Fernet.generate_key()):
+            persistence = self._persistence(key)
+            path, header, chunks = self._saved_chunks(persistence)
+            path.write_bytes(join_chunks(header, chunks[:-1]))
+            with self.assertRaises(ValueError):
+                persistence.load_state(path)
+            path.write_bytes(join_chunks(header, chunks)[:-10])
+            with self.assertRaises(ValueError):
+                persistence.load_state(path)
+
+    def test_reordered_chunks_are_rejected(self):
+        for key in (None, Fernet.generate_key()):
+            persistence = self._persistence(key)
+            path, header, chunks = self._saved_chunks(persistence)
+            chunks[1], chunks[2] = chunks[2], chunks[1]
+            path.write_bytes(join_chunks(header, chunks))
+            with self.assertRaises(ValueError):
+                persistence.load_state(path)
+
+    def test_legacy_single_blob_state_loads(self):
+        state = {"metadata": {"reset_type": "soft"}, "data": self.memory}
+        blob = zlib.compress(pickle.dumps(state))
+        key = Fernet.generate_key()
+        for persistence, raw in ((self._persistence(), blob),
+                                 (self._persistence(key), Fernet(key).encrypt(blob))):
+            path = Path("memory_states") / "reset_soft_legacy.mem"
+            path.write_bytes(raw)
+            self.assertEqual(persistence.load_state(path), state)
+
+    def test_failed_save_leaves_no_temp_file(self):
+        persistence = self._persistence()
+        with self.assertRaises(Exception):
+            persistence.save_state({"bad": lambda: None})
+        self.assertEqual(list(Path("memory_states").iterdir()), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import time
+import unittest
+from unittest import mock
+import spacy
+from engine.utils.context_builder import ContextBuilder
+from engine.utils.nlp_registry import NLPRegistry
+
+class CountingPipeline:
+    def __init__(self):
+        self.nlp = spacy.blank("en")
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.nlp(text)
+
+    def pipe(self, texts, **kwargs):
+        return self.nlp.pipe(texts, **kwargs)
+
+class TestNLPRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = NLPRegistry(cache_size=2)
+        self.pipeline = CountingPipeline()
+        self.registry._models["blank"] = self.pipeline
+
+    def test_repeat_text_skips_parsing(self):
+        first = self.registry.analyze("Python  decorators", "blank")
+        second = self.registry.analyze(" Python decorators ", "blank")
+        self.assertEqual(first, second)
+        self.assertEqual(self.pipeline.calls, 1)
+        self.assertEqual(self.registry.get_stats()["hits"], 1)
+
+    def test_cache_is_bounded_lru(self):
+        for text in ("a", "b", "a", "c"):
+            self.registry.analyze(text, "blank")
+        self.registry.analyze("a", "blank")
+        self.assertEqual(self.pipeline.calls, 3)
+        self.registry.analyze("b", "blank")
+        self.assertEqual(self.pipeline.calls, 4)
+
+    def test_cached_analysis_cannot_be_mutated(self):
+        self.registry.analyze("decorators", "blank")["verbs"].append("x")
+        self.assertEqual(self.registry.analyze("decorators", "blank")["verbs"], [])
+
+    def test_analyze_many_keeps_order_and_skips_cached_texts(self):
+        self.registry.analyze("b", "blank")
+        results = list(self.registry.analyze_many(iter(["a", "b", "c"]), "blank", batch_size=2))
+        self.assertEqual(len(results), 3)
+        # "b" came from the cache; only "a" and "c" were parsed in the pipe
+        self.assertEqual(self.registry.get_stats()["hits"], 1)
+        self.assertEqual(self.registry.get_stats()["cached"], 2)
+
+    def test_missing_model_is_loaded_once(self):
+        self.assertIsNone(self.registry.get("no_such_model"))
+        self.assertIn("no_such_model", self.registry._models)
+        self.assertEqual(self.registry.analyze("text", "no_such_model"), {"entities": [], "verbs": []})
+
+    def test_broken_model_falls_back_once(self):
+        calls = []
+        def broken_load(name, **kwargs):
+            calls.append(name)
+            raise ValueError("incompatible model version")
+        with mock.patch("engine.utils.nlp_registry.spacy.load", broken_load):
+            self.assertIsNone(self.registry.get("broken"))
+            self.assertEqual(self.registry.analyze("text", "broken"), {"entities": [], "verbs": []})
+        self.assertEqual(calls, ["broken"])
+
+    def test_context_builder_construction_is_cheap(self):
+        start = time.perf_counter()
+        ContextBuilder()
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import time
+import unittest
+from unittest import mock
+from ai_core import APIOrchestrator
+from ai_core.config_manager import ConfigManager
+from ai_core.router import AdaptiveRouter, CLOSED, HALF_OPEN, OPEN
+
+class StubProvider:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.provider_name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def process(self, query, context=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            return {"error": "unavailable"}
+        return {"source": self.provider_name, "content": f"{self.provider_name}: {query}", "confidence": 0.5}
+
+class StreamingStub(StubProvider):
+    """Streams its answer word by word, `gap` seconds apart"""
+
+    def __init__(self, name, gap=0.0, **kwargs):
+        super().__init__(name, **kwargs)
+        self.gap = gap
+
+    def stream(self, query, context=None):
+        response = self.process(query, context)
+        for delta in response.get("content", "").split():
+            time.sleep(self.gap)
+            yield {"type": "chunk", "delta": delta}
+        yield {"type": "done", "response": response}
+
+# Keep routing tests independent of the on-disk response cache
+_config = mock.patch.dict(ConfigManager().config, {"cache": {"enabled": False}})
+
+def setUpModule():
+    _config.start()
+
+def tearDownModule():
+    _config.stop()
+
+class TestOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.orchestrator = APIOrchestrator()
+
+    def route(self, primary, secondary, fanout):
+        self.orchestrator.router = AdaptiveRouter([primary, secondary])
+        self.orchestrator._select_providers = lambda query: (primary, secondary)
+        start = time.monotonic()
+        result = self.orchestrator.route_query("q", {"fanout": fanout})
+        return result, time.monotonic() - start
+
+    def test_parallel_costs_the_slowest_not_the_sum(self):
+        result, elapsed = self.route(StubProvider("a", 0.2), StubProvider("b", 0.2), "parallel")
+        self.assertEqual(result["providers"]["used"], ["a", "b"])
+        self.assertLess(elapsed, 0.35)
+
+    def test_first_good_skips_failed_and_slow_providers(self):
+        result, elapsed = self.route(StubProvider("a", fail=True), StubProvider("b", 0.05), "first_good")
+        self.assertEqual(result["providers"]["used"], ["b"])
+
+        result, elapsed = self.route(StubProvider("a", 0.01), StubProvider("b", 0.5), "first_good")
+        self.assertEqual(result["providers"]["used"], ["a"])
+        self.assertLess(elapsed, 0.3)
+
+    def test_hedged_only_calls_secondary_when_primary_is_slow(self):
+        self.orchestrator.hedge_after = 0.1
+        secondary = StubProvider("b")
+        result, _ = self.route(StubProvider("a"), secondary, "hedged")
+        self.assertEqual(result["providers"]["used"], ["a"])
+        self.assertEqual(secondary.calls, 0)
+
+        result, elapsed = self.route(StubProvider("a", 0.5), StubProvider("b"), "hedged")
+        self.assertEqual(result["providers"]["used"], ["b"])
+        self.assertLess(elapsed, 0.4)
+
+    def stream(self, primary, secondary, fanout):
+        self.orchestrator.router = AdaptiveRouter([primary, secondary])
+        self.orchestrator._select_providers = lambda query: (primary, secondary)
+        start = time.monotonic()
+        frames = list(self.orchestrator.stream_query("q", {"fanout": fanout}))
+        return frames, time.monotonic() - start
+
+    def test_stream_runs_secondary_alongside_primary(self):
+        frames, elapsed = self.stream(StreamingStub("a", gap=0.1), StubProvider("b", 0.25), "parallel")
+        self.assertEqual(frames[-1]["providers"]["used"], ["a", "b"])
+        self.assertEqual([f["provider"] for f in frames[:-1]], ["a", "a"])
+        # Sequential would be ~0.2s of streaming plus 0.25s for the secondary
+        self.assertLess(elapsed, 0.4)
+
+    def test_stream_hedges_only_a_slow_primary(self):
+        self.orchestrator.hedge_after = 0.05
+        secondary = StubProvider("b")
+        frames, _ = self.stream(StreamingStub("a"), secondary, "hedged")
+        self.assertEqual(frames[-1]["providers"]["used"], ["a"])
+        self.assertFalse(frames[-1]["replaces_stream"])
+        self.assertEqual(secondary.calls, 0)
+
+        frames, _ = self.stream(StreamingStub("a", gap=0.1), secondary, "hedged")
+        self.assertEqual(secondary.calls, 1)
+        self.assertEqual(frames[-1]["providers"]["used"], ["a", "b"])
+        self.assertTrue(frames[-1]["replaces_stream"])
+
+    def test_stream_falls_back_when_primary_fails(self):
+        frames, _ = self.stream(StreamingStub("a", fail=True), StubProvider("b"), "hedged")
+        self.assertEqual(frames[-1]["status"], "success")
+        self.assertEqual(frames[-1]["providers"]["used"], ["b"])
+        self.assertTrue(frames[-1]["replaces_stream"])
+
+class TestAdaptiveRouter(unittest.TestCase):
+    def test_ranks_by_latency_cost_and_hint(self):
+        fast, slow = StubProvider("fast"), StubProvider("slow")
+        router = AdaptiveRouter([slow, fast], costs={"fast": 0.1}, hints={"slow": ["code"]})
+        router.record("fast", 0.1, True)
+        router.record("slow", 0.4, True)
+        self.assertEqual([p.provider_name for p in router.rank("hello")], ["fast", "slow"])
+        # The hint outweighs a small latency gap
+        self.assertEqual(router.rank("debug code")[0].provider_name, "slow")
+
+    def test_circuit_fails_fast_then_probes(self):
+        provider = StubProvider("a")
+        router = AdaptiveRouter([provider], failure_threshold=3, cooldown=0.05)
+        for _ in range(3):
+            router.record("a", 0.01, False)
+        self.assertEqual(router.stats["a"].state, OPEN)
+        self.assertEqual(router.rank("q"), [])
+
+        time.sleep(0.06)
+        self.assertTrue(router.allow("a"))
+        self.assertEqual(router.stats["a"].state, HALF_OPEN)
+        self.assertFalse(router.allow("a"))  # only one probe at a time
+        router.record("a", 0.01, True)
+        self.assertEqual(router.stats["a"].state, CLOSED)
+
+    def test_outage_routes_around_without_calling(self):
+        orchestrator = APIOrchestrator()
+        down, up = StubProvider("down", fail=True), StubProvider("up")
+        orchestrator.router = AdaptiveRouter([down, up], failure_threshold=2, cooldown=60)
+        for _ in range(2):
+            orchestrator.router.record("down", 0.01, False)
+        result = orchestrator.route_query("q")
+        self.assertEqual(result["providers"]["used"], ["up"])
+        self.assertEqual(down.calls, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import zlib
+import pickle
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "system" / "cli_extensions" / "update"))
+from progress_manager import (CODECS, KIND_BASE, CorruptedMemoryError, MemoryProgressManager,
+                              MerkleTree, read_save_container, read_save_header,
+                              write_save_container)
+
+class TestSaveContainer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "bank.msav"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_key_subset(self):
+        memory = {f"k{i}": {"n": i} for i in range(50)}
+        leaves = {key: MerkleTree.leaf(key, value) for key, value in memory.items()}
+        for codec in CODECS:
+            write_save_container(self.path, KIND_BASE,
+                                 [(k, pickle.dumps(v)) for k, v in memory.items()],
+                                 leaves, MerkleTree.from_leaves(leaves).root(),
+                                 {"version": "2.0"}, 0.0, codec=codec, block_size=64)
+            header = read_save_header(self.path)
+            self.assertEqual((header["codec"], header["keys"]), (codec, 50))
+            self.assertEqual(read_save_container(self.path)["memory"], memory)
+            subset = read_save_container(self.path, ["k3", "k40", "missing"])
+            self.assertEqual(subset["memory"], {"k3": {"n": 3}, "k40": {"n": 40}})
+            self.assertEqual(subset["leaves"], leaves)
+
+    def test_invalid_codec_is_rejected(self):
+        with self.assertRaises(ValueError):
+            write_save_container(self.path, KIND_BASE, [], {}, MerkleTree().root(), {}, 0.0, codec="gzip")
+        with self.assertRaises(ValueError):
+            MemoryProgressManager(self.tmp.name, codec="gzip")
+
+class TestSaveFormats(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _manager(self, codec):
+        manager = MemoryProgressManager(self.tmp.name, codec=codec)
+        self.addCleanup(manager.executor.shutdown)
+        return manager
+
+    def test_every_codec_loads_and_reads_key_subsets(self):
+        memory = {f"k{i}": [i] * 10 for i in range(20)}
+        for codec in CODECS:
+            manager = self._manager(codec)
+            path = manager.save_memory_state(memory, immediate=True)
+            self.assertEqual(manager.load_memory_state(path), memory)
+            self.assertEqual(manager.load_memory_state(path, keys=["k7"]), {"k7": [7] * 10})
+            info = manager.get_save_versions()[path]
+            self.assertEqual((info["codec"], info["keys"]), (codec, 20))
+
+    def test_legacy_single_blob_save_still_loads(self):
+        memory = {"a": 1, "b": [2, 3]}
+        blob = {
+            'version': '1.2',
+            'timestamp': '2024-01-01T00:00:00',
+            'memory': memory,
+            'checksum': hashlib.sha256(json.dumps(memory, sort_keys=True).encode('utf-8')).hexdigest()
+        }
+        path = Path(self.tmp.name) / "memory_save_20240101_000000_000000.msav"
+        path.write_bytes(zlib.compress(pickle.dumps(blob)))
+
+        manager = self._manager("zlib")
+        self.assertIsNone(read_save_header(path))
+        self.assertEqual(manager.load_memory_state(str(path)), memory)
+        self.assertEqual(manager.load_memory_state(str(path), keys=["b"]), {"b": [2, 3]})
+        self.assertEqual(manager.get_save_versions()[str(path)]["version"], "1.2")
+
+        blob['memory'] = {"a": 2, "b": [2, 3]}
+        path.write_bytes(zlib.compress(pickle.dumps(blob)))
+        with self.assertRaises(CorruptedMemoryError):
+            manager.load_memory_state(str(path))
+
+class ManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = MemoryProgressManager(self.tmp.name, full_every=2, codec="none")
+
+    def tearDown(self):
+        self.manager.executor.shutdown()
+        self.tmp.cleanup()
+
+class TestDeltaCheckpoints(ManagerTestCase):
+    def test_delta_chain_replays_changes_and_deletions(self):
+        memory = {f"k{i}": i for i in range(10)}
+        base = self.manager.save_memory_state(memory, immediate=True)
+        memory["k1"] = "changed"
+        del memory["k2"]
+        delta = self.manager.save_memory_state(memory, immediate=True)
+        self.assertTrue(delta.endswith(".mdelta"))
+        memory["k10"] = 10
+        self.manager.save_memory_state(memory, immediate=True, changed_keys=["k10"])
+
+        self.assertEqual(len(self.manager._chain(Path(base).name)), 2)
+        self.assertEqual(self.manager.load_memory_state(base), memory)
+        self.assertEqual(self.manager.load_memory_state(base, keys=["k1", "k2"]), {"k1": "changed"})
+
+        # full_every deltas reached, so the next save starts a new base
+        memory["k3"] = "again"
+        self.assertTrue(self.manager.save_memory_state(memory, immediate=True).endswith(".msav"))
+
+    def test_unchanged_keys_are_not_rewritten(self):
+        memory = {f"k{i}": i for i in range(10)}
+        self.manager.save_memory_state(memory, immediate=True)
+        memory["k4"] = "changed"
+        delta = self.manager.save_memory_state(memory, immediate=True)
+        self.assertEqual(read_save_header(Path(delta))["keys"], 1)
+
+    def test_large_change_writes_base(self):
+        memory = {f"k{i}": i for i in range(4)}
+        self.manager.save_memory_state(memory, immediate=True)
+        changed = {key: -value for key, value in memory.items()}
+        self.assertTrue(self.manager.save_memory_state(changed, immediate=True).endswith(".msav"))
+
+    def test_background_saves_land_in_order(self):
+        memory = {"a": 1, "b": 2, "c": 3}
+        base = self.manager.save_memory_state(dict(memory))
+        for value in range(2):
+            memory["a"] = value
+            self.manager.save_memory_state(dict(memory))
+        self.manager.executor.shutdown(wait=True)
+        self.assertEqual(self.manager.load_memory_state(base), memory)
+
+    def test_compact_chain(self):
+        memory = {"a": 1, "b": 2, "c": 3}
+        self.manager.save_memory_state(memory, immediate=True)
+        memory["a"] = 10
+        self.manager.save_memory_state(memory, immediate=True)
+        path = self.manager.compact_chain()
+        self.assertEqual(list(Path(self.tmp.name).glob("*.mdelta")), [])
+        self.assertEqual(self.manager.load_memory_state(path), memory)
+
+    def test_cleanup_removes_whole_chains(self):
+        memory = {"a": 1, "b": 2, "c": 3}
+        old_base = Path(self.manager.save_memory_state(memory, immediate=True))
+        memory["a"] = 10
+        self.manager.save_memory_state(memory, immediate=True)
+        os.utime(old_base, (1, 1))
+        self.manager._base_name = None
+        new_base = Path(self.manager.save_memory_state(memory, immediate=True))
+
+        self.manager.cleanup_old_saves(max_saves=1)
+        self.assertEqual(sorted(Path(self.tmp.name).iterdir()), [new_base])
+
+class TestChecksums(ManagerTestCase):
+    def test_full_base_with_hint_hashes_every_key(self):
+        memory = {"a": 1, "b": 2, "c": 3}
+        path = self.manager.save_memory_state(memory, immediate=True, changed_keys=["a"])
+        self.assertEqual(self.manager.load_memory_state(path), memory)
+
+    def test_tampered_value_is_detected(self):
+        memory = {"a": "hello", "b": "world"}
+        path = self.manager.save_memory_state(memory, immediate=True)
+        raw = Path(path).read_bytes()
+        Path(path).write_bytes(raw.replace(b"hello", b"jello"))
+
+        self.assertEqual(self.manager.verify_save(path), ["a"])
+        with self.assertRaises(CorruptedMemoryError) as ctx:
+            self.manager.load_memory_state(path)
+        self.assertEqual(ctx.exception.keys, ["a"])
+        self.assertEqual(self.manager.load_memory_state(path, drop_corrupted=True), {"b": "world"})
+
+    def test_damaged_index_is_detected(self):
+        path = self.manager.save_memory_state({"a": 1}, immediate=True)
+        header = read_save_header(Path(path))
+        raw = bytearray(Path(path).read_bytes())
+        # Flip a byte of the stored root so it no longer matches the leaves
+        offset = raw.index(bytes.fromhex(header["checksum"]))
+        raw[offset] ^= 0xFF
+        Path(path).write_bytes(bytes(raw))
+        with self.assertRaises(CorruptedMemoryError):
+            self.manager.load_memory_state(path, drop_corrupted=True)
+
+if __name__ == '__main__':
+    unittest.main()
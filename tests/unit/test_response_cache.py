@@ -0,0 +1,96 @@
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from ai_core.middleware.response_cache import ResponseCache, cache_directive, normalize_query
+
+ANSWER = {"response": {"content": "A decorator wraps a function"}, "providers": {}}
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "cache.db")
+        self.cache = ResponseCache(self.path, ttl=60, max_entries=3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_exact_and_similar_tiers(self):
+        self.cache.store("What is a Python decorator?", "technical", {}, ANSWER)
+        self.assertEqual(self.cache.lookup("what is a python decorator", "technical")["cache"], "exact")
+        self.assertEqual(self.cache.lookup("what's a python decorator, please?", "technical")["cache"], "similar")
+        self.assertIsNone(self.cache.lookup("what is a python generator", "technical"))
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["exact_hits"], stats["similar_hits"], stats["misses"]), (1, 1, 1))
+
+    def test_similar_tier_respects_order_numbers_and_negation(self):
+        pairs = [
+            ("convert fahrenheit to celsius", "convert celsius to fahrenheit"),
+            ("is 19 prime", "is 17 prime"),
+            ("how do I check a list is sorted", "how do I check a list is not sorted"),
+        ]
+        for stored, asked in pairs:
+            self.cache.store(stored, "balanced", {}, ANSWER)
+            self.assertIsNone(self.cache.lookup(asked, "balanced"), asked)
+            self.assertEqual(self.cache.lookup(stored + "?", "balanced")["cache"], "exact")
+
+    def test_similar_tier_tracks_evictions(self):
+        for query in ("python decorator", "rust borrow checker", "go channels", "java streams"):
+            self.cache.store(query, "balanced", {}, ANSWER)
+        # max_entries=3 evicted the first entry from the similarity rows too
+        self.assertIsNone(self.cache.lookup("the python decorator", "balanced"))
+        self.assertEqual(self.cache.lookup("the java streams", "balanced")["cache"], "similar")
+        self.assertEqual(sum(len(rows) for rows in self.cache._buckets.values()), 3)
+
+    def test_modes_and_context_are_isolated(self):
+        self.cache.store("python decorator", "technical", {"user": {"level": "expert"}}, ANSWER)
+        self.assertIsNone(self.cache.lookup("python decorator", "creative", {"user": {"level": "expert"}}))
+        self.assertIsNone(self.cache.lookup("python decorator", "technical", {"user": {"level": "novice"}}))
+        # Per-request context such as recalled memory does not split the cache
+        self.assertIsNotNone(self.cache.lookup("python decorator", "technical",
+                                               {"user": {"level": "expert"}, "memory": {"entry_ids": [4]}}))
+
+    def test_ttl_lru_and_persistence(self):
+        for query in ("one", "two", "three"):
+            self.cache.store(query, "balanced", {}, ANSWER)
+        self.cache.lookup("one", "balanced")
+        self.cache.store("four", "balanced", {}, ANSWER)
+        self.assertIsNone(self.cache.lookup("two", "balanced"))  # least recently used
+
+        reopened = ResponseCache(self.path, ttl=60, max_entries=3)
+        self.assertIsNotNone(reopened.lookup("four", "balanced"))
+
+        reopened.ttl = 0
+        time.sleep(0.01)
+        self.assertIsNone(reopened.lookup("four", "balanced"))
+
+    def test_bypass_directives(self):
+        self.cache.store("python decorator", "balanced", {}, ANSWER, directive="bypass")
+        self.assertIsNone(self.cache.lookup("python decorator", "balanced"))
+        self.cache.store("python decorator", "balanced", {}, ANSWER)
+        self.assertIsNone(self.cache.lookup("python decorator", "balanced", directive="refresh"))
+        self.assertEqual(cache_directive({"Cache-Control": "no-store"}), "bypass")
+        self.assertEqual(cache_directive({"X-Slick-Cache": "refresh"}), "refresh")
+        self.assertIsNone(cache_directive({}))
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  What's   a Decorator?! "), "what is a decorator")
+        self.assertEqual(normalize_query("2+2"), normalize_query("2 + 2"))
+        self.assertEqual(normalize_query("What is 3.5?"), "what is 3.5")
+
+    def test_operators_and_other_scripts_do_not_collide(self):
+        pairs = [("2+2", "2*2"), ("x > y", "x < y"), ("привет мир", "пока мир"),
+                 ("什么是装饰器", "什么是生成器"), ("café", "caf")]
+        for stored, asked in pairs:
+            self.assertNotEqual(normalize_query(stored), normalize_query(asked))
+            self.cache.store(stored, "balanced", {}, ANSWER)
+            self.assertIsNone(self.cache.lookup(asked, "balanced"), asked)
+            self.assertEqual(self.cache.lookup(stored, "balanced")["cache"], "exact")
+
+    def test_hits_cannot_mutate_the_cache(self):
+        self.cache.store("python decorator", "balanced", {}, ANSWER)
+        self.cache.lookup("python decorator", "balanced")["response"]["content"] = "changed"
+        self.assertEqual(self.cache.lookup("python decorator", "balanced")["response"], ANSWER["response"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import time
+import asyncio
+import threading
+import unittest
+from engine.SlickLogicEngine import SlickLogicEngine
+from engine.utils.single_flight import SingleFlight, flight_key
+from memory.MemoryBank import MemoryBank
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"content": "answer"}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"content": "answer"}] * 5)
+        self.assertEqual(flights.get_stats(), {"leaders": 1, "coalesced": 4, "in_flight": 0})
+
+    def test_errors_reach_every_waiter_and_release_the_key(self):
+        flights = SingleFlight()
+        def boom():
+            raise RuntimeError("provider down")
+        with self.assertRaises(RuntimeError):
+            flights.do("k", boom)
+        self.assertEqual(flights.do("k", lambda: 1), 1)
+
+    def test_key_normalizes_query_and_ignores_volatile_context(self):
+        self.assertEqual(flight_key("What's a decorator?", "technical", {"cache": "refresh"}),
+                         flight_key("what is a  decorator", "technical", {}))
+        self.assertNotEqual(flight_key("decorators", "technical"), flight_key("decorators", "creative"))
+        self.assertNotEqual(flight_key("2+2", "technical"), flight_key("2*2", "technical"))
+
+    def test_key_keeps_user_keys_named_like_engine_context(self):
+        for key in ("memory", "query", "mode", "inferred"):
+            self.assertNotEqual(flight_key("decorators", "technical", {key: "a"}),
+                                flight_key("decorators", "technical", {key: "b"}), key)
+
+class TestEngineCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.memory = MemoryBank(":memory:")
+        self.engine = SlickLogicEngine(self.memory)
+        process = self.engine.personality.process
+        def slow_process(query, context, mode=None):
+            time.sleep(0.2)
+            return process(query, context, mode)
+        self.engine.personality.process = slow_process
+
+    def test_duplicate_async_queries_share_one_computation(self):
+        async def burst():
+            return await asyncio.gather(*(
+                self.engine.aprocess_query("python decorators", {}, mode="technical") for _ in range(5)
+            ))
+        results = asyncio.run(burst())
+        self.assertTrue(all(r["status"] == "success" for r in results))
+        self.assertEqual(len({r["response"]["content"] for r in results}), 1)
+        # ...but never the same objects, so one caller's edits stay its own
+        self.assertEqual(len({id(r["context"]) for r in results}), 5)
+        self.assertEqual(len({id(r["response"]) for r in results}), 5)
+        # Each request is still stored on its own
+        self.assertEqual(len(self.memory.backend.entries), 5)
+        self.assertEqual(self.engine.get_coalescing_stats()["coalesced"], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,8 +18,8 @@ from typing import Dict, List, Optional, Literal
 from dotenv import load_dotenv
 from fastapi import FastAPI, APIRouter, WebSocket, HTTPException
 from flask import Flask, jsonify
-import httpx
 import uvicorn
+from ai_core.providers.http_pool import provider_pools
 
 # ========================
 # CORE CONFIGURATION
@@ -53,6 +53,14 @@ class AIIntegration:
         self.config = config
         self.knowledge_base = self._load_knowledge_base()
         self.sessions = {}  # {session_id: [messages]}
+
+    def _client(self, provider):
+        """The provider's shared keep-alive client (see ai_core.providers.http_pool)"""
+        return provider_pools.client(provider)
+
+    async def aclose(self):
+        """Close pooled connections"""
+        await provider_pools.aclose()
         
     def _load_knowledge_base(self):
         try:
@@ -78,18 +86,18 @@ class AIIntegration:
         if context:
             messages.insert(0, {"role": "system", "content": context})
             
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "max_tokens": 500,
-                    "temperature": 0.7
-                }
-            )
-            return response.json()["choices"][0]["message"]["content"]
+        response = await self._client("openai").post(
+            "https://api.openai.com/v1/chat/completions",
+            headers=headers,
+            timeout=30.0,
+            json={
+                "model": model,
+                "messages": messages,
+                "max_tokens": 500,
+                "temperature": 0.7
+            }
+        )
+        return response.json()["choices"][0]["message"]["content"]
             
     async def query_deepseek(self, prompt, context=None, model="deepseek-coder"):
         if not self.config.settings['DEEPSEEK_API_KEY']:
@@ -105,18 +113,18 @@ class AIIntegration:
             full_prompt += f"Context: {context}\n\n"
         full_prompt += f"Question: {prompt}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": [{"role": "user", "content": full_prompt}],
-                    "max_tokens": 500,
-                    "temperature": 0.7
-                }
-            )
-            return response.json()["choices"][0]["message"]["content"]
+        response = await self._client("deepseek").post(
+            "https://api.deepseek.com/v1/chat/completions",
+            headers=headers,
+            timeout=30.0,
+            json={
+                "model": model,
+                "messages": [{"role": "user", "content": full_prompt}],
+                "max_tokens": 500,
+                "temperature": 0.7
+            }
+        )
+        return response.json()["choices"][0]["message"]["content"]
             
     async def query(self, prompt, model="hybrid", session_id=None):
         """Unified query interface"""
@@ -211,6 +219,8 @@ class WebService:
         
         # Initialize FastAPI
         self.fastapi_app = FastAPI()
+        # Release the AI clients' pooled connections when the server stops
+        self.fastapi_app.router.on_shutdown.append(self.ai.aclose)
         self.api_router = APIRouter()
         self._setup_fastapi_routes()
         